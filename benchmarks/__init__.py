@@ -0,0 +1,5 @@
+"""Micro-benchmarks and load scripts.
+
+Run from the repository root, e.g. `python -m benchmarks.bench_auth_middleware`.
+Scripts that touch the database use the config selected by APP_ENVIRONMENT.
+"""
@@ -0,0 +1,146 @@
+"""Attachments: upload and download throughput, and server memory per transfer.
+
+Calls the ASGI app directly (auth middleware, routing, pool included) with a
+receive() that produces the request body in 64 KiB messages, the way a server
+hands it over, and a send() that counts and drops response bytes; so nothing
+in the harness holds a file in memory and tracemalloc's peak is what the app
+itself kept. Each size is uploaded in --chunk-mb requests, then downloaded
+whole and as a Range; the peak should not grow with the file size.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_attachments --sizes-mb 16 256
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+import httpx  # noqa: E402
+
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+from src.main import app  # noqa: E402
+
+MESSAGE_BYTES = 64 * 1024
+
+
+async def _call(method: str, path: str, headers: dict, body_size: int = 0, seed: bytes = b"") -> tuple:
+    """(status, response bytes) for one request whose body is `body_size` bytes of `seed`."""
+    remaining = body_size
+    block = (seed * (MESSAGE_BYTES // len(seed) + 1))[:MESSAGE_BYTES] if seed else b""
+
+    async def receive():
+        nonlocal remaining
+        if remaining <= 0:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        n = min(MESSAGE_BYTES, remaining)
+        remaining -= n
+        return {"type": "http.request", "body": block[:n], "more_body": remaining > 0}
+
+    result = {"status": 0, "bytes": 0}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["bytes"] += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return result["status"], result["bytes"]
+
+
+async def _transfer(client, headers, note_id: int, size: int, chunk: int) -> dict:
+    seed = uuid.uuid4().bytes  # distinct content per run, so nothing deduplicates
+    r = await client.post(
+        f"/notes/{note_id}/attachments/uploads",
+        json={"filename": "bench.pdf", "content_type": "application/pdf", "size": size},
+        headers=headers,
+    )
+    upload = r.json()["id"]
+    started = time.perf_counter()
+    for offset in range(0, size, chunk):
+        n = min(chunk, size - offset)
+        status, _ = await _call(
+            "PATCH",
+            f"/notes/{note_id}/attachments/uploads/{upload}",
+            {**headers, "Upload-Offset": str(offset), "Content-Length": str(n)},
+            n,
+            seed,
+        )
+        assert status in (200, 201), status
+    upload_seconds = time.perf_counter() - started
+    attachment = (await client.get(f"/notes/{note_id}/attachments", headers=headers)).json()["items"][-1]
+
+    url = f"/notes/{note_id}/attachments/{attachment['id']}"
+    started = time.perf_counter()
+    status, received = await _call("GET", url, headers)
+    download_seconds = time.perf_counter() - started
+    assert (status, received) == (200, size)
+    status, received = await _call("GET", url, {**headers, "Range": f"bytes={size // 2}-{size // 2 + 999_999}"})
+    assert status == 206 and received == min(1_000_000, size - size // 2)
+    return {"upload": upload_seconds, "download": download_seconds}
+
+
+async def run(args) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"bench-attach-{uuid.uuid4().hex[:8]}@example.com"
+        r = await client.post("/auth/signup", json={"email": email, "password": "BenchAttach123"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        note_id = (await client.post("/notes", json={"title": "bench"}, headers=headers)).json()["id"]
+        try:
+            for size_mb in args.sizes_mb:
+                size = size_mb * 1024 * 1024
+                timings = await _transfer(client, headers, note_id, size, args.chunk_mb * 1024 * 1024)
+                tracemalloc.start()
+                await _transfer(client, headers, note_id, size, args.chunk_mb * 1024 * 1024)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{size_mb:6d} MiB  upload {size_mb / timings['upload']:7.0f} MiB/s  "
+                    f"download {size_mb / timings['download']:7.0f} MiB/s  "
+                    f"peak traced memory {peak / 1024 / 1024:6.1f} MiB"
+                )
+        finally:
+            async with async_pooled_connection() as conn:
+                await conn.execute("DELETE FROM users WHERE email = $1", email)
+            from src.application.notes.attachments import collect_garbage
+
+            await collect_garbage(blob_grace_seconds=0)
+            await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
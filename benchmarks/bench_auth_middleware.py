@@ -0,0 +1,117 @@
+"""Per-request overhead of the auth middleware: BaseHTTPMiddleware vs pure ASGI.
+
+Token verification and principal resolution are stubbed out so only the middleware
+machinery and public-route matching are measured. Requests are driven straight
+through the ASGI callable (no HTTP client, no sockets).
+
+    python -m benchmarks.bench_auth_middleware [--requests 20000]
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Callable
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from fastapi import Request  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse, PlainTextResponse, Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from src.domain.auth.principal import Principal  # noqa: E402
+from src.presentation import auth_middleware  # noqa: E402
+from src.presentation.auth_middleware import PUBLIC_PATHS, AuthMiddleware  # noqa: E402
+
+
+_CLAIMS = {"jti": "bench-jti", "sub": "1", "exp": time.time() + 3600}
+_PRINCIPAL = Principal(1, "bench@example.com")
+
+
+def _stub_verify(token: str):
+    return _CLAIMS
+
+
+class _StubResolver:
+    async def resolve(self, jti, exp=None):
+        return _PRINCIPAL
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware implementation, with the same stubs."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        path = request.url.path
+        if request.method == "OPTIONS" or any(
+            path == p or path.startswith(p + "/") for p in PUBLIC_PATHS
+        ):
+            return await call_next(request)
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header.startswith("Bearer "):
+            return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+        claims = _stub_verify(auth_header.split(" ", 1)[1].strip())
+        principal = await _StubResolver().resolve(claims["jti"], claims["exp"])
+        request.state.user = principal
+        request.state.token_claims = claims
+        return await call_next(request)
+
+
+async def _ok(request):
+    return PlainTextResponse("ok")
+
+
+def _build(middleware_cls) -> Starlette:
+    routes = [Route("/health-check", _ok), Route("/notes", _ok)]
+    return Starlette(routes=routes, middleware=[Middleware(middleware_cls)])
+
+
+async def _drive(app, path: str, requests: int) -> float:
+    headers = [(b"authorization", b"Bearer x.y.z")]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 1),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    auth_middleware.decode_and_verify_token = _stub_verify
+    auth_middleware.principal_resolver = _StubResolver()
+
+    apps = {"BaseHTTPMiddleware": _build(LegacyAuthMiddleware), "pure ASGI": _build(AuthMiddleware)}
+    print(f"{'middleware':<20} {'path':<15} {'us/request':>12}")
+    for path in ("/health-check", "/notes"):
+        for name, app in apps.items():
+            asyncio.run(_drive(app, path, 500))  # warm-up
+            elapsed = asyncio.run(_drive(app, path, args.requests))
+            print(f"{name:<20} {path:<15} {elapsed / args.requests * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
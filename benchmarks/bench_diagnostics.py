@@ -0,0 +1,62 @@
+"""What the admin diagnostics cost a worker: while idle, while profiling, while tracing.
+
+A CPU-bound workload (building and sorting small dicts, the shape of request
+handling) runs in the main thread and is timed alone, with the stack sampler
+running beside it at each `--hz`, and with tracemalloc tracing at 1 and 25 frames.
+
+    python -m benchmarks.bench_diagnostics [--rounds 200000] [--hz 100 1000]
+"""
+import argparse
+import os
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from src.infrastructure.diagnostics.memory import MemoryTracer  # noqa: E402
+from src.infrastructure.diagnostics.sampler import collapsed_text, sample_stacks  # noqa: E402
+
+
+def workload(rounds: int) -> float:
+    started = time.perf_counter()
+    for i in range(rounds):
+        rows = [{"id": i + j, "title": f"note {j}", "tags": ["a", "b"]} for j in range(5)]
+        rows.sort(key=lambda r: r["id"], reverse=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200000)
+    parser.add_argument("--hz", type=float, nargs="+", default=[100.0, 1000.0])
+    args = parser.parse_args()
+
+    workload(args.rounds // 10)  # warm-up
+    baseline = workload(args.rounds)
+    print(f"{'setup':<28} {'seconds':>8} {'slowdown':>9}")
+    print(f"{'inactive':<28} {baseline:>8.2f} {'':>9}")
+
+    for hz in args.hz:
+        result = {}
+        # Sample for longer than the workload can take, so it is covered throughout
+        sampler = threading.Thread(target=lambda: result.update(stacks=sample_stacks(baseline * 2, hz)))
+        sampler.start()
+        elapsed = workload(args.rounds)
+        sampler.join()
+        print(f"{f'sampling at {hz:g} Hz':<28} {elapsed:>8.2f} {elapsed / baseline - 1:>8.1%}")
+        top = collapsed_text(result["stacks"]).splitlines()[:1]
+        if top:
+            print(f"  hottest stack: ...{top[0][-70:]}")
+
+    for frames in (1, 25):
+        tracer = MemoryTracer()
+        tracer.snapshot(frames=frames)
+        elapsed = workload(args.rounds)
+        tracer.stop()
+        print(f"{f'tracemalloc, {frames} frames':<28} {elapsed:>8.2f} {elapsed / baseline - 1:>8.1%}")
+    assert not tracemalloc.is_tracing()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cost of a readiness probe: cached background result vs a DB ping per probe.
+
+Probes are driven straight through the ASGI callable (as in
+bench_auth_middleware), `--concurrency` at a time, against two endpoints: the
+app's /health-check, which serves the monitor's last result, and one that pings
+Postgres through the async pool on every call, as a naive deep check would.
+
+    python -m benchmarks.bench_health [--probes 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from src.application.health_check_handler import HealthCheckHandler  # noqa: E402
+from src.application.health_monitor import HealthMonitor  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+
+
+async def _naive(request):
+    async with async_pooled_connection() as conn:
+        await conn.fetchval("SELECT 1")
+    return PlainTextResponse("ok")
+
+
+def _cached_endpoint(handler: HealthCheckHandler):
+    async def cached(request):
+        return PlainTextResponse(handler.handle())
+
+    return cached
+
+
+async def _drive(app, path: str, probes: int, concurrency: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("testserver", 80),
+    }
+
+    async def prober(count: int):
+        for _ in range(count):
+            await app(dict(scope), receive, send)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(prober(probes // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run(probes: int, concurrency: int) -> None:
+    monitor = HealthMonitor(interval_seconds=5)
+    await monitor.check_once()
+    app = Starlette(
+        routes=[Route("/cached", _cached_endpoint(HealthCheckHandler(monitor))), Route("/naive", _naive)]
+    )
+    print(f"{'probe':<24} {'probes/s':>10} {'us/probe':>10} {'DB pings':>9}")
+    for name, path, pings in (("cached result", "/cached", 0), ("DB ping per probe", "/naive", probes)):
+        await _drive(app, path, 200, 10)  # warm-up
+        elapsed = await _drive(app, path, probes, concurrency)
+        print(f"{name:<24} {probes / elapsed:>10.0f} {elapsed / probes * 1e6:>10.1f} {pings:>9}")
+    started = time.perf_counter()
+    await monitor.check_once()
+    print(f"\none background check: {(time.perf_counter() - started) * 1000:.2f} ms, every 5 s per worker")
+    await monitor.stop()
+    await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--probes", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.probes, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Caller-side cost of a log call: synchronous StreamHandler vs the queued pipeline.
+
+Each setup logs `--records` INFO lines from the calling thread, as request
+handlers do, and reports the time the caller spends per call (mean and p99),
+the time until everything is written, and how many records were dropped.
+The sink is either /dev/null or a stream that takes `--slow-ms` per write,
+standing in for a stdout pipe whose reader (a container log driver) falls behind.
+
+    python -m benchmarks.bench_logging [--records 20000] [--slow-ms 0.2]
+"""
+import argparse
+import logging
+import os
+import time
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import percentile  # noqa: E402
+from src.logging_config import build_handler, request_id_var  # noqa: E402
+
+
+FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] [%(request_id)s] %(message)s"
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str) -> None:
+        time.sleep(self.delay)
+
+    def flush(self) -> None:
+        pass
+
+
+def _run(stream, records: int, **options):
+    handler, listener = build_handler(stream, logging.INFO, FORMAT, **options)
+    log = logging.getLogger("bench")
+    log.propagate = False
+    log.addHandler(handler)
+    if listener is not None:
+        listener.start()
+    request_id_var.set("bench-request")
+    timings = []
+    started = time.perf_counter()
+    for i in range(records):
+        t0 = time.perf_counter()
+        log.info("connecting database connection")
+        log.info("fetched note %s for user %s", i, 7)
+        timings.append(time.perf_counter() - t0)
+    caller = time.perf_counter() - started
+    if listener is not None:
+        listener.stop()
+    drained = time.perf_counter() - started
+    log.removeHandler(handler)
+    return timings, caller, drained, getattr(handler, "dropped", 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--slow-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    setups = {
+        "sync StreamHandler": {},
+        "queue 10000": {"queue_size": 10000},
+        "queue 10000, json": {"queue_size": 10000, "json_format": True},
+        "queue 10000, 100/s limit": {"queue_size": 10000, "rate_limits": {"bench": 100}},
+    }
+    print(f"{'sink':<10} {'setup':<26} {'us/call':>8} {'p99 us':>8} {'caller s':>9} {'drained s':>10} {'dropped':>8}")
+    with open(os.devnull, "w") as devnull:
+        sinks = {"devnull": devnull, "slow": SlowStream(args.slow_ms / 1000)}
+        for sink_name, stream in sinks.items():
+            for name, options in setups.items():
+                timings, caller, drained, dropped = _run(stream, args.records, **options)
+                print(
+                    f"{sink_name:<10} {name:<26} {sum(timings) / len(timings) * 1e6:>8.1f} "
+                    f"{percentile(timings, 99) * 1e6:>8.1f} {caller:>9.2f} {drained:>10.2f} {dropped:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
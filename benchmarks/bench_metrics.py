@@ -0,0 +1,203 @@
+"""Cost of the metrics instrumentation: series updates, middleware, query logger, scrape.
+
+Series updates and the middleware are measured in-process (requests are driven
+straight through the ASGI callable, as in bench_auth_middleware); the query
+logger is measured against the configured database with `SELECT 1` round trips;
+scrapes render a registry of realistic size and merge per-worker snapshot files.
+
+    python -m benchmarks.bench_metrics [--ops 200000] [--requests 20000] [--queries 5000] [--workers 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+import asyncpg  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from src.infrastructure.database.async_pool import async_connect_kwargs  # noqa: E402
+from src.infrastructure.database.instrumentation import observe_query  # noqa: E402
+from src.infrastructure.metrics.multiprocess import MultiprocessMetrics, _process_start  # noqa: E402
+from src.infrastructure.metrics.registry import Registry, render_text  # noqa: E402
+from src.presentation.metrics_middleware import MetricsMiddleware  # noqa: E402
+
+
+def _per_op(fn, ops: int) -> float:
+    started = time.perf_counter()
+    fn(ops)
+    return (time.perf_counter() - started) / ops * 1e9
+
+
+def bench_series(ops: int) -> None:
+    registry = Registry()
+    latency = registry.histogram("bench_seconds", "Bench.", ["route"])
+    total = registry.counter("bench_total", "Bench.")
+    cached = latency.labels("/notes/{note_id}")
+
+    def observe_cached(n):
+        for _ in range(n):
+            cached.observe(0.004)
+
+    def observe_labels(n):
+        for _ in range(n):
+            latency.labels("/notes/{note_id}").observe(0.004)
+
+    def inc(n):
+        for _ in range(n):
+            total.inc()
+
+    def observe_threads(n, threads=4):
+        workers = [threading.Thread(target=observe_cached, args=(n // threads,)) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+    print(f"{'series update':<32} {'ns/op':>10}")
+    for name, fn in (
+        ("histogram observe (kept series)", observe_cached),
+        ("histogram labels() + observe", observe_labels),
+        ("counter inc", inc),
+        ("histogram observe, 4 threads", observe_threads),
+    ):
+        fn(1000)
+        print(f"{name:<32} {_per_op(fn, ops):>10.0f}")
+
+
+async def _ok(request):
+    return PlainTextResponse("ok")
+
+
+async def _drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        path = f"/notes/{i}"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def bench_middleware(requests: int) -> None:
+    routes = [Route("/notes/{note_id}", _ok)]
+    apps = {
+        "no middleware": Starlette(routes=routes),
+        "MetricsMiddleware": Starlette(routes=routes, middleware=[Middleware(MetricsMiddleware)]),
+    }
+    print(f"\n{'app':<32} {'us/request':>10}")
+    for name, app in apps.items():
+        asyncio.run(_drive(app, 500))  # warm-up
+        elapsed = asyncio.run(_drive(app, requests))
+        print(f"{name:<32} {elapsed / requests * 1e6:>10.1f}")
+
+
+async def _queries(queries: int, logged: bool) -> float:
+    conn = await asyncpg.connect(**async_connect_kwargs())
+    try:
+        if logged:
+            conn.add_query_logger(observe_query)
+        for _ in range(200):
+            await conn.fetchval("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(queries):
+            await conn.fetchval("SELECT 1")
+        return time.perf_counter() - started
+    finally:
+        await conn.close()
+
+
+def bench_queries(queries: int) -> None:
+    print(f"\n{'asyncpg SELECT 1':<32} {'us/query':>10}")
+    for name, logged in (("without query logger", False), ("with query logger", True)):
+        elapsed = asyncio.run(_queries(queries, logged))
+        print(f"{name:<32} {elapsed / queries * 1e6:>10.1f}")
+
+
+def _populated_registry() -> Registry:
+    # About what a busy worker carries: 40 routes x 3 statuses, 11 SQL keywords
+    registry = Registry()
+    http = registry.histogram("http_request_duration_seconds", "HTTP.", ["method", "route", "status"])
+    db = registry.histogram("db_query_seconds", "DB.", ["operation"])
+    for r in range(40):
+        for status in (200, 404, 500):
+            http.labels("GET", f"/route/{r}/{{id}}", status).observe(0.01)
+    for op in ("select", "insert", "update", "delete", "with", "copy", "begin", "commit", "rollback", "other", "x"):
+        db.labels(op).observe(0.001)
+    return registry
+
+
+def bench_scrape(workers: int) -> None:
+    registry = _populated_registry()
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        text = render_text(registry.snapshot())
+    single = (time.perf_counter() - started) / rounds
+    series = sum(1 for line in text.splitlines() if not line.startswith("#"))
+
+    # Idle processes stand in for the other workers: snapshots of exited ones would be archived
+    others = [subprocess.Popen(["sleep", "600"]) for _ in range(1, workers)]
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            multiprocess = MultiprocessMetrics(directory, registry=registry)
+            families = registry.snapshot()
+            for other in others:
+                with open(os.path.join(directory, f"{other.pid}-{_process_start(other.pid) or 0}.json"), "w") as f:
+                    json.dump(families, f)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                render_text(multiprocess.collect())
+            merged = (time.perf_counter() - started) / rounds
+    finally:
+        for other in others:
+            other.kill()
+            other.wait()
+
+    print(f"\n{'scrape':<32} {'ms':>10}")
+    print(f"{f'single process ({series} lines)':<32} {single * 1e3:>10.2f}")
+    print(f"{f'{workers} workers merged':<32} {merged * 1e3:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    bench_series(args.ops)
+    bench_middleware(args.requests)
+    bench_queries(args.queries)
+    bench_scrape(args.workers)
+
+
+if __name__ == "__main__":
+    main()
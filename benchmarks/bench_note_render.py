@@ -0,0 +1,159 @@
+"""Markdown rendering: render cost, cache tiers, hit rate and bulk re-render.
+
+Seeds one user with --notes Markdown notes (headings, lists, links, code,
+tables; sizes spread from ~1 KiB to ~100 KiB), then
+  * times an uncached render against a memory hit and a table hit,
+  * replays --views Zipf-distributed views through the render cache, against
+    rendering every view, and reports the hit ratio,
+  * re-renders the seeded notes on 1 and --workers processes.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_note_render --notes 2000 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import percentile  # noqa: E402
+from src.application.notes import rendering  # noqa: E402
+from src.domain.notes.markdown import render_key, render_markdown  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+
+
+WORDS = "alpha beta gamma delta render cache note plan meeting idea draft review ship".split()
+
+
+def _markdown(rng: random.Random, blocks: int) -> str:
+    def words(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    parts = [f"# {words(4)} {uuid.UUID(int=rng.getrandbits(128)).hex}"]
+    for _ in range(blocks):
+        kind = rng.randrange(5)
+        if kind == 0:
+            parts.append(f"## {words(3)}")
+        elif kind == 1:
+            parts.append("\n".join(f"- {words(6)} [link](https://example.com/{rng.randrange(999)}) **{words(1)}**" for _ in range(5)))
+        elif kind == 2:
+            parts.append("```python\n" + "\n".join(f"x = {rng.randrange(999)}  # {words(3)}" for _ in range(6)) + "\n```")
+        elif kind == 3:
+            parts.append("| a | b | c |\n|---|---|---|\n" + "\n".join(f"| {words(1)} | {rng.randrange(99)} | ~~{words(1)}~~ |" for _ in range(6)))
+        else:
+            parts.append(" ".join(f"{words(12)} *{words(2)}* `code`." for _ in range(4)))
+    return "\n\n".join(parts)
+
+
+async def seed(user_id: int, notes: int, rng: random.Random):
+    bodies = [_markdown(rng, int(rng.paretovariate(1.2) * 5) % 400 + 3) for _ in range(notes)]
+    async with async_pooled_connection() as conn:
+        ids = await conn.fetch(
+            """
+            INSERT INTO notes (user_id, title, body)
+            SELECT $1, 'render ' || o, b FROM unnest($2::text[]) WITH ORDINALITY AS t(b, o)
+            RETURNING id
+            """,
+            user_id,
+            bodies,
+        )
+    return [r["id"] for r in ids], bodies
+
+
+async def _forget(bodies) -> None:
+    rendering.render_cache.clear()
+    async with async_pooled_connection() as conn:
+        await conn.execute(
+            "DELETE FROM note_renders WHERE content_hash = ANY($1::text[])", [render_key(b) for b in bodies]
+        )
+
+
+def _report(label: str, samples) -> None:
+    print(f"{label:<36} p50 {percentile(samples, 50):9.3f} ms  p95 {percentile(samples, 95):9.3f} ms")
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-render-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        note_ids, bodies = await seed(user_id, args.notes, rng)
+        sizes = sorted(len(b) for b in bodies)
+        print(f"seeded {args.notes} notes, body p50 {percentile(sizes, 50) / 1024:.1f} KiB, max {sizes[-1] / 1024:.1f} KiB")
+        cache = rendering.render_cache
+        sample = bodies[: args.repeat]
+
+        await _forget(bodies)
+        tiers = {"render (miss)": [], "table hit": [], "memory hit": []}
+        for body in sample:
+            for label in tiers:
+                if label == "table hit":
+                    cache.clear()
+                started = time.perf_counter()
+                await cache.render(body)
+                tiers[label].append((time.perf_counter() - started) * 1000)
+        for label, samples in tiers.items():
+            _report(label, samples)
+
+        views = [note_ids[min(int(rng.paretovariate(1.0)) - 1, len(note_ids) - 1)] for _ in range(args.views)]
+        by_id = dict(zip(note_ids, bodies))
+        for label, cached in (("every view rendered", False), ("through the render cache", True)):
+            await _forget(bodies)
+            before = cache.stats()
+            started = time.perf_counter()
+            for note_id in views:
+                if cached:
+                    await cache.render(by_id[note_id])
+                else:
+                    await asyncio.to_thread(render_markdown, by_id[note_id])
+            seconds = time.perf_counter() - started
+            line = f"{args.views} views, {label:<25} {seconds:7.2f} s  {args.views / seconds:8.0f} views/s"
+            if cached:
+                after = cache.stats()
+                lookups = after["lookups"] - before["lookups"]
+                hits = after["memory_hits"] - before["memory_hits"] + after["stored_hits"] - before["stored_hits"]
+                line += f"  hit ratio {hits / lookups:.3f}"
+            print(line)
+
+        for workers in sorted({1, args.workers}):
+            await _forget(bodies)
+            started = time.perf_counter()
+            result = await rendering.rerender_all(workers=workers)
+            seconds = time.perf_counter() - started
+            print(
+                f"rerender on {workers} process(es): {result['rendered']} renders in {seconds:6.2f} s  "
+                f"{result['rendered'] / seconds:8.0f} notes/s"
+            )
+    finally:
+        async with async_pooled_connection() as conn:
+            await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await _forget(bodies)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--views", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=200, help="notes timed per cache tier")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
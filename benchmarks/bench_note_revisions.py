@@ -0,0 +1,132 @@
+"""Revision storage per version and reconstruction latency.
+
+Simulates autosave sessions (small local edits to a multi-KB note) through the
+notes service, then reports stored bytes per revision against a full copy per
+version, and rebuild latency for random revisions before and after compaction.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_note_revisions --notes 20 --saves 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import VOCABULARY, WEIGHTS, percentile  # noqa: E402
+from src.application.notes import revisions  # noqa: E402
+from src.application.notes import service as notes_service  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+
+
+def _edit(rng: random.Random, body: str) -> str:
+    """One autosave worth of typing: a few words inserted, or a short span deleted."""
+    at = rng.randint(0, len(body))
+    if rng.random() < 0.25:
+        return body[:at] + body[at + rng.randint(1, 30):]
+    return body[:at] + " ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=rng.randint(1, 5))) + " " + body[at:]
+
+
+async def storage(user_id: int):
+    async with async_pooled_connection() as conn:
+        return await conn.fetchrow(
+            """
+            SELECT count(*) AS revisions,
+                   count(*) FILTER (WHERE r.body IS NOT NULL) AS snapshots,
+                   sum(coalesce(pg_column_size(r.body), 0) + coalesce(pg_column_size(r.delta), 0)
+                       + pg_column_size(r.title)) AS stored,
+                   (SELECT sum(pg_column_size(n.body) + pg_column_size(n.title)) FROM notes n
+                    WHERE n.user_id = $1) AS current
+            FROM note_revisions r JOIN notes n ON n.id = r.note_id
+            WHERE n.user_id = $1
+            """,
+            user_id,
+        )
+
+
+async def rebuild_latencies(user_id: int, notes, saves: int, samples: int, rng: random.Random):
+    latencies = []
+    for _ in range(samples):
+        note_id = rng.choice(notes)
+        revision = rng.randint(1, saves + 1)
+        started = time.perf_counter()
+        await revisions.get_revision(user_id, note_id, revision)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies) -> None:
+    print(
+        f"{label:<18} mean {statistics.mean(latencies):.2f} ms  p50 {percentile(latencies, 50):.2f}  "
+        f"p95 {percentile(latencies, 95):.2f}  p99 {percentile(latencies, 99):.2f}"
+    )
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-revisions-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        notes = []
+        save_ms = []
+        for i in range(args.notes):
+            body = " ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=args.words))
+            note = await notes_service.create_note(user_id, f"note {i}", body)
+            notes.append(note["id"])
+            for _ in range(args.saves):
+                body = _edit(rng, body)
+                started = time.perf_counter()
+                await notes_service.update_note(user_id, note["id"], f"note {i}", body)
+                save_ms.append((time.perf_counter() - started) * 1000)
+        _report("save (PUT)", save_ms)
+
+        stats = await storage(user_id)
+        full_copy = stats["current"] / args.notes
+        per_revision = stats["stored"] / stats["revisions"]
+        print(
+            f"revisions {stats['revisions']}  snapshots {stats['snapshots']}  "
+            f"{per_revision:.0f} B/revision vs {full_copy:.0f} B full copy ({full_copy / per_revision:.1f}x smaller)"
+        )
+        _report("rebuild", await rebuild_latencies(user_id, notes, args.saves, args.samples, rng))
+
+        result = await revisions.compact_revisions(args.compact_chain, min_age_seconds=0)
+        stats = await storage(user_id)
+        print(
+            f"compacted to chains <= {args.compact_chain}: +{result['snapshots']} snapshots, "
+            f"{stats['stored'] / stats['revisions']:.0f} B/revision"
+        )
+        _report("rebuild compacted", await rebuild_latencies(user_id, notes, args.saves, args.samples, rng))
+    finally:
+        async with async_pooled_connection() as conn:
+            await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--saves", type=int, default=200, help="autosaves per note")
+    parser.add_argument("--words", type=int, default=800, help="words in the initial note body")
+    parser.add_argument("--samples", type=int, default=500, help="random revisions rebuilt")
+    parser.add_argument("--compact-chain", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Tag sidebar and tag-filtered listing on a heavily tagged corpus.
+
+Seeds one user with --notes notes carrying 1-5 tags each from a Zipf-like
+vocabulary (COPY; the note_tags triggers fill user_tag_counts as it loads),
+then times the precomputed sidebar against GROUP BY over note_tags, tag
+filters of different selectivity, and note updates that change tags.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_note_tags --notes 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import percentile  # noqa: E402
+from src.application.notes import service as notes_service  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+
+
+GROUP_BY_COUNTS = "SELECT tag, count(*) FROM note_tags WHERE user_id = $1 GROUP BY tag ORDER BY tag"
+
+
+def _tags(rng: random.Random, vocabulary, weights):
+    return set(rng.choices(vocabulary, weights=weights, k=rng.randint(1, 5)))
+
+
+async def seed(user_id: int, notes: int, vocabulary, weights, rng: random.Random) -> float:
+    started = time.perf_counter()
+    async with async_pooled_connection() as conn:
+        batch = 10000
+        for offset in range(0, notes, batch):
+            size = min(batch, notes - offset)
+            ids = [
+                r[0]
+                for r in await conn.fetch("SELECT nextval('notes_id_seq') FROM generate_series(1, $1)", size)
+            ]
+            await conn.copy_records_to_table(
+                "notes",
+                records=[(note_id, user_id, f"note {note_id}", "") for note_id in ids],
+                columns=["id", "user_id", "title", "body"],
+            )
+            await conn.copy_records_to_table(
+                "note_tags",
+                records=[
+                    (note_id, user_id, tag) for note_id in ids for tag in _tags(rng, vocabulary, weights)
+                ],
+                columns=["note_id", "user_id", "tag"],
+            )
+        await conn.execute("ANALYZE notes; ANALYZE note_tags; ANALYZE user_tag_counts")
+    return time.perf_counter() - started
+
+
+async def timed(fn, *args, repeat: int, **kwargs):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn(*args, **kwargs)
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+
+def _report(label: str, samples) -> None:
+    print(f"{label:<40} p50 {percentile(samples, 50):8.2f} ms  p95 {percentile(samples, 95):8.2f} ms")
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    vocabulary = [f"tag{i}" for i in range(args.tags)]
+    weights = [1.0 / (rank + 1) for rank in range(args.tags)]
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-tags-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        seconds = await seed(user_id, args.notes, vocabulary, weights, rng)
+        print(f"seeded {args.notes} notes over {args.tags} tags in {seconds:.1f}s")
+
+        async def group_by():
+            async with async_pooled_connection() as conn:
+                return await conn.fetch(GROUP_BY_COUNTS, user_id)
+
+        sidebar, samples = await timed(notes_service.get_tag_counts, user_id, repeat=args.repeat)
+        _report(f"sidebar from user_tag_counts [{len(sidebar['items'])}]", samples)
+        expected, samples = await timed(group_by, repeat=args.repeat)
+        _report("  GROUP BY over note_tags", samples)
+        assert [(r["tag"], r["count"]) for r in expected] == [
+            (item["tag"], item["count"]) for item in sidebar["items"]
+        ]
+
+        filters = {
+            "most common tag": [vocabulary[0]],
+            "rare tag": [vocabulary[-1]],
+            "two common tags": vocabulary[:2],
+            "common + rare tag": [vocabulary[0], vocabulary[-1]],
+            "three mid tags": vocabulary[10:13],
+        }
+        for label, tags in filters.items():
+            page, samples = await timed(notes_service.list_notes, user_id, limit=20, tags=tags, repeat=args.repeat)
+            _report(f"filter {label} [{len(page['items'])}]", samples)
+
+        async with async_pooled_connection() as conn:
+            note_ids = [r[0] for r in await conn.fetch("SELECT id FROM notes WHERE user_id = $1 LIMIT $2", user_id, 200)]
+        samples = []
+        for note_id in note_ids:
+            tags = [f"#{tag}" for tag in _tags(rng, vocabulary, weights)]
+            started = time.perf_counter()
+            await notes_service.update_note(user_id, note_id, "retagged", "", tags)
+            samples.append((time.perf_counter() - started) * 1000)
+        _report(f"update with new tags (x{len(note_ids)})", samples)
+        samples = []
+        for note_id in note_ids:
+            started = time.perf_counter()
+            await notes_service.update_note(user_id, note_id, "untouched tags", "")
+            samples.append((time.perf_counter() - started) * 1000)
+        _report(f"update keeping tags (x{len(note_ids)})", samples)
+    finally:
+        async with async_pooled_connection() as conn:
+            await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--tags", type=int, default=500, help="vocabulary size")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per read")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
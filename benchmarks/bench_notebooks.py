@@ -0,0 +1,170 @@
+"""Notebook subtree reads and moves on a large materialized-path tree.
+
+Builds one user's tree of --nodes notebooks: a random recursive tree (wide near
+the root, logarithmic depth) plus a --chain-deep spine, files --notes notes
+across it, then times subtree listing/counting against a recursive CTE on
+parent_id, and subtree moves of various sizes.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_notebooks --nodes 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import percentile  # noqa: E402
+from src.application.notes import notebooks  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+from src.infrastructure.repositories import notebooks_repository  # noqa: E402
+
+
+RECURSIVE_SUBTREE = """
+    WITH RECURSIVE sub AS (
+        SELECT id, parent_id, name, 0 AS depth FROM notebooks WHERE id = $1 AND user_id = $2
+        UNION ALL
+        SELECT nb.id, nb.parent_id, nb.name, sub.depth + 1
+        FROM notebooks nb JOIN sub ON nb.parent_id = sub.id
+    )
+    SELECT sub.*, (SELECT count(*) FROM notes n WHERE n.notebook_id = sub.id) AS note_count FROM sub
+"""
+
+
+def build_tree(nodes: int, chain: int, rng: random.Random):
+    """Parent index per node (None for the root)."""
+    parents = [None]
+    for i in range(1, nodes - chain):
+        parents.append(rng.randrange(i))
+    # The spine hangs off the root so other subtrees can be moved under it
+    tail = 0
+    for _ in range(chain):
+        parents.append(tail)
+        tail = len(parents) - 1
+    return parents
+
+
+async def seed(user_id: int, parents, notes: int, rng: random.Random):
+    started = time.perf_counter()
+    async with async_pooled_connection() as conn:
+        ids = [
+            r[0]
+            for r in await conn.fetch(
+                "SELECT nextval('notebooks_id_seq') FROM generate_series(1, $1)", len(parents)
+            )
+        ]
+        paths = []
+        depths = []
+        for i, p in enumerate(parents):
+            paths.append(f"{'/' if p is None else paths[p]}{ids[i]}/")
+            depths.append(0 if p is None else depths[p] + 1)
+        await conn.copy_records_to_table(
+            "notebooks",
+            records=[
+                (ids[i], user_id, None if p is None else ids[p], f"notebook {i}", paths[i])
+                for i, p in enumerate(parents)
+            ],
+            columns=["id", "user_id", "parent_id", "name", "path"],
+        )
+        await conn.copy_records_to_table(
+            "notes",
+            records=[(user_id, rng.choice(ids), f"note {i}", "") for i in range(notes)],
+            columns=["user_id", "notebook_id", "title", "body"],
+        )
+        await conn.execute("ANALYZE notebooks; ANALYZE notes")
+    return ids, depths, time.perf_counter() - started
+
+
+async def timed(fn, *args, repeat: int = 1):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+
+def _report(label: str, samples) -> None:
+    print(f"{label:<34} p50 {percentile(samples, 50):8.2f} ms  p95 {percentile(samples, 95):8.2f} ms")
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-notebooks-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        parents = build_tree(args.nodes, args.chain, rng)
+        ids, depths, seconds = await seed(user_id, parents, args.notes, rng)
+        print(
+            f"seeded {len(ids)} notebooks (max depth {max(depths)}, mean {statistics.mean(depths):.1f}), "
+            f"{args.notes} notes in {seconds:.1f}s"
+        )
+
+        async def recursive(notebook_id):
+            async with async_pooled_connection() as conn:
+                return await conn.fetch(RECURSIVE_SUBTREE, notebook_id, user_id)
+
+        # Subtrees of increasing size: the root, a wide child, random mid nodes, the deep spine
+        sizes = {ids[0]: "root"}
+        children = [i for i, p in enumerate(parents) if p == 0]
+        sizes[ids[children[0]]] = "first root child"
+        sizes[ids[len(parents) - args.chain]] = f"deep spine ({args.chain} levels)"
+        for notebook_id, label in sizes.items():
+            tree, samples = await timed(notebooks.get_tree, user_id, notebook_id, repeat=args.repeat)
+            _report(f"tree {label} [{len(tree['items'])}]", samples)
+            _, samples = await timed(recursive, notebook_id, repeat=args.repeat)
+            _report("  recursive CTE on parent_id", samples)
+            _, samples = await timed(notebooks_repository.count_subtree, user_id, notebook_id, repeat=args.repeat)
+            _report("  subtree counts", samples)
+
+        big = ids[children[0]]
+        _, samples = await timed(notebooks.update_notebook, user_id, big, None, ids[len(parents) - 1], True)
+        _report("move first root child under spine", samples)
+
+        move_samples = []
+        moved = 0
+        while moved < args.moves:
+            node = rng.randrange(1, len(parents))
+            target = rng.randrange(len(parents))
+            try:
+                _, samples = await timed(notebooks.update_notebook, user_id, ids[node], None, ids[target], True)
+            except ValueError:
+                continue  # target inside the moved subtree
+            move_samples.extend(samples)
+            moved += 1
+        _report(f"move random subtree (x{args.moves})", move_samples)
+    finally:
+        async with async_pooled_connection() as conn:
+            await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--chain", type=int, default=200, help="length of the deep spine")
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per read")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
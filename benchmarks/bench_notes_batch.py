@@ -0,0 +1,123 @@
+"""Bulk actions: one /notes/batch request vs one request per note.
+
+Drives the full app in-process (auth middleware, routing, pool) through an
+ASGI transport, so the per-request costs a real client pays — token checks,
+connection checkout, one transaction per call — are all counted; only the
+network is left out. Each round files --items notes into a notebook and then
+deletes them, per item (sequentially and --concurrency at a time) and as one
+batch.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_notes_batch --items 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+import httpx  # noqa: E402
+
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+from src.main import app  # noqa: E402
+
+
+async def _seed_notes(user_id: int, count: int):
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            INSERT INTO notes (user_id, title, body)
+            SELECT $1, 'bench ' || g, 'body' FROM generate_series(1, $2) AS g
+            RETURNING id
+            """,
+            user_id,
+            count,
+        )
+    return [r["id"] for r in rows]
+
+
+async def _bounded(calls, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call):
+        async with semaphore:
+            r = await call()
+            assert r.status_code == 200, r.text
+
+    await asyncio.gather(*(run(call) for call in calls))
+
+
+async def run(args) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"bench-batch-{uuid.uuid4().hex[:8]}@example.com"
+        r = await client.post("/auth/signup", json={"email": email, "password": "BenchBatch123"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        async with async_pooled_connection() as conn:
+            user_id = await conn.fetchval("SELECT id FROM users WHERE email = $1", email)
+        notebook = (await client.post("/notebooks", json={"name": "bench"}, headers=headers)).json()["id"]
+
+        def per_item_file(ids):
+            return [
+                lambda i=i: client.put(f"/notes/{i}/notebook", json={"notebook_id": notebook}, headers=headers)
+                for i in ids
+            ]
+
+        def per_item_delete(ids):
+            return [lambda i=i: client.delete(f"/notes/{i}", headers=headers) for i in ids]
+
+        async def batch(ids, op):
+            operations = [{"op": op, "id": i, "notebook_id": notebook} for i in ids]
+            r = await client.post("/notes/batch", json={"operations": operations}, headers=headers)
+            assert r.status_code == 200 and r.json()["applied"] == len(ids), r.text
+
+        modes = {
+            "per item, sequential": lambda ids, kind: _bounded(
+                per_item_file(ids) if kind == "file" else per_item_delete(ids), 1
+            ),
+            f"per item, {args.concurrency} concurrent": lambda ids, kind: _bounded(
+                per_item_file(ids) if kind == "file" else per_item_delete(ids), args.concurrency
+            ),
+            "one batch": lambda ids, kind: batch(ids, kind),
+        }
+        try:
+            for kind in ("file", "delete"):
+                for label, mode in modes.items():
+                    samples = []
+                    for _ in range(args.rounds):
+                        ids = await _seed_notes(user_id, args.items)
+                        started = time.perf_counter()
+                        await mode(ids, kind)
+                        samples.append(time.perf_counter() - started)
+                    seconds = statistics.median(samples)
+                    print(
+                        f"{kind:<6} {args.items} notes, {label:<24} {seconds * 1000:9.1f} ms  "
+                        f"{args.items / seconds:9.0f} notes/s"
+                    )
+        finally:
+            async with async_pooled_connection() as conn:
+                await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+            await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=6, help="parallel requests, as a browser would")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
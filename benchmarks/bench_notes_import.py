@@ -0,0 +1,94 @@
+"""Bulk note import/export throughput (rows/s).
+
+Generates an NDJSON stream on the fly, imports it through the notes service
+(COPY into a staging table, then merge) and exports it back, reporting rows/s
+and peak RSS for both directions.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_notes_import --notes 200000 --words 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from benchmarks.bench_notes_search import VOCABULARY, WEIGHTS  # noqa: E402
+from src.application.notes import service as notes_service  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def ndjson_upload(notes: int, words: int, chunk_bytes: int, seed: int):
+    """Yield an upload in fixed-size chunks that split lines at arbitrary points."""
+    rng = random.Random(seed)
+    bodies = [" ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=words)) for _ in range(1000)]
+    buffer = bytearray()
+    for i in range(notes):
+        line = {"title": f"note {i}", "body": bodies[i % len(bodies)], "created_at": "2024-01-01T00:00:00+00:00"}
+        buffer += json.dumps(line).encode("utf-8") + b"\n"
+        while len(buffer) >= chunk_bytes:
+            yield bytes(buffer[:chunk_bytes])
+            del buffer[:chunk_bytes]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def run(args) -> None:
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-import-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        upload = ndjson_upload(args.notes, args.words, args.chunk_bytes, args.seed)
+        result = await notes_service.import_notes(user_id, upload)
+        print(
+            f"import  {result['rows']} rows in {result['seconds']:.2f}s  "
+            f"{result['rows_per_second']} rows/s  peak RSS {_peak_rss_mb():.0f} MB"
+        )
+
+        started = time.perf_counter()
+        rows = 0
+        exported = 0
+        async for chunk in notes_service.export_notes(user_id):
+            rows += chunk.count(b"\n")
+            exported += len(chunk)
+        seconds = time.perf_counter() - started
+        print(
+            f"export  {rows} rows in {seconds:.2f}s  {rows / seconds:.0f} rows/s  "
+            f"{exported / seconds / 2**20:.1f} MiB/s  peak RSS {_peak_rss_mb():.0f} MB"
+        )
+    finally:
+        async with async_pooled_connection() as conn:
+            await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=120, help="words per note body")
+    parser.add_argument("--chunk-bytes", type=int, default=64 * 1024, help="upload chunk size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
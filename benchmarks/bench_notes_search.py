@@ -0,0 +1,112 @@
+"""Full-text note search latency on a seeded corpus.
+
+Seeds one user with a large synthetic corpus (COPY), runs random one- and
+two-term queries through the notes service and reports p50/p95/p99 latency.
+
+    APP_ENVIRONMENT=local python -m benchmarks.bench_notes_search --notes 100000 --queries 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+
+from src.application.notes import service as notes_service  # noqa: E402
+from src.infrastructure.database.async_pool import async_pooled_connection, close_async_pool  # noqa: E402
+from src.infrastructure.database.connection import get_db_connection  # noqa: E402
+from src.infrastructure.database.migrations import run_migrations  # noqa: E402
+
+
+VOCABULARY = (
+    "meeting budget roadmap design review launch customer invoice travel recipe garden "
+    "python postgres index latency cache deploy release sprint retro hiring onboarding "
+    "contract vendor security audit backup restore migration schema feature bug ticket "
+    "draft outline summary research paper chapter lecture exam grocery workout doctor "
+    "flight hotel museum concert birthday gift wedding holiday project deadline priority"
+).split()
+# Long tail of rarer terms; word frequencies follow a Zipf-like 1/rank curve
+VOCABULARY += [f"term{i}" for i in range(5000)]
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _words(rng: random.Random, k: int):
+    return rng.choices(VOCABULARY, weights=WEIGHTS, k=k)
+
+
+def _note(rng: random.Random, words: int):
+    return " ".join(_words(rng, 4)), " ".join(_words(rng, words))
+
+
+async def seed(user_id: int, notes: int, words: int, rng: random.Random) -> float:
+    started = time.perf_counter()
+    async with async_pooled_connection() as conn:
+        batch = 10000
+        for offset in range(0, notes, batch):
+            records = [(user_id,) + _note(rng, words) for _ in range(min(batch, notes - offset))]
+            await conn.copy_records_to_table("notes", records=records, columns=["user_id", "title", "body"])
+        await conn.execute("ANALYZE notes")
+    return time.perf_counter() - started
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    async with async_pooled_connection() as conn:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (email, password_hash) VALUES ($1, 'x') RETURNING id",
+            f"bench-search-{uuid.uuid4().hex[:8]}@example.com",
+        )
+    try:
+        seconds = await seed(user_id, args.notes, args.words, rng)
+        print(f"seeded {args.notes} notes in {seconds:.1f}s")
+
+        for _ in range(20):  # warm-up
+            await notes_service.search_notes(user_id, _words(rng, 1)[0], limit=args.limit)
+
+        latencies = []
+        for i in range(args.queries):
+            terms = _words(rng, 1 if i % 2 else 2)
+            started = time.perf_counter()
+            await notes_service.search_notes(user_id, " ".join(terms), limit=args.limit)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        print(f"queries: {len(latencies)}  page size: {args.limit}")
+        print(f"mean {statistics.mean(latencies):.2f} ms")
+        for pct in (50, 95, 99):
+            print(f"p{pct}  {percentile(latencies, pct):.2f} ms")
+    finally:
+        if not args.keep:
+            async with async_pooled_connection() as conn:
+                await conn.execute("DELETE FROM users WHERE id = $1", user_id)
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=120, help="words per note body")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded corpus")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
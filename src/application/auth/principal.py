@@ -0,0 +1,67 @@
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+from src.domain.auth.principal import Principal
+from src.infrastructure.cache.session_cache import SessionCache, session_cache
+from src.infrastructure.cache.ttl_lru import TTLCache
+from src.infrastructure.repositories import async_sessions_repository as sessions_repo
+
+
+class PrincipalResolver:
+    """Resolve a token's `jti` to its Principal with one joined query, cached per worker.
+
+    Cached principals live for `ttl` seconds at most, capped at the token's `exp`.
+    Revocations drop them immediately: locally through `invalidate`, and from other
+    workers through the session-revoked notification. While the listener is down
+    the session cache's `unlistened_active_ttl` applies instead.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 50_000, sessions: SessionCache = session_cache):
+        self.ttl = ttl
+        self._sessions = sessions
+        self._cache = TTLCache(max_entries)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "PrincipalResolver":
+        return cls(
+            ttl=float(cfg.get("ttl_seconds", 30)),
+            max_entries=int(cfg.get("max_entries", 50_000)),
+        )
+
+    async def resolve(self, jti: str, exp: Optional[float] = None) -> Optional[Principal]:
+        """Principal for an active session, or None if it is revoked or unknown."""
+        if self._sessions.lookup(jti) is False:
+            return None
+        principal = self._cache.get(jti)
+        if principal is not None:
+            return principal
+
+        row = await sessions_repo.get_active_principal(jti)
+        if row is None:
+            self._sessions.mark_revoked(jti, exp)
+            return None
+        if self._sessions.lookup(jti) is False:
+            # Revoked while the query was in flight
+            return None
+        principal = Principal(row["id"], row["email"])
+        if exp is not None:
+            ttl = self.ttl if self._sessions.listening else self._sessions.unlistened_active_ttl
+            self._cache.set(jti, principal, min(float(exp), time.time() + ttl))
+        return principal
+
+    def invalidate(self, jti: str) -> None:
+        self._cache.pop(jti)
+
+    def on_revoked_notification(self, payload: str) -> None:
+        if payload:
+            self._cache.pop(payload)
+
+    def on_listener_state(self, connected: bool) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+principal_resolver = PrincipalResolver.from_config(config.get("auth", {}).get("principal_cache", {}) or {})
@@ -1,10 +1,18 @@
 import re
-from typing import Dict, Any
-
-from src.infrastructure.repositories import users_repository as users_repo
-from src.infrastructure.repositories import sessions_repository as sessions_repo
-from src.infrastructure.security.password import hash_password, verify_password
+from typing import Dict, Any, Optional
+
+from src.infrastructure.repositories import async_users_repository as users_repo
+from src.infrastructure.repositories import async_sessions_repository as sessions_repo
+from src.infrastructure.security.password import (
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from src.infrastructure.security.kdf_executor import KdfBusyError
 from src.infrastructure.security.jwt import create_access_token
+from src.infrastructure.cache.session_cache import session_cache
+from src.application.auth.principal import principal_resolver
+from src.infrastructure.database.listener import PgListener
 
 
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
@@ -20,19 +28,20 @@ def _validate_password(password: str) -> None:
         raise ValueError("Password must be at least 8 characters long")
 
 
-def signup(email: str, password: str) -> Dict[str, Any]:
+async def signup(email: str, password: str) -> Dict[str, Any]:
     _validate_email(email)
     _validate_password(password)
 
-    pwd_hash = hash_password(password)
+    # KDF work is CPU-bound: it runs on its own bounded executor, off the event loop
+    pwd_hash = await hash_password_async(password)
     try:
-        user = users_repo.create_user(email=email.lower().strip(), password_hash=pwd_hash)
+        user = await users_repo.create_user(email=email.lower().strip(), password_hash=pwd_hash)
     except ValueError as e:
         # Email already exists
         raise e
 
     token_info = create_access_token(sub=str(user["id"]))
-    sessions_repo.create_session(user_id=user["id"], jti=token_info["jti"])
+    await sessions_repo.create_session(user_id=user["id"], jti=token_info["jti"])
     return {
         "access_token": token_info["token"],
         "token_type": "bearer",
@@ -40,18 +49,30 @@ def signup(email: str, password: str) -> Dict[str, Any]:
     }
 
 
-def login(email: str, password: str) -> Dict[str, Any]:
+async def _upgrade_password_hash(user: Dict[str, Any], password: str) -> None:
+    """Re-hash with the configured KDF cost; we only see the plaintext at login."""
+    try:
+        new_hash = await hash_password_async(password)
+    except KdfBusyError:
+        # Not worth failing the login over; it is retried on the next one
+        return
+    await users_repo.update_password_hash(user["id"], new_hash, current_hash=user["password_hash"])
+
+
+async def login(email: str, password: str) -> Dict[str, Any]:
     _validate_email(email)
     _validate_password(password)
 
-    user = users_repo.get_user_by_email(email.lower().strip())
+    user = await users_repo.get_user_by_email(email.lower().strip())
     if not user:
         raise PermissionError("Invalid credentials")
-    if not verify_password(password, user["password_hash"]):
+    if not await verify_password_async(password, user["password_hash"]):
         raise PermissionError("Invalid credentials")
+    if password_needs_rehash(user["password_hash"]):
+        await _upgrade_password_hash(user, password)
 
     token_info = create_access_token(sub=str(user["id"]))
-    sessions_repo.create_session(user_id=user["id"], jti=token_info["jti"])
+    await sessions_repo.create_session(user_id=user["id"], jti=token_info["jti"])
     return {
         "access_token": token_info["token"],
         "token_type": "bearer",
@@ -59,7 +80,32 @@ def login(email: str, password: str) -> Dict[str, Any]:
     }
 
 
-def logout(jti: str) -> bool:
+async def logout(jti: str, exp: Optional[float] = None) -> bool:
     if not jti:
         return False
-    return sessions_repo.revoke_session(jti)
+    revoked = await sessions_repo.revoke_session(jti)
+    # Other workers learn about it through the NOTIFY issued by revoke_session
+    session_cache.mark_revoked(jti, exp)
+    principal_resolver.invalidate(jti)
+    return revoked
+
+
+async def is_session_active(jti: str, exp: Optional[float] = None) -> bool:
+    cached = session_cache.lookup(jti)
+    if cached is not None:
+        return cached
+    active = await sessions_repo.is_session_active(jti)
+    if active:
+        if exp is not None:
+            session_cache.mark_active(jti, exp)
+    else:
+        session_cache.mark_revoked(jti, exp)
+    return active
+
+
+def subscribe_session_invalidation(listener: PgListener) -> None:
+    """Keep this worker's session cache in sync with revocations made elsewhere."""
+    listener.subscribe(sessions_repo.SESSION_REVOKED_CHANNEL, session_cache.on_revoked_notification)
+    listener.subscribe(sessions_repo.SESSION_REVOKED_CHANNEL, principal_resolver.on_revoked_notification)
+    listener.add_state_callback(session_cache.on_listener_state)
+    listener.add_state_callback(principal_resolver.on_listener_state)
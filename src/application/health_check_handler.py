@@ -1,8 +1,16 @@
+from typing import Any, Dict, Optional
+
+from src.application.health_monitor import HealthMonitor, health_monitor
 from src.domain.health_check_service import HealthCheckService
 
 class HealthCheckHandler:
-    def __init__(self):
+    def __init__(self, monitor: Optional[HealthMonitor] = None):
         self.service = HealthCheckService()
+        self.monitor = monitor or health_monitor
+
+    def handle(self) -> str:
+        """Overall status from the monitor's last results; "ok" until it has run."""
+        return self.service.check_health(self.monitor.results())
 
-    def handle(self):
-        return self.service.check_health()
+    def readiness(self) -> Dict[str, Any]:
+        return {"status": self.handle(), **self.monitor.report()}
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from src.config import config
+from src.domain.health_check_service import DEGRADED, FAILING, OK, CheckResult, utilization_status
+from src.infrastructure.database import pool as sync_pool
+from src.infrastructure.database.async_pool import async_connect_kwargs, async_pool_stats
+from src.infrastructure.database.migrations import pending_migrations
+from src.infrastructure.security.kdf_executor import get_kdf_executor
+from src.logging_config import logger
+
+
+class HealthMonitor:
+    """Runs the readiness checks in the background and keeps the last result.
+
+    Probes read the cached result, so however often the load balancer asks,
+    Postgres sees one ping per `interval_seconds` per worker. A result older
+    than `stale_after_seconds` counts as failing: the checks themselves (or the
+    event loop running them) are stuck.
+
+    The ping uses a connection of its own rather than one from the request pool:
+    a pool saturated by traffic is reported as degraded (async_pool), and must
+    not make the database look unreachable and take every worker out of rotation.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 5.0,
+        timeout_seconds: float = 2.0,
+        degraded_utilization: float = 0.9,
+        stale_after_seconds: Optional[float] = None,
+    ):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.degraded_utilization = degraded_utilization
+        self.stale_after_seconds = stale_after_seconds or 3 * interval_seconds
+        self._results: List[CheckResult] = []
+        self._checked_at: Optional[float] = None
+        self._checked_at_wall: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        # The ping connection and the event loop it belongs to
+        self._conn: Optional[asyncpg.Connection] = None
+        self._conn_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "HealthMonitor":
+        stale = cfg.get("stale_after_seconds")
+        return cls(
+            interval_seconds=float(cfg.get("interval_seconds", 5)),
+            timeout_seconds=float(cfg.get("timeout_seconds", 2)),
+            degraded_utilization=float(cfg.get("degraded_utilization", 0.9)),
+            stale_after_seconds=float(stale) if stale is not None else None,
+        )
+
+    # -- reading (O(1), no I/O) ---------------------------------------------
+
+    def results(self) -> List[CheckResult]:
+        """The last check results; empty before the first run."""
+        checked_at = self._checked_at
+        if checked_at is None:
+            return []
+        age = time.monotonic() - checked_at
+        if age > self.stale_after_seconds:
+            return [*self._results, CheckResult("monitor", FAILING, {"error": "stale", "age_seconds": round(age, 3)})]
+        return self._results
+
+    def report(self) -> Dict[str, Any]:
+        checked_at = self._checked_at
+        return {
+            "checked_at": self._checked_at_wall,
+            "age_seconds": round(time.monotonic() - checked_at, 3) if checked_at is not None else None,
+            "checks": {r.name: r.as_dict() for r in self.results()},
+        }
+
+    # -- checking -------------------------------------------------------------
+
+    async def check_once(self) -> List[CheckResult]:
+        results = [*await self._check_database(), *self._check_executors()]
+        self._results = results
+        self._checked_at = time.monotonic()
+        self._checked_at_wall = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return results
+
+    async def _check_database(self) -> List[CheckResult]:
+        started = time.perf_counter()
+        try:
+            stats, pending = await asyncio.wait_for(self._ping(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            # The connection may be mid-query; the next check starts on a fresh one
+            self._drop_connection()
+            return [CheckResult("database", FAILING, {"error": f"no answer within {self.timeout_seconds:g}s"})]
+        except Exception as e:
+            self._drop_connection()
+            return [CheckResult("database", FAILING, {"error": f"{type(e).__name__}: {e}"})]
+        return [
+            CheckResult("database", OK, {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}),
+            CheckResult("migrations", FAILING if pending else OK, {"pending": pending}),
+            CheckResult(
+                "async_pool",
+                utilization_status(stats["in_use"], stats["max_size"], self.degraded_utilization),
+                {"in_use": stats["in_use"], "size": stats["size"], "max_size": stats["max_size"]},
+            ),
+        ]
+
+    async def _ping(self) -> Tuple[Dict[str, Any], List[str]]:
+        stats = await async_pool_stats()
+        conn = await self._connection()
+        await conn.fetchval("SELECT 1")
+        return stats, await pending_migrations(conn)
+
+    async def _connection(self) -> asyncpg.Connection:
+        loop = asyncio.get_running_loop()
+        if self._conn is not None and (self._conn_loop is not loop or self._conn.is_closed()):
+            self._drop_connection()
+        if self._conn is None:
+            self._conn = await asyncpg.connect(**async_connect_kwargs(), timeout=self.timeout_seconds)
+            self._conn_loop = loop
+        return self._conn
+
+    def _drop_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                conn.terminate()
+            except Exception:
+                pass  # its event loop is gone, and the socket with it
+
+    def _check_executors(self) -> List[CheckResult]:
+        results = []
+        stats = sync_pool.existing_pool_stats()
+        if stats is not None:
+            status = utilization_status(stats["in_use"], stats["max_size"], self.degraded_utilization)
+            if stats["waiting"]:
+                status = DEGRADED
+            results.append(
+                CheckResult(
+                    "sync_pool",
+                    status,
+                    {"in_use": stats["in_use"], "max_size": stats["max_size"], "waiting": stats["waiting"]},
+                )
+            )
+        kdf = get_kdf_executor().stats()
+        results.append(
+            CheckResult(
+                "kdf_executor",
+                utilization_status(kdf["queue_depth"], kdf["max_queue"], self.degraded_utilization),
+                {"queue_depth": kdf["queue_depth"], "max_queue": kdf["max_queue"]},
+            )
+        )
+        return results
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.check_once()
+            except Exception as e:
+                # The last result is left to go stale, which fails readiness
+                logger.warning(f"Health check failed to run: {e}")
+
+    def start(self) -> None:
+        """Check every interval from now on; the app runs the first check itself at startup."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._check_forever())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._conn is not None and self._conn_loop is asyncio.get_running_loop() and not self._conn.is_closed():
+            try:
+                await self._conn.close(timeout=self.timeout_seconds)
+            except Exception:
+                pass
+        self._drop_connection()
+
+
+health_monitor = HealthMonitor.from_config(config.get("health", {}) or {})
@@ -0,0 +1,295 @@
+"""Note attachments: resumable chunked uploads into a content-addressed blob store.
+
+An upload is registered with its final size, then sent as any number of
+chunks, each appended at the offset the server has durably received. Bytes
+are streamed to the staging area and hashed as they arrive (nothing holds more
+than WRITE_BUFFER_BYTES of a transfer), and the running hash is kept per
+upload so a resumed upload does not re-read what it already sent. When the
+last byte arrives the upload is committed under its sha256; identical content
+is stored once.
+
+Garbage collection of idle uploads and unreferenced blobs runs outside the
+request path:
+
+    python -m src.application.notes.attachments --gc
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+
+from src.config import config
+from src.infrastructure.database.async_pool import close_async_pool
+from src.infrastructure.repositories import attachments_repository as attachments_repo
+# UploadBusyError is re-exported for the routes
+from src.infrastructure.storage.blob_store import UploadBusyError, UploadWriter, get_blob_store  # noqa: F401
+
+
+_cfg = config.get("attachments", {}) or {}
+MAX_ATTACHMENT_BYTES = int(_cfg.get("max_size_bytes", 512 * 1024 * 1024))
+# Suggested client chunk size; any size works
+CHUNK_SIZE_BYTES = int(_cfg.get("chunk_size_bytes", 8 * 1024 * 1024))
+ALLOWED_CONTENT_TYPES = frozenset(
+    _cfg.get(
+        "allowed_content_types",
+        ["image/png", "image/jpeg", "image/gif", "image/webp", "application/pdf"],
+    )
+)
+UPLOAD_TTL_SECONDS = float(_cfg.get("upload_ttl_seconds", 24 * 3600))
+BLOB_GRACE_SECONDS = float(_cfg.get("blob_grace_seconds", 3600))
+# Downloads are handed to the front proxy under this prefix when set (nginx X-Accel-Redirect)
+X_ACCEL_REDIRECT = _cfg.get("x_accel_redirect")
+MAX_FILENAME_LENGTH = 255
+# Incoming bytes are written (and hashed) in a worker thread once this much is buffered
+WRITE_BUFFER_BYTES = 1024 * 1024
+# Running hashes kept for resumable uploads; evicted ones are rebuilt from disk
+MAX_CACHED_HASHES = 1024
+
+
+class UploadOffsetError(Exception):
+    """A chunk was sent for an offset other than the one the server has received."""
+
+    def __init__(self, offset: int):
+        super().__init__("Upload offset mismatch")
+        self.offset = offset
+
+
+# upload id -> (offset, sha256 state at that offset)
+_hashes: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+
+
+def _remember_hash(upload_id: str, offset: int, hasher) -> None:
+    _hashes[upload_id] = (offset, hasher)
+    _hashes.move_to_end(upload_id)
+    while len(_hashes) > MAX_CACHED_HASHES:
+        _hashes.popitem(last=False)
+
+
+def _rehash(upload_id: str, length: int):
+    hasher = hashlib.sha256()
+    for chunk in get_blob_store().iter_upload(upload_id, length):
+        hasher.update(chunk)
+    return hasher
+
+
+def _append(writer: UploadWriter, hasher, data: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so this overlaps with the event loop
+    hasher.update(data)
+    writer.write(data)
+
+
+def _public_upload(upload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": upload["id"],
+        "note_id": upload["note_id"],
+        "filename": upload["filename"],
+        "content_type": upload["content_type"],
+        "size": upload["size"],
+        "offset": upload["received"],
+        "chunk_size": CHUNK_SIZE_BYTES,
+    }
+
+
+async def start_upload(user_id: int, note_id: int, filename: str, content_type: str, size: int) -> Dict[str, Any]:
+    filename = os.path.basename((filename or "").replace("\\", "/")).strip()
+    if not filename or len(filename) > MAX_FILENAME_LENGTH:
+        raise ValueError(f"Filename must be 1 to {MAX_FILENAME_LENGTH} characters long")
+    # NUL cannot be stored, and the others would end up in Content-Disposition headers
+    if any(unicodedata.category(c) == "Cc" for c in filename):
+        raise ValueError("Filename must not contain control characters")
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise ValueError(f"Content type must be one of: {', '.join(sorted(ALLOWED_CONTENT_TYPES))}")
+    if size <= 0 or size > MAX_ATTACHMENT_BYTES:
+        raise ValueError(f"Size must be between 1 and {MAX_ATTACHMENT_BYTES} bytes")
+    upload = await attachments_repo.create_upload(user_id, note_id, filename, content_type, size)
+    if upload is None:
+        raise LookupError("Note not found")
+    return _public_upload(upload)
+
+
+async def get_upload(user_id: int, note_id: int, upload_id: str) -> Dict[str, Any]:
+    upload = await attachments_repo.get_upload(user_id, note_id, upload_id)
+    if upload is None:
+        raise LookupError("Upload not found")
+    return _public_upload(upload)
+
+
+async def write_chunk(
+    user_id: int, note_id: int, upload_id: str, offset: int, chunks: AsyncIterable[bytes]
+) -> Dict[str, Any]:
+    """Append a chunk at `offset`; completes the upload when its last byte arrives.
+
+    Whatever arrived before a client disconnect is kept, so the next chunk can
+    resume from the returned (or later queried) offset. Returns the upload's
+    state, with an `attachment` once complete.
+    """
+    upload = await attachments_repo.get_upload(user_id, note_id, upload_id)
+    if upload is None:
+        raise LookupError("Upload not found")
+    if offset != upload["received"]:
+        raise UploadOffsetError(upload["received"])
+
+    store = get_blob_store()
+    writer = await asyncio.to_thread(store.open_upload, upload_id)
+    position = received = offset
+    try:
+        # Re-read under the lock: a chunk that held it may have moved the offset meanwhile
+        upload = await attachments_repo.get_upload(user_id, note_id, upload_id)
+        if upload is None:
+            raise LookupError("Upload not found")
+        if upload["received"] != received:
+            raise UploadOffsetError(upload["received"])
+        size = upload["size"]
+        staged = await asyncio.to_thread(lambda: writer.size)
+        if staged < received:
+            # The staged bytes are gone (e.g. lost with a disk); the client starts over
+            await attachments_repo.set_upload_received(upload_id, received, 0)
+            await asyncio.to_thread(writer.truncate, 0)
+            raise UploadOffsetError(0)
+        if staged > received:
+            # Bytes past the recorded offset were never acknowledged; drop them
+            await asyncio.to_thread(writer.truncate, received)
+        cached = _hashes.pop(upload_id, None)
+        if cached is not None and cached[0] == received:
+            hasher = cached[1]
+        else:
+            hasher = await asyncio.to_thread(_rehash, upload_id, received)
+
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                if position + len(buffer) + len(chunk) > size:
+                    raise ValueError(f"Upload is larger than the declared {size} bytes")
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    await asyncio.to_thread(_append, writer, hasher, bytes(buffer))
+                    position += len(buffer)
+                    buffer.clear()
+        except ValueError:
+            await asyncio.to_thread(writer.truncate, received)
+            position = received
+            hasher = None
+            raise
+        finally:
+            if buffer and hasher is not None:
+                await asyncio.to_thread(_append, writer, hasher, bytes(buffer))
+                position += len(buffer)
+            if hasher is not None:
+                _remember_hash(upload_id, position, hasher)
+    finally:
+        await asyncio.to_thread(writer.close)
+        if position != received:
+            await attachments_repo.set_upload_received(upload_id, received, position)
+
+    upload["received"] = position
+    state = _public_upload(upload)
+    if position == size:
+        _hashes.pop(upload_id, None)
+        sha256 = hasher.hexdigest()
+        attachment = await attachments_repo.complete_upload(
+            upload_id, sha256, lambda: asyncio.to_thread(store.commit_upload, upload_id, sha256)
+        )
+        if attachment is None:
+            raise LookupError("Upload not found")
+        state["attachment"] = attachment
+    return state
+
+
+async def abort_upload(user_id: int, note_id: int, upload_id: str) -> None:
+    if not await attachments_repo.delete_upload(user_id, note_id, upload_id):
+        raise LookupError("Upload not found")
+    _hashes.pop(upload_id, None)
+    await asyncio.to_thread(get_blob_store().discard_upload, upload_id)
+
+
+async def list_attachments(user_id: int, note_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    return {"items": await attachments_repo.list_attachments(user_id, note_id)}
+
+
+async def get_attachment(user_id: int, note_id: int, attachment_id: int) -> Dict[str, Any]:
+    attachment = await attachments_repo.get_attachment(user_id, note_id, attachment_id)
+    if attachment is None:
+        raise LookupError("Attachment not found")
+    return attachment
+
+
+def blob_location(sha256: str) -> Tuple[Optional[str], Optional[str]]:
+    """(local path, X-Accel-Redirect URI) for serving a blob; the URI is None unless configured."""
+    store = get_blob_store()
+    accel = f"{X_ACCEL_REDIRECT.rstrip('/')}/{store.relative_path(sha256)}" if X_ACCEL_REDIRECT else None
+    return store.local_path(sha256), accel
+
+
+async def delete_attachment(user_id: int, note_id: int, attachment_id: int) -> None:
+    if not await attachments_repo.delete_attachment(user_id, note_id, attachment_id):
+        raise LookupError("Attachment not found")
+
+
+async def collect_garbage(
+    upload_ttl_seconds: float = UPLOAD_TTL_SECONDS,
+    blob_grace_seconds: float = BLOB_GRACE_SECONDS,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """Drop idle uploads, staged files without an upload, unreferenced blobs and blob files without a row."""
+    store = get_blob_store()
+    expired = await attachments_repo.expire_uploads(upload_ttl_seconds)
+    stale = await asyncio.to_thread(store.list_uploads, upload_ttl_seconds)
+    alive = set(await attachments_repo.existing_uploads(stale)) if stale else set()
+    staged = set(expired) | (set(stale) - alive)
+    for upload_id in staged:
+        await asyncio.to_thread(store.discard_upload, upload_id)
+
+    async def remove(digests: List[str]) -> None:
+        for sha256 in digests:
+            await asyncio.to_thread(store.delete, sha256)
+
+    blobs = 0
+    while True:
+        deleted = await attachments_repo.delete_orphan_blobs(blob_grace_seconds, batch_size, remove)
+        blobs += deleted
+        if deleted < batch_size:
+            break
+
+    # Bytes placed by an upload whose transaction then failed to commit
+    stored = await asyncio.to_thread(store.list_blobs, blob_grace_seconds)
+    unknown: List[str] = []
+    for start in range(0, len(stored), batch_size):
+        digests = stored[start:start + batch_size]
+        known = set(await attachments_repo.existing_blobs(digests))
+        unknown.extend(sha256 for sha256 in digests if sha256 not in known)
+    await remove(unknown)
+    return {"uploads": len(expired), "staged_files": len(staged), "blobs": blobs, "blob_files": len(unknown)}
+
+
+async def _collect_and_close(*args) -> Dict[str, int]:
+    try:
+        return await collect_garbage(*args)
+    finally:
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Note attachment maintenance.")
+    parser.add_argument("--gc", action="store_true", help="remove idle uploads and unreferenced blobs")
+    parser.add_argument("--upload-ttl-seconds", type=float, default=UPLOAD_TTL_SECONDS)
+    parser.add_argument("--blob-grace-seconds", type=float, default=BLOB_GRACE_SECONDS)
+    args = parser.parse_args()
+    if not args.gc:
+        parser.error("nothing to do (use --gc)")
+
+    started = time.perf_counter()
+    result = asyncio.run(_collect_and_close(args.upload_ttl_seconds, args.blob_grace_seconds))
+    print(
+        f"removed {result['uploads']} idle uploads, {result['staged_files']} staged files, "
+        f"{result['blobs']} blobs and {result['blob_files']} blob files without a row "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Bulk note actions (tag, untag, file, delete a selection) in one request.
+
+The whole batch is validated before anything runs; an invalid operation
+rejects the batch. Valid batches run in one transaction with one multi-row
+statement per kind of operation, applied in OPERATIONS order. Operations on
+notes (or notebooks) the user does not have are reported per item and do not
+stop the others, and neither do tag operations that would leave a note with
+more than MAX_TAGS_PER_NOTE tags.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from src.domain.notes.ids import is_valid_id
+from src.domain.notes.tags import MAX_TAGS_PER_NOTE, normalize_tags
+from src.infrastructure.repositories import notes_repository as notes_repo
+
+
+OPERATIONS = ("tag", "untag", "file", "delete")
+MAX_BATCH_OPERATIONS = 1000
+
+
+class BatchValidationError(Exception):
+    """One or more operations of a batch are invalid; nothing was applied."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__("Invalid batch")
+        self.errors = errors
+
+
+def _validate(operations: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchValidationError([{"index": None, "detail": f"At most {MAX_BATCH_OPERATIONS} operations"}])
+    errors = []
+    seen = set()
+    validated = []
+    for index, operation in enumerate(operations):
+        op, note_id = operation.get("op"), operation.get("id")
+        try:
+            if op not in OPERATIONS:
+                raise ValueError(f"Unknown operation {op!r}")
+            if not is_valid_id(note_id):
+                raise ValueError(f"Invalid note id {note_id!r}")
+            notebook_id = operation.get("notebook_id")
+            if notebook_id is not None and not is_valid_id(notebook_id):
+                raise ValueError(f"Invalid notebook id {notebook_id!r}")
+            if (op, note_id) in seen:
+                raise ValueError(f"Note {note_id} appears twice in {op!r} operations")
+            seen.add((op, note_id))
+            tags: List[str] = []
+            if op in ("tag", "untag"):
+                tags = normalize_tags(operation.get("tags") or ())
+                if not tags:
+                    raise ValueError("Tag operations need at least one tag")
+            validated.append({"op": op, "id": note_id, "tags": tags, "notebook_id": notebook_id})
+        except ValueError as e:
+            errors.append({"index": index, "detail": str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+    return validated
+
+
+def _status(operation: Dict[str, Any], notes: Set[int], notebooks: Set[int], over_limit: Set[int]) -> str:
+    if operation["id"] not in notes:
+        return "not_found"
+    if operation["op"] == "tag" and operation["id"] in over_limit:
+        return "too_many_tags"
+    notebook_id: Optional[int] = operation["notebook_id"]
+    if operation["op"] == "file" and notebook_id is not None and notebook_id not in notebooks:
+        return "notebook_not_found"
+    return "ok"
+
+
+async def run_batch(user_id: int, operations: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate and apply `operations` ({op, id, tags?, notebook_id?} dicts); one result per item."""
+    validated = _validate(operations)
+    by_op: Dict[str, List[Dict[str, Any]]] = {op: [] for op in OPERATIONS}
+    for operation in validated:
+        by_op[operation["op"]].append(operation)
+
+    notes, notebooks, over_limit = await notes_repo.apply_batch(
+        user_id,
+        note_ids=sorted({operation["id"] for operation in validated}),
+        notebook_ids=sorted({o["notebook_id"] for o in by_op["file"] if o["notebook_id"] is not None}),
+        tags_added=[(o["id"], tag) for o in by_op["tag"] for tag in o["tags"]],
+        tags_removed=[(o["id"], tag) for o in by_op["untag"] for tag in o["tags"]],
+        filed=[(o["id"], o["notebook_id"]) for o in by_op["file"]],
+        deleted=[o["id"] for o in by_op["delete"]],
+        max_tags=MAX_TAGS_PER_NOTE,
+    )
+    items = [
+        {"index": index, "op": operation["op"], "id": operation["id"], "status": _status(operation, notes, notebooks, over_limit)}
+        for index, operation in enumerate(validated)
+    ]
+    return {"items": items, "applied": sum(item["status"] == "ok" for item in items)}
@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional
+
+from src.domain.notes.cursor import cursor_int, decode_cursor, encode_cursor, from_micros, to_micros
+from src.infrastructure.repositories import notebooks_repository as notebooks_repo
+from src.infrastructure.repositories import notes_repository as notes_repo
+
+
+MAX_NAME_LENGTH = 200
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _validate_name(name: str) -> str:
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Notebook name must not be empty")
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"Notebook name must be at most {MAX_NAME_LENGTH} characters long")
+    if "\x00" in name:
+        raise ValueError("Notebook name must not contain NUL characters")
+    return name
+
+
+async def create_notebook(user_id: int, name: str, parent_id: Optional[int] = None) -> Dict[str, Any]:
+    notebook = await notebooks_repo.create_notebook(user_id, _validate_name(name), parent_id)
+    if notebook is None:
+        raise LookupError("Parent notebook not found")
+    return notebook
+
+
+async def list_root_notebooks(user_id: int) -> Dict[str, Any]:
+    return {"items": await notebooks_repo.list_root_notebooks(user_id)}
+
+
+async def get_notebook(user_id: int, notebook_id: int) -> Dict[str, Any]:
+    notebook = await notebooks_repo.get_notebook(user_id, notebook_id)
+    if not notebook:
+        raise LookupError("Notebook not found")
+    counts = await notebooks_repo.count_subtree(user_id, notebook_id)
+    return dict(notebook, descendant_count=counts["notebooks"] - 1, subtree_note_count=counts["notes"])
+
+
+async def get_tree(user_id: int, notebook_id: int) -> Dict[str, Any]:
+    """The whole subtree (breadth-first) with direct and subtree note counts per notebook."""
+    rows = await notebooks_repo.list_subtree(user_id, notebook_id)
+    if not rows:
+        raise LookupError("Notebook not found")
+    # Rows arrive ordered by depth, so folding deepest-first rolls counts up to the root
+    by_id = {row["id"]: row for row in rows}
+    for row in rows:
+        row["subtree_note_count"] = row["note_count"]
+    for row in reversed(rows[1:]):
+        by_id[row["parent_id"]]["subtree_note_count"] += row["subtree_note_count"]
+    return {"items": rows}
+
+
+async def update_notebook(
+    user_id: int, notebook_id: int, name: Optional[str] = None, parent_id: Optional[int] = None, move: bool = False
+) -> Dict[str, Any]:
+    """Rename and/or move; `move=True` with `parent_id=None` makes it a root notebook."""
+    notebook = None
+    if name is not None:
+        notebook = await notebooks_repo.rename_notebook(user_id, notebook_id, _validate_name(name))
+        if notebook is None:
+            raise LookupError("Notebook not found")
+    if move:
+        notebook = await notebooks_repo.move_notebook(user_id, notebook_id, parent_id)
+        if notebook is None:
+            raise LookupError("Notebook not found")
+    if notebook is None:
+        notebook = await notebooks_repo.get_notebook(user_id, notebook_id)
+        if notebook is None:
+            raise LookupError("Notebook not found")
+    return notebook
+
+
+async def delete_notebook(user_id: int, notebook_id: int) -> int:
+    deleted = await notebooks_repo.delete_notebook(user_id, notebook_id)
+    if not deleted:
+        raise LookupError("Notebook not found")
+    return deleted
+
+
+async def list_notebook_notes(
+    user_id: int, notebook_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Notes filed anywhere under a notebook, newest first, in cursor pages."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = None
+    if cursor:
+        micros, note_id = decode_cursor(cursor, 2)
+        after = (from_micros(cursor_int(micros)), cursor_int(note_id))
+    rows = await notes_repo.list_notebook_notes(user_id, notebook_id, limit=limit + 1, after=after)
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(to_micros(last["updated_at"]), last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def file_note(user_id: int, note_id: int, notebook_id: Optional[int]) -> None:
+    """Put a note in a notebook, or take it out of any with `notebook_id=None`."""
+    filed = await notes_repo.set_notebook(user_id, note_id, notebook_id)
+    if filed is None:
+        raise LookupError("Note not found")
+    if filed is False:
+        raise LookupError("Notebook not found")
@@ -0,0 +1,214 @@
+"""Note Markdown rendered to sanitized HTML, cached by content.
+
+Renders are keyed by sha256 over the renderer version and the body (see
+src.domain.notes.markdown), so an unchanged note is rendered once no matter
+how often it is viewed, notes with identical bodies share a render, and a
+renderer upgrade misses every old entry instead of serving stale HTML.
+
+Lookups go to a bounded in-process LRU, then to the `note_renders` table
+shared by all workers, and only then render (in a thread, off the event
+loop). After a renderer upgrade the table is refilled on a process pool,
+outside the request path:
+
+    python -m src.application.notes.rendering --rerender --workers 8
+
+and, once no worker runs the old renderer, `--purge` drops stale rows.
+"""
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from src.application.notes import service as notes_service
+from src.config import config
+from src.domain.notes.markdown import RENDERER_VERSION, render_key, render_markdown
+from src.infrastructure.cache.ttl_lru import TTLCache
+from src.infrastructure.database.async_pool import close_async_pool
+from src.infrastructure.repositories import renders_repository as renders_repo
+
+
+_cfg = config.get("notes", {}).get("render", {})
+RERENDER_WORKERS = int(_cfg.get("rerender_workers", 0)) or (os.cpu_count() or 1)
+RERENDER_BATCH_SIZE = 500
+
+
+class RenderCache:
+    """Two-tier render cache: in-process LRU over the shared `note_renders` table.
+
+    The LRU holds at most `max_entries` renders totalling at most `max_bytes`
+    of HTML. Renders larger than `max_entry_bytes` skip it so a few huge notes
+    cannot push out everything else; they are still served from the table.
+    """
+
+    def __init__(
+        self, max_entries: int = 2000, max_entry_bytes: int = 256 * 1024, max_bytes: int = 64 * 1024 * 1024
+    ):
+        self._memory = TTLCache(max_entries, max_bytes=max_bytes)
+        self.max_entry_bytes = max_entry_bytes
+        self.stored_hits = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.render_max_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "RenderCache":
+        return cls(
+            max_entries=int(cfg.get("memory_max_entries", 2000)),
+            max_entry_bytes=int(cfg.get("memory_max_entry_bytes", 256 * 1024)),
+            max_bytes=int(cfg.get("memory_max_bytes", 64 * 1024 * 1024)),
+        )
+
+    async def render(self, text: str) -> str:
+        key = render_key(text)
+        html = self._memory.get(key)
+        if html is not None:
+            return html
+        html = await renders_repo.get_render(key)
+        if html is not None:
+            self.stored_hits += 1
+        else:
+            started = time.perf_counter()
+            html = await asyncio.to_thread(render_markdown, text)
+            elapsed = time.perf_counter() - started
+            self.renders += 1
+            self.render_seconds += elapsed
+            self.render_max_seconds = max(self.render_max_seconds, elapsed)
+            await renders_repo.put_renders(RENDERER_VERSION, [(key, html, elapsed * 1000)])
+        if len(html) <= self.max_entry_bytes:
+            self._memory.set(key, html, math.inf)
+        return html
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self._memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            "renderer_version": RENDERER_VERSION,
+            "lookups": lookups,
+            "memory_hits": memory["hits"],
+            "stored_hits": self.stored_hits,
+            "renders": self.renders,
+            "hit_ratio": round((memory["hits"] + self.stored_hits) / lookups, 4) if lookups else 0.0,
+            "memory": {k: memory[k] for k in ("size", "max_entries", "bytes", "max_bytes", "evictions")},
+            "render_seconds": {
+                "count": self.renders,
+                "sum": round(self.render_seconds, 6),
+                "mean": round(self.render_seconds / self.renders, 6) if self.renders else 0.0,
+                "max": round(self.render_max_seconds, 6),
+            },
+        }
+
+
+render_cache = RenderCache.from_config(_cfg)
+
+
+async def get_rendered_note(user_id: int, note_id: int) -> Dict[str, Any]:
+    note = await notes_service.get_note(user_id, note_id)
+    return {
+        "id": note["id"],
+        "version": note["version"],
+        "notebook_id": note["notebook_id"],
+        "tags": note["tags"],
+        "title": note["title"],
+        "html": await render_cache.render(note["body"]),
+    }
+
+
+def _timed_render(text: str) -> Tuple[str, float]:
+    started = time.perf_counter()
+    html = render_markdown(text)
+    return html, (time.perf_counter() - started) * 1000
+
+
+async def _render_batch(executor: ProcessPoolExecutor, workers: int, todo: Dict[str, str]) -> int:
+    if not todo:
+        return 0
+    keys, texts = list(todo), list(todo.values())
+    # A few chunks per worker: fewer round trips, still balanced when sizes vary
+    chunksize = max(1, len(texts) // (4 * workers))
+    results: List[Tuple[str, float]] = await asyncio.to_thread(
+        lambda: list(executor.map(_timed_render, texts, chunksize=chunksize))
+    )
+    await renders_repo.put_renders(RENDERER_VERSION, [(k, html, ms) for k, (html, ms) in zip(keys, results)])
+    return len(keys)
+
+
+async def rerender_all(
+    workers: int = RERENDER_WORKERS, batch_size: int = RERENDER_BATCH_SIZE, purge: bool = False
+) -> Dict[str, int]:
+    """Render every note body missing from `note_renders` for the current renderer.
+
+    Batches are read in id order; while the pool renders one batch the next is
+    fetched and hashed. Returns how many notes were scanned, rendered and purged.
+    """
+    # spawn: forking a process that runs an event loop and threads is unsafe
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    scanned = rendered = 0
+    after_id = 0
+    pending = None
+    try:
+        while True:
+            notes = await renders_repo.list_note_bodies(after_id, batch_size)
+            if not notes:
+                break
+            after_id = notes[-1]["id"]
+            scanned += len(notes)
+            todo = {render_key(n["body"]): n["body"] for n in notes}
+            for key in await renders_repo.existing_renders(list(todo)):
+                del todo[key]
+            if pending is not None:
+                rendered += await pending
+            pending = asyncio.ensure_future(_render_batch(executor, workers, todo))
+        if pending is not None:
+            rendered += await pending
+    finally:
+        executor.shutdown(cancel_futures=True)
+    purged = await renders_repo.purge_renders(RENDERER_VERSION) if purge else 0
+    return {"scanned": scanned, "rendered": rendered, "purged": purged}
+
+
+async def _rerender_and_close(*args) -> Dict[str, int]:
+    try:
+        return await rerender_all(*args)
+    finally:
+        await close_async_pool()
+
+
+async def _purge_and_close() -> int:
+    try:
+        return await renders_repo.purge_renders(RENDERER_VERSION)
+    finally:
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill the note render cache for the current renderer.")
+    parser.add_argument("--rerender", action="store_true", help="render every note missing from the cache")
+    parser.add_argument("--workers", type=int, default=RERENDER_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=RERENDER_BATCH_SIZE)
+    parser.add_argument(
+        "--purge", action="store_true", help="also drop renders of other renderer versions and deleted bodies"
+    )
+    args = parser.parse_args()
+    if not args.rerender and not args.purge:
+        parser.error("nothing to do (use --rerender and/or --purge)")
+
+    started = time.perf_counter()
+    if args.rerender:
+        result = asyncio.run(_rerender_and_close(args.workers, args.batch_size, args.purge))
+    else:
+        result = {"scanned": 0, "rendered": 0, "purged": asyncio.run(_purge_and_close())}
+    print(
+        f"{RENDERER_VERSION}: scanned {result['scanned']} notes, rendered {result['rendered']}, "
+        f"purged {result['purged']} stale renders in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Note revision history stored as periodic snapshots plus deltas.
+
+Every note version becomes a revision. Most are stored as a delta on the
+previous revision; a full snapshot is written for the first version, after a
+gap in the history, when a chain reaches `max_chain` deltas, or when the delta
+would not be smaller than the body. Rebuilding a revision therefore reads one
+snapshot and at most `max_chain` deltas.
+
+Compaction re-snapshots settled revisions so chains stay within
+`compact_chain`. It runs outside the request path:
+
+    python -m src.application.notes.revisions --compact-chain 10
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+from src.domain.notes.cursor import cursor_int, decode_cursor, encode_cursor
+from src.domain.notes.delta import apply_delta, make_delta
+from src.infrastructure.database.async_pool import close_async_pool
+from src.infrastructure.repositories import notes_repository as notes_repo
+from src.infrastructure.repositories import revisions_repository as revisions_repo
+
+
+_cfg = config.get("notes", {}).get("revisions", {})
+MAX_CHAIN = int(_cfg.get("max_chain", 50))
+COMPACT_CHAIN = int(_cfg.get("compact_chain", 10))
+COMPACT_MIN_AGE_SECONDS = float(_cfg.get("compact_min_age_seconds", 600))
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+async def record_revision(
+    note: Dict[str, Any], previous_body: Optional[str] = None, max_chain: int = MAX_CHAIN
+) -> None:
+    """Store the revision for `note`'s current version; `previous_body` is the version before."""
+    if previous_body is not None:
+        delta = make_delta(previous_body, note["body"])
+        if len(delta) < len(note["body"]) and await revisions_repo.insert_delta(
+            note["id"], note["version"], note["title"], delta, max_chain
+        ):
+            return
+    await revisions_repo.insert_snapshot(note["id"], note["version"], note["title"], note["body"])
+
+
+async def record_patch(
+    user_id: int, note_id: int, revision: int, title: str, delta: str, length: int, max_chain: int = MAX_CHAIN
+) -> None:
+    """Store a revision whose delta is already known (from a patch) without reading the body.
+
+    The body is only fetched when a snapshot is due. If the note has moved on by
+    then, the revision is skipped and the next one starts a new chain.
+    """
+    if len(delta) < length and await revisions_repo.insert_delta(note_id, revision, title, delta, max_chain):
+        return
+    note = await notes_repo.get_note(user_id=user_id, note_id=note_id)
+    if note and note["version"] == revision:
+        await revisions_repo.insert_snapshot(note_id, revision, note["title"], note["body"])
+
+
+async def list_revisions(
+    user_id: int, note_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    before = None
+    if cursor:
+        (before,) = decode_cursor(cursor, 1)
+        before = cursor_int(before, bits=32)  # revision is an INTEGER column
+    rows = await revisions_repo.list_revisions(user_id, note_id, limit=limit + 1, before=before)
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]["revision"]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def get_revision(user_id: int, note_id: int, revision: int) -> Dict[str, Any]:
+    """Rebuild one revision from its snapshot and the deltas after it."""
+    chain = await revisions_repo.load_chain(user_id, note_id, revision)
+    if not chain or chain[-1]["revision"] != revision:
+        raise LookupError("Revision not found")
+    body = chain[0]["body"]
+    for step in chain[1:]:
+        body = apply_delta(body, step["delta"])
+    last = chain[-1]
+    return {
+        "note_id": note_id,
+        "revision": revision,
+        "title": last["title"],
+        "body": body,
+        "created_at": last["created_at"],
+    }
+
+
+async def compact_revisions(
+    compact_chain: int = COMPACT_CHAIN,
+    min_age_seconds: float = COMPACT_MIN_AGE_SECONDS,
+    batch_size: int = 100,
+) -> Dict[str, int]:
+    """Snapshot every `compact_chain`-th settled revision of notes with longer chains.
+
+    Only revisions older than `min_age_seconds` are touched, so notes still being
+    edited keep their cheap delta writes. Each note's history is replayed once.
+    """
+    seen = set()
+    snapshots = 0
+    while True:
+        found = await revisions_repo.find_long_chains(compact_chain, min_age_seconds, batch_size)
+        note_ids = [note_id for note_id in found if note_id not in seen]
+        if not note_ids:
+            break
+        for note_id in note_ids:
+            seen.add(note_id)
+            history = await revisions_repo.load_history(note_id, min_age_seconds)
+            body = None
+            since_snapshot = 0
+            new_snapshots = []
+            for row in history:
+                if row["delta"] is None:
+                    body, since_snapshot = row["body"], 0
+                    continue
+                if body is None:
+                    continue
+                body = apply_delta(body, row["delta"])
+                since_snapshot += 1
+                if since_snapshot > compact_chain:
+                    new_snapshots.append((row["revision"], body))
+                    since_snapshot = 0
+            snapshots += await revisions_repo.convert_to_snapshots(note_id, new_snapshots)
+        if len(found) < batch_size:
+            break
+    return {"notes": len(seen), "snapshots": snapshots}
+
+
+async def _compact_and_close(*args) -> Dict[str, int]:
+    try:
+        return await compact_revisions(*args)
+    finally:
+        await close_async_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-snapshot long note revision chains.")
+    parser.add_argument("--compact-chain", type=int, default=COMPACT_CHAIN, help="longest chain to keep")
+    parser.add_argument(
+        "--min-age-seconds", type=float, default=COMPACT_MIN_AGE_SECONDS, help="skip revisions newer than this"
+    )
+    parser.add_argument("--batch-size", type=int, default=100, help="notes fetched per scan")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = asyncio.run(_compact_and_close(args.compact_chain, args.min_age_seconds, args.batch_size))
+    print(
+        f"compacted {result['notes']} notes, wrote {result['snapshots']} snapshots "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import html
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.application.notes import revisions
+from src.domain.notes.cursor import cursor_int, decode_cursor, encode_cursor, from_micros, to_micros
+from src.domain.notes.delta import changed_range, ops_delta, validate_text_ops
+from src.domain.notes.ids import MAX_ID, is_valid_id
+from src.domain.notes.tags import normalize_tags
+from src.infrastructure.repositories import notes_repository as notes_repo
+
+
+MAX_TITLE_LENGTH = 200
+MAX_BODY_LENGTH = 1_000_000
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_QUERY_LENGTH = 256
+# Largest finite float4, the type of ts_rank_cd() that search cursors are compared with
+MAX_RANK = 3.4e38
+MAX_FILTER_TAGS = 10
+# A body at MAX_BODY_LENGTH can grow ~6x when JSON-escaped
+MAX_IMPORT_LINE_BYTES = 8 * 1024 * 1024
+EXPORT_CHUNK_BYTES = 64 * 1024
+MAX_PATCH_OPS = 1000
+# Larger concurrent changes are not echoed back; the client reloads the note instead
+MAX_REBASE_TEXT_LENGTH = 64 * 1024
+
+
+class VersionConflictError(Exception):
+    """A patch was based on an outdated version of the note."""
+
+    def __init__(self, current_version: int, rebase: Optional[Dict[str, Any]] = None):
+        super().__init__("Version conflict")
+        self.current_version = current_version
+        self.rebase = rebase
+
+
+def _validate_note(title: str, body: str) -> None:
+    if len(title) > MAX_TITLE_LENGTH:
+        raise ValueError(f"Title must be at most {MAX_TITLE_LENGTH} characters long")
+    if len(body) > MAX_BODY_LENGTH:
+        raise ValueError(f"Body must be at most {MAX_BODY_LENGTH} characters long")
+    # Postgres text cannot hold NUL
+    if "\x00" in title or "\x00" in body:
+        raise ValueError("Title and body must not contain NUL characters")
+
+
+async def create_note(
+    user_id: int, title: str, body: str, tags: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    _validate_note(title, body)
+    note = await notes_repo.create_note(user_id=user_id, title=title, body=body, tags=normalize_tags(tags or ()))
+    await revisions.record_revision(note)
+    return note
+
+
+async def get_note(user_id: int, note_id: int) -> Dict[str, Any]:
+    note = await notes_repo.get_note(user_id=user_id, note_id=note_id)
+    if not note:
+        raise LookupError("Note not found")
+    return note
+
+
+async def get_note_validator(user_id: int, note_id: int) -> Dict[str, Any]:
+    """A note's version, notebook and tags, read without loading its body."""
+    validator = await notes_repo.get_note_validator(user_id=user_id, note_id=note_id)
+    if validator is None:
+        raise LookupError("Note not found")
+    return validator
+
+
+async def get_list_watermark(user_id: int) -> int:
+    return await notes_repo.get_list_watermark(user_id)
+
+
+async def update_note(
+    user_id: int, note_id: int, title: str, body: str, tags: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Overwrite title and body; `tags`, when given, replaces the note's tags."""
+    _validate_note(title, body)
+    updated = await notes_repo.update_note(
+        user_id=user_id,
+        note_id=note_id,
+        title=title,
+        body=body,
+        tags=None if tags is None else normalize_tags(tags),
+    )
+    if not updated:
+        raise LookupError("Note not found")
+    note, previous_body = updated
+    await revisions.record_revision(note, previous_body)
+    return note
+
+
+async def _rebase_hint(
+    user_id: int, note_id: int, base_version: int
+) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    # What changed since the client's base, as one range replace on the base text
+    note = await notes_repo.get_note(user_id=user_id, note_id=note_id)
+    if not note:
+        return None, None
+    try:
+        base = await revisions.get_revision(user_id, note_id, base_version)
+    except LookupError:
+        return note["version"], None
+    start, end, text = changed_range(base["body"], note["body"])
+    if len(text) > MAX_REBASE_TEXT_LENGTH:
+        return note["version"], None
+    return note["version"], {"start": start, "end": end, "text": text}
+
+
+async def patch_note(
+    user_id: int,
+    note_id: int,
+    base_version: int,
+    ops: Sequence[Tuple[int, int, str]],
+    title: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Apply text-range ops made against `base_version` and return the new version.
+
+    Offsets are character (code point) positions in the base body. On a version
+    mismatch nothing is written and VersionConflictError carries the current
+    version plus, when cheap, the single range that changed since the base.
+    """
+    if title is not None:
+        _validate_note(title, "")
+    if any("\x00" in text for _, _, text in ops):
+        raise ValueError("Title and body must not contain NUL characters")
+    if len(ops) > MAX_PATCH_OPS:
+        raise ValueError(f"At most {MAX_PATCH_OPS} operations per patch")
+    validate_text_ops(ops, MAX_BODY_LENGTH)
+    min_length = ops[-1][1] if ops else 0
+
+    result = await notes_repo.patch_note(
+        user_id, note_id, base_version, ops, title, min_length=min_length, max_length=MAX_BODY_LENGTH
+    )
+    if result is None:
+        state = await notes_repo.get_note_state(user_id=user_id, note_id=note_id)
+        if not state:
+            raise LookupError("Note not found")
+        if state["version"] != base_version:
+            current_version, rebase = await _rebase_hint(user_id, note_id, base_version)
+            if current_version is None:
+                raise LookupError("Note not found")
+            raise VersionConflictError(current_version, rebase)
+        if state["length"] < min_length:
+            raise ValueError("Operation range exceeds the note body")
+        raise ValueError(f"Body must be at most {MAX_BODY_LENGTH} characters long")
+
+    length = result["previous_length"] + sum(len(text) - (end - start) for start, end, text in ops)
+    await revisions.record_patch(
+        user_id, note_id, result["version"], result["title"], ops_delta(ops, result["previous_length"]), length
+    )
+    return {"version": result["version"]}
+
+
+async def delete_note(user_id: int, note_id: int) -> None:
+    if not await notes_repo.delete_note(user_id=user_id, note_id=note_id):
+        raise LookupError("Note not found")
+
+
+async def list_notes(
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    tags: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """One page of note summaries plus the cursor for the next page (None at the end).
+
+    With `tags`, only notes carrying all of them are listed.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    tags = normalize_tags(tags, limit=MAX_FILTER_TAGS) if tags else None
+    after = None
+    if cursor:
+        micros, note_id = decode_cursor(cursor, 2)
+        after = (from_micros(cursor_int(micros)), cursor_int(note_id))
+
+    # One extra row tells us whether another page exists
+    if tags:
+        rows = await notes_repo.list_tagged_notes(user_id=user_id, tags=tags, limit=limit + 1, after=after)
+    else:
+        rows = await notes_repo.list_notes(user_id=user_id, limit=limit + 1, after=after)
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(to_micros(last["updated_at"]), last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def get_tag_counts(user_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Every tag of the user with the number of notes carrying it, for the sidebar."""
+    return {"items": await notes_repo.get_tag_counts(user_id)}
+
+
+def _render_snippet(snippet: str) -> str:
+    # Escape the note text first, then turn the headline markers into <mark> tags
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(notes_repo.HIGHLIGHT_START, "<mark>").replace(notes_repo.HIGHLIGHT_STOP, "</mark>")
+
+
+async def search_notes(
+    user_id: int, query: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Ranked full-text search with highlighted snippets, paginated by (rank, id) cursor."""
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("Search query must not be empty")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Search query must be at most {MAX_QUERY_LENGTH} characters long")
+    if "\x00" in query:
+        raise ValueError("Search query must not contain NUL characters")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = None
+    if cursor:
+        rank, note_id = decode_cursor(cursor, 2)
+        if isinstance(rank, bool) or not isinstance(rank, (int, float)):
+            raise ValueError("Invalid cursor")
+        try:
+            rank = float(rank)
+        except OverflowError as e:
+            raise ValueError("Invalid cursor") from e
+        if not math.isfinite(rank) or abs(rank) > MAX_RANK:
+            raise ValueError("Invalid cursor")
+        after = (rank, cursor_int(note_id))
+
+    rows = await notes_repo.search_notes(user_id=user_id, query=query, limit=limit + 1, after=after)
+    items = rows[:limit]
+    for item in items:
+        item["snippet"] = _render_snippet(item["snippet"])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["rank"], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _to_ndjson(note: Dict[str, Any]) -> bytes:
+    line = {
+        "id": note["id"],
+        "title": note["title"],
+        "body": note["body"],
+        "version": note["version"],
+        "created_at": note["created_at"].isoformat(),
+        "updated_at": note["updated_at"].isoformat(),
+    }
+    return json.dumps(line, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def export_notes(user_id: int) -> AsyncIterator[bytes]:
+    """All of a user's notes as NDJSON, yielded in ~EXPORT_CHUNK_BYTES chunks."""
+    buffer = bytearray()
+    async for note in notes_repo.iter_notes(user_id):
+        buffer += _to_ndjson(note)
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    # Split an arbitrary byte stream into lines without holding more than one line
+    pending = bytearray()
+    async for chunk in chunks:
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", start)
+            if end < 0:
+                break
+            yield bytes(pending[start:end])
+            start = end + 1
+        del pending[:start]
+        if len(pending) > MAX_IMPORT_LINE_BYTES:
+            raise ValueError(f"Line exceeds {MAX_IMPORT_LINE_BYTES} bytes")
+    if pending:
+        yield bytes(pending)
+
+
+def _parse_timestamp(value: Any, field: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be an ISO 8601 string")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO 8601 string")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_import_line(line_no: int, raw: bytes) -> Tuple:
+    try:
+        item = json.loads(raw)
+        if not isinstance(item, dict):
+            raise ValueError("expected a JSON object")
+        note_id = item.get("id")
+        if note_id is not None and (not isinstance(note_id, int) or isinstance(note_id, bool)):
+            raise ValueError("id must be an integer")
+        if note_id is not None and not is_valid_id(note_id):
+            raise ValueError(f"id must be between 1 and {MAX_ID}")
+        title = item.get("title", "")
+        body = item.get("body", "")
+        if not isinstance(title, str) or not isinstance(body, str):
+            raise ValueError("title and body must be strings")
+        _validate_note(title, body)
+        created_at = _parse_timestamp(item.get("created_at"), "created_at")
+        updated_at = _parse_timestamp(item.get("updated_at"), "updated_at")
+    except ValueError as e:  # json.JSONDecodeError and UnicodeDecodeError included
+        raise ValueError(f"Line {line_no}: {e}")
+    return (line_no, note_id, title, body, created_at, updated_at)
+
+
+async def import_notes(user_id: int, chunks: AsyncIterable[bytes]) -> Dict[str, Any]:
+    """Load an NDJSON stream of notes; lines carrying one of the user's note ids update it.
+
+    Lines are parsed as the upload arrives and fed straight into COPY, so memory
+    use is bounded by one line. Any invalid line aborts the whole import.
+    """
+    started = time.perf_counter()
+
+    async def records() -> AsyncIterator[Tuple]:
+        line_no = 0
+        async for raw in _iter_lines(chunks):
+            line_no += 1
+            if raw.strip():
+                yield _parse_import_line(line_no, raw)
+
+    result = await notes_repo.import_notes(user_id, records())
+    seconds = time.perf_counter() - started
+    result["seconds"] = round(seconds, 3)
+    result["rows_per_second"] = round(result["rows"] / seconds) if seconds > 0 else None
+    return result
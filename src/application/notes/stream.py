@@ -0,0 +1,122 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from src.config import config
+from src.infrastructure.database.listener import PgListener
+from src.infrastructure.repositories import notes_repository as notes_repo
+from src.logging_config import logger
+
+
+# Sent instead of the events a subscriber missed; clients refetch their notes
+RESYNC = {"op": "resync"}
+
+
+class Subscription:
+    """One live feed: a bounded queue of change events for a single user.
+
+    When the queue is full the pending events are dropped and replaced by a
+    single resync marker, so a slow consumer costs at most `max_queue` events
+    of memory and still learns that it has to refetch.
+    """
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.dropped = 0
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Queue `event`; False (and a resync marker) if the consumer fell behind."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += self._queue.qsize() + 1
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NoteChangeHub:
+    """Fans note change notifications out to this worker's live subscribers, by user.
+
+    Every worker gets the notifications through its one shared LISTEN connection;
+    the hub only forwards each event to the subscriptions of the note's owner.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self.delivered = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.notifications = 0
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "NoteChangeHub":
+        return cls(max_queue=int(cfg.get("max_queue", 100)))
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.max_queue)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+        self.dropped += subscription.dropped
+
+    def on_notification(self, payload: str) -> None:
+        self.notifications += 1
+        try:
+            event = json.loads(payload)
+            user_id = int(event.pop("user_id"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed note change payload: {payload!r}")
+            return
+        for subscription in self._subscribers.get(user_id, ()):
+            if subscription.offer(event):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+
+    def on_listener_state(self, connected: bool) -> None:
+        # Changes made while the listener was down were never seen
+        if connected:
+            for subscribers in self._subscribers.values():
+                for subscription in subscribers:
+                    subscription.offer(RESYNC)
+
+    def stats(self) -> Dict[str, int]:
+        active = [s for subscribers in self._subscribers.values() for s in subscribers]
+        return {
+            "subscribers": len(active),
+            "users": len(self._subscribers),
+            "notifications": self.notifications,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "dropped": self.dropped + sum(s.dropped for s in active),
+        }
+
+
+_stream_cfg = config.get("notes", {}).get("stream", {})
+HEARTBEAT_SECONDS = float(_stream_cfg.get("heartbeat_seconds", 15))
+note_change_hub = NoteChangeHub.from_config(_stream_cfg)
+
+
+def subscribe_note_changes(listener: PgListener) -> None:
+    """Feed this worker's live note streams from the shared LISTEN connection."""
+    listener.subscribe(notes_repo.NOTES_CHANGED_CHANNEL, note_change_hub.on_notification)
+    listener.add_state_callback(note_change_hub.on_listener_state)
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+
+
+class Principal:
+    """The authenticated user attached to a request: just what handlers need."""
+
+    __slots__ = ("id", "email")
+
+    def __init__(self, id: int, email: str):
+        self.id = id
+        self.email = email
+
+    def __getitem__(self, key: str) -> Any:
+        # Mapping-style access kept for code written against the old user dict
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Principal):
+            return NotImplemented
+        return self.id == other.id and self.email == other.email
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.email))
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, email={self.email!r})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "email": self.email}
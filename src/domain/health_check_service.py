@@ -1,5 +1,40 @@
+from typing import Any, Dict, Optional, Sequence
+
+# Health states, best first. Degraded workers still take traffic; failing ones should not
+OK = "ok"
+DEGRADED = "degraded"
+FAILING = "failing"
+_SEVERITY = {OK: 0, DEGRADED: 1, FAILING: 2}
+
+
+class CheckResult:
+    """Outcome of one dependency check, with whatever detail explains it."""
+
+    __slots__ = ("name", "status", "detail")
+
+    def __init__(self, name: str, status: str, detail: Optional[Dict[str, Any]] = None):
+        if status not in _SEVERITY:
+            raise ValueError(f"Unknown health status {status!r}")
+        self.name = name
+        self.status = status
+        self.detail = detail or {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, **self.detail}
+
+
+def utilization_status(used: float, capacity: float, degraded_at: float) -> str:
+    """DEGRADED once `used` reaches `degraded_at` (a fraction) of `capacity`."""
+    if capacity <= 0:
+        return OK
+    return DEGRADED if used / capacity >= degraded_at else OK
+
+
 class HealthCheckService:
-    def check_health(self):
-        # In a real application, this would check database connections,
-        # external services, etc.
-        return "ok"
+    def check_health(self, results: Sequence[CheckResult] = ()) -> str:
+        """The worst status among `results`; "ok" when nothing has been checked."""
+        worst = OK
+        for result in results:
+            if _SEVERITY[result.status] > _SEVERITY[worst]:
+                worst = result.status
+        return worst
@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(*parts: Any) -> str:
+    """Opaque, URL-safe keyset cursor from JSON-serialisable sort-key values."""
+    raw = json.dumps(list(parts), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, arity: int) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(parts, list) or len(parts) != arity:
+        raise ValueError("Invalid cursor")
+    return parts
+
+
+def cursor_int(value: Any, bits: int = 64) -> int:
+    """`value` if it is an integer that fits the column (BIGINT by default); raises ValueError otherwise.
+
+    Cursor values become query parameters, and a driver refuses ones too big for
+    their column with an error that would otherwise surface as a 500.
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or not -(2 ** (bits - 1)) <= value < 2 ** (bits - 1):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def to_micros(ts: datetime) -> int:
+    """Exact integer microseconds since the epoch (no float rounding)."""
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    """Inverse of to_micros; raises ValueError outside the datetime range."""
+    try:
+        return _EPOCH + timedelta(microseconds=micros)
+    except OverflowError as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,113 @@
+import difflib
+import json
+from typing import List, Optional, Sequence, Tuple, Union
+
+# A delta is a JSON list of ops applied left to right: `[start, end]` copies
+# old[start:end], a string inserts itself. Anything not copied is deleted.
+Op = Union[List[int], str]
+
+# Above this many changed lines, fall back to one replace op instead of diffing
+_MAX_DIFF_LINES = 20_000
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # Binary search on slice equality; each comparison runs in C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, min(len(a), len(b), limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _append(ops: List[Op], op: Op) -> None:
+    # Coalesce adjacent copies and adjacent inserts
+    if ops and isinstance(op, list) and isinstance(ops[-1], list) and ops[-1][1] == op[0]:
+        ops[-1] = [ops[-1][0], op[1]]
+    elif ops and isinstance(op, str) and isinstance(ops[-1], str):
+        ops[-1] += op
+    elif op and (isinstance(op, str) or op[1] > op[0]):
+        ops.append(op)
+
+
+def diff_ops(old: str, new: str) -> List[Op]:
+    """Ops turning `old` into `new`: common prefix/suffix, then a line diff in between."""
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+
+    ops: List[Op] = []
+    _append(ops, [0, prefix])
+    old_lines = old[prefix:old_end].splitlines(keepends=True)
+    new_lines = new[prefix:new_end].splitlines(keepends=True)
+    if len(old_lines) <= 1 or len(new_lines) <= 1 or len(old_lines) + len(new_lines) > _MAX_DIFF_LINES:
+        _append(ops, new[prefix:new_end])
+    else:
+        old_offsets = [prefix]
+        for line in old_lines:
+            old_offsets.append(old_offsets[-1] + len(line))
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                _append(ops, [old_offsets[i1], old_offsets[i2]])
+            elif tag in ("replace", "insert"):
+                _append(ops, "".join(new_lines[j1:j2]))
+    _append(ops, [old_end, len(old)])
+    return ops
+
+
+def changed_range(old: str, new: str) -> Tuple[int, int, str]:
+    """Smallest single replace `(start, end, text)` turning `old` into `new`."""
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    return prefix, len(old) - suffix, new[prefix:len(new) - suffix]
+
+
+def validate_text_ops(ops: Sequence[Tuple[int, int, str]], max_length: Optional[int] = None) -> None:
+    """Text-range ops must be in order, non-overlapping and non-negative, and
+    (with `max_length`) end within a body of at most that many characters."""
+    previous_end = 0
+    for start, end, _ in ops:
+        if start < previous_end or end < start:
+            raise ValueError("Operations must be sorted, non-overlapping ranges with start <= end")
+        previous_end = end
+    if max_length is not None and previous_end > max_length:
+        raise ValueError("Operation range exceeds the note body")
+
+
+def ops_delta(ops: Sequence[Tuple[int, int, str]], old_length: int) -> str:
+    """Serialized delta for text-range ops applied to a text of `old_length` characters."""
+    delta: List[Op] = []
+    position = 0
+    for start, end, text in ops:
+        _append(delta, [position, start])
+        _append(delta, text)
+        position = end
+    _append(delta, [position, old_length])
+    return json.dumps(delta, ensure_ascii=False, separators=(",", ":"))
+
+
+def make_delta(old: str, new: str) -> str:
+    """Compact serialized delta from `old` to `new`."""
+    return json.dumps(diff_ops(old, new), ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_delta(old: str, delta: str) -> str:
+    """Rebuild the newer text from `old` and a delta made by make_delta."""
+    parts = []
+    for op in json.loads(delta):
+        parts.append(op if isinstance(op, str) else old[op[0]:op[1]])
+    return "".join(parts)
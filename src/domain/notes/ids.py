@@ -0,0 +1,13 @@
+from typing import Any
+
+# Note, notebook and attachment ids are BIGINT; note versions (revision numbers) are INTEGER
+MAX_ID = 2**63 - 1
+MAX_REVISION = 2**31 - 1
+
+
+def is_valid_id(value: Any, maximum: int = MAX_ID) -> bool:
+    """Whether `value` is an integer id the column can hold (positive, at most `maximum`).
+
+    Out-of-range values would reach the driver, whose error surfaces as a 500.
+    """
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= maximum
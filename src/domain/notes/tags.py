@@ -0,0 +1,29 @@
+import unicodedata
+from typing import Iterable, List
+
+MAX_TAG_LENGTH = 64
+MAX_TAGS_PER_NOTE = 32
+
+
+def normalize_tag(tag: str) -> str:
+    """Canonical form of one tag: trimmed, lower-cased, without a leading '#'."""
+    if not isinstance(tag, str):
+        raise ValueError("Tags must be strings")
+    tag = tag.strip().lstrip("#").lower()
+    if not tag:
+        raise ValueError("Tags must not be empty")
+    if len(tag) > MAX_TAG_LENGTH:
+        raise ValueError(f"Tags must be at most {MAX_TAG_LENGTH} characters long")
+    if "," in tag or any(ch.isspace() for ch in tag):
+        raise ValueError("Tags must not contain whitespace or commas")
+    if any(unicodedata.category(ch) == "Cc" for ch in tag):
+        raise ValueError("Tags must not contain control characters")
+    return tag
+
+
+def normalize_tags(tags: Iterable[str], limit: int = MAX_TAGS_PER_NOTE) -> List[str]:
+    """Sorted, de-duplicated canonical tags; at most `limit` of them."""
+    normalized = sorted({normalize_tag(tag) for tag in tags})
+    if len(normalized) > limit:
+        raise ValueError(f"At most {limit} tags allowed")
+    return normalized
@@ -0,0 +1 @@
+"""In-process caches shared by the infrastructure and application layers."""
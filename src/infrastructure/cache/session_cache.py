@@ -0,0 +1,78 @@
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+from src.infrastructure.cache.ttl_lru import TTLCache
+
+
+class SessionCache:
+    """Per-worker cache of session state keyed by JWT `jti`.
+
+    Revoked sessions are cached as False and active ones as True. Every entry is
+    capped at the token's `exp`. Active entries are only kept for long while the
+    NOTIFY listener is up (`listening`). Otherwise they fall back to
+    `unlistened_active_ttl`, so a revocation issued by another worker is never
+    masked for longer than that.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        active_ttl: float = 300.0,
+        revoked_ttl: float = 3600.0,
+        unlistened_active_ttl: float = 0.0,
+    ):
+        self.active_ttl = active_ttl
+        self.revoked_ttl = revoked_ttl
+        self.unlistened_active_ttl = unlistened_active_ttl
+        self.listening = False
+        self.notifications = 0
+        self._cache = TTLCache(max_entries)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "SessionCache":
+        return cls(
+            max_entries=int(cfg.get("max_entries", 100_000)),
+            active_ttl=float(cfg.get("active_ttl_seconds", 300)),
+            revoked_ttl=float(cfg.get("revoked_ttl_seconds", 3600)),
+            unlistened_active_ttl=float(cfg.get("unlistened_active_ttl_seconds", 0)),
+        )
+
+    def lookup(self, jti: str) -> Optional[bool]:
+        """True/False if the session state is cached, None on a miss."""
+        return self._cache.get(jti)
+
+    def mark_active(self, jti: str, exp: float) -> None:
+        ttl = self.active_ttl if self.listening else self.unlistened_active_ttl
+        # `add` never overwrites a revocation that raced with the DB read
+        self._cache.add(jti, True, min(float(exp), time.time() + ttl))
+
+    def mark_revoked(self, jti: str, exp: Optional[float] = None) -> None:
+        expires_at = time.time() + self.revoked_ttl
+        if exp is not None:
+            # Past `exp` the token fails verification before the cache is consulted
+            expires_at = min(float(exp), expires_at)
+        self._cache.set(jti, False, expires_at)
+
+    def invalidate(self, jti: str) -> None:
+        self._cache.pop(jti)
+
+    def on_revoked_notification(self, payload: str) -> None:
+        self.notifications += 1
+        if payload:
+            self.mark_revoked(payload)
+
+    def on_listener_state(self, connected: bool) -> None:
+        # Notifications may have been missed while the listener was down, and active
+        # entries granted under `listening` must not outlive it: start over either way.
+        self.listening = connected
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["listening"] = self.listening
+        stats["notifications"] = self.notifications
+        return stats
+
+
+session_cache = SessionCache.from_config(config.get("auth", {}).get("session_cache", {}) or {})
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire at an absolute wall-clock time.
+
+    Entries carry their own `expires_at` (epoch seconds) so callers can cap them at
+    e.g. a token's `exp`. The least recently used entry is evicted once
+    `max_entries` is reached, or, with `max_bytes`, once the entries' total
+    `sizeof` would exceed it. Hit/miss/eviction counters are kept for `stats()`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sizeof = sizeof
+        # key -> (value, expires_at, size); size is 0 unless max_bytes is set
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        if expires_at <= self._clock():
+            return
+        size = self._size(value)
+        with self._lock:
+            self._store_locked(key, value, expires_at, size)
+
+    def add(self, key: Hashable, value: Any, expires_at: float) -> bool:
+        """Insert only if no live entry exists for `key`. Returns True if stored."""
+        now = self._clock()
+        if expires_at <= now:
+            return False
+        size = self._size(value)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > now:
+                return False
+            self._store_locked(key, value, expires_at, size)
+            return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self._bytes -= item[2]
+        return default if item is None else item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _size(self, value: Any) -> int:
+        return self._sizeof(value) if self.max_bytes is not None else 0
+
+    def _store_locked(self, key: Hashable, value: Any, expires_at: float, size: int) -> None:
+        old = self._data.get(key)
+        if old is not None:
+            self._bytes -= old[2]
+        self._data[key] = (value, expires_at, size)
+        self._data.move_to_end(key)
+        self._bytes += size
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while len(self._data) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+import asyncpg
+
+from src.config import config
+from src.logging_config import logger
+from src.infrastructure.database.connection import connect_kwargs
+from src.infrastructure.database.instrumentation import ASYNC_ACQUIRE, TracedConnection, init_async_connection
+from src.infrastructure.database import pool as sync_pool
+from src.infrastructure.database.pool import PoolTimeoutError
+from src.infrastructure.metrics.registry import REGISTRY, gauge_family
+
+
+# asyncpg pools are bound to the event loop they were created on. Production runs
+# one loop per worker; the test client spins up a loop per request, so keep one
+# pool per loop and drop pools whose loop has gone away.
+_pools: Dict[asyncio.AbstractEventLoop, "asyncio.Task[asyncpg.Pool]"] = {}
+
+
+def _pool_config() -> Dict[str, Any]:
+    return config.get("database", {}).get("pool", {}) or {}
+
+
+def async_connect_kwargs() -> Dict[str, Any]:
+    """asyncpg.connect() keyword arguments built from the `database:` config section."""
+    params = connect_kwargs()
+    return {
+        "host": params["host"],
+        "port": params["port"],
+        "user": params["user"],
+        "password": params["password"],
+        "database": params["dbname"],
+    }
+
+
+async def _create_pool() -> asyncpg.Pool:
+    pool_cfg = _pool_config()
+    logger.debug("creating async database pool")
+    return await asyncpg.create_pool(
+        **async_connect_kwargs(),
+        min_size=int(pool_cfg.get("min_size", 1)),
+        max_size=int(pool_cfg.get("max_size", 10)),
+        max_inactive_connection_lifetime=float(pool_cfg.get("max_idle_seconds", 300)),
+        init=init_async_connection,
+        connection_class=TracedConnection,
+    )
+
+
+def _discard_stale_pools() -> None:
+    for loop, task in list(_pools.items()):
+        if not loop.is_closed():
+            continue
+        del _pools[loop]
+        if task.done() and not task.cancelled() and task.exception() is None:
+            try:
+                task.result().terminate()
+            except Exception:
+                pass
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """asyncpg pool for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    task = _pools.get(loop)
+    if task is None:
+        _discard_stale_pools()
+        task = loop.create_task(_create_pool())
+        _pools[loop] = task
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        if _pools.get(loop) is task:
+            del _pools[loop]
+        raise
+
+
+async def close_async_pool() -> None:
+    task = _pools.pop(asyncio.get_running_loop(), None)
+    if task is None:
+        return
+    try:
+        pool = await task
+    except Exception:
+        return
+    await pool.close()
+
+
+@asynccontextmanager
+async def async_pooled_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Borrow a connection from the loop's async pool."""
+    pool = await get_async_pool()
+    timeout = float(_pool_config().get("acquire_timeout_seconds", 5))
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=timeout)
+    except asyncio.TimeoutError as e:
+        raise PoolTimeoutError(
+            f"Timed out after {timeout:.2f}s waiting for a database connection"
+        ) from e
+    finally:
+        ASYNC_ACQUIRE.observe(time.perf_counter() - started)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def async_pool_stats() -> Dict[str, Any]:
+    pool = await get_async_pool()
+    size = pool.get_size()
+    idle = pool.get_idle_size()
+    return {
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+    }
+
+
+def _pool_families():
+    """Connections per pool and state, read at scrape time."""
+    in_use = idle = 0
+    for task in list(_pools.values()):
+        if task.done() and not task.cancelled() and task.exception() is None:
+            pool = task.result()
+            idle += pool.get_idle_size()
+            in_use += pool.get_size() - pool.get_idle_size()
+    series = [(("async", "in_use"), in_use), (("async", "idle"), idle)]
+    stats = sync_pool.existing_pool_stats()
+    if stats is not None:
+        series += [(("sync", "in_use"), stats["in_use"]), (("sync", "idle"), stats["idle"])]
+    return [gauge_family("db_pool_connections", "Open database connections by pool and state.", ["pool", "state"], series)]
+
+
+REGISTRY.add_collector(_pool_families)
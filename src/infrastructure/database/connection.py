@@ -1,21 +1,30 @@
 import time
+from typing import Any, Dict
+
 import psycopg2
 from src.config import config
 from src.logging_config import logger
 
+
+def connect_kwargs() -> Dict[str, Any]:
+    """psycopg2.connect() keyword arguments built from the `database:` config section."""
+    db_cfg = config['database']
+    return {
+        "host": db_cfg['host'],
+        "port": db_cfg['port'],
+        "user": db_cfg['user'],
+        "password": db_cfg['password'],
+        "dbname": db_cfg['dbname'],
+    }
+
+
 def get_db_connection(max_retries: int = 10, delay_seconds: float = 1.0):
     last_exc = None
     for attempt in range(1, max_retries + 1):
         try:
             # Required log format
             logger.info("connecting database connection")
-            conn = psycopg2.connect(
-                host=config['database']['host'],
-                port=config['database']['port'],
-                user=config['database']['user'],
-                password=config['database']['password'],
-                dbname=config['database']['dbname']
-            )
+            conn = psycopg2.connect(**connect_kwargs())
             logger.info("Database connection successful.")
             return conn
         except psycopg2.OperationalError as e:
@@ -0,0 +1,143 @@
+import time
+from typing import Dict
+
+import asyncpg
+from psycopg2 import extensions
+
+from src.config import config
+from src.infrastructure.database.tracing import record_query, status_rows
+from src.infrastructure.metrics.registry import REGISTRY
+
+
+METRICS_ENABLED = bool((config.get("metrics", {}) or {}).get("enabled", True))
+
+DB_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "db_pool_acquire_seconds", "Time spent waiting for a pooled database connection.", ["pool"]
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Database statement round-trip time, by leading SQL keyword.", ["operation"]
+)
+DB_QUERY_ERRORS = REGISTRY.counter("db_query_errors_total", "Database statements that failed.", ["operation"])
+
+ASYNC_ACQUIRE = DB_ACQUIRE_SECONDS.labels("async")
+SYNC_ACQUIRE = DB_ACQUIRE_SECONDS.labels("sync")
+
+# Anything else is reported as "other", which keeps the label set small
+OPERATIONS = frozenset(
+    ("select", "insert", "update", "delete", "with", "copy", "begin", "commit", "rollback", "savepoint", "release")
+)
+# Repositories use a fixed set of statements, so the keyword is looked up once per text
+_operations: Dict[str, str] = {}
+MAX_CACHED_OPERATIONS = 4096
+
+
+def query_operation(query) -> str:
+    operation = _operations.get(query)
+    if operation is not None:
+        return operation
+    text = query.decode("utf-8", "replace") if isinstance(query, bytes) else query
+    if isinstance(text, str):
+        words = text.lstrip(" \t\r\n(").split(None, 1)
+        operation = words[0].lower() if words else "other"
+        if operation not in OPERATIONS:
+            operation = "other"
+    else:
+        operation = "other"  # psycopg2 sql.Composed and the like
+    if isinstance(query, (str, bytes)):
+        if len(_operations) >= MAX_CACHED_OPERATIONS:
+            _operations.clear()
+        _operations[query] = operation
+    return operation
+
+
+def _observe(query, elapsed: float, failed: bool) -> None:
+    operation = query_operation(query)
+    DB_QUERY_SECONDS.labels(operation).observe(elapsed)
+    if failed:
+        DB_QUERY_ERRORS.labels(operation).inc()
+
+
+def observe_query(record: "asyncpg.connection.LoggedQuery") -> None:
+    """asyncpg query logger: runs on the loop (call_soon) after each statement."""
+    _observe(record.query, record.elapsed, record.exception is not None)
+
+
+async def init_async_connection(conn: asyncpg.Connection) -> None:
+    """asyncpg pool `init` hook: time every statement on the connection."""
+    if METRICS_ENABLED:
+        conn.add_query_logger(observe_query)
+
+
+class TracedConnection(asyncpg.Connection):
+    """asyncpg connection class (pool `connection_class`) adding statements to the request trace.
+
+    The query logger cannot do this: it runs a loop iteration after the
+    statement, possibly once the response headers carrying the trace are sent,
+    and it does not see row counts.
+    """
+
+    async def _traced(self, call, query, params, rows_of):
+        started = time.perf_counter()
+        rows = None
+        try:
+            result = await call
+            rows = rows_of(result)
+            return result
+        finally:
+            record_query(query, params, time.perf_counter() - started, rows)
+
+    def execute(self, query, *args, **kwargs):
+        return self._traced(super().execute(query, *args, **kwargs), query, args, status_rows)
+
+    def executemany(self, command, args, **kwargs):
+        return self._traced(super().executemany(command, args, **kwargs), command, args, lambda _: None)
+
+    def fetch(self, query, *args, **kwargs):
+        return self._traced(super().fetch(query, *args, **kwargs), query, args, len)
+
+    def fetchmany(self, query, args, **kwargs):
+        return self._traced(super().fetchmany(query, args, **kwargs), query, args, len)
+
+    def fetchrow(self, query, *args, **kwargs):
+        return self._traced(super().fetchrow(query, *args, **kwargs), query, args, lambda row: int(row is not None))
+
+    def fetchval(self, query, *args, **kwargs):
+        return self._traced(super().fetchval(query, *args, **kwargs), query, args, lambda _: None)
+
+    def copy_records_to_table(self, table_name, **kwargs):
+        return self._traced(
+            super().copy_records_to_table(table_name, **kwargs), f"COPY {table_name}", None, status_rows
+        )
+
+
+class TimedCursor(extensions.cursor):
+    """psycopg2 cursor that records statement time like the asyncpg query logger,
+    and adds each statement to the request trace."""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute(query, vars)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            _observe(query, elapsed, failed)
+            record_query(self._text(query), vars, elapsed, None if failed else self.rowcount)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = super().executemany(query, vars_list)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            _observe(query, elapsed, failed)
+            record_query(self._text(query), None, elapsed, None if failed else self.rowcount)
+
+    def _text(self, query):
+        # sql.Composed statements need a connection to become text
+        return query if isinstance(query, (str, bytes)) else query.as_string(self)
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from src.logging_config import logger
+from src.infrastructure.database.async_pool import async_connect_kwargs
+
+
+NotificationCallback = Callable[[str], None]
+StateCallback = Callable[[bool], None]
+
+
+class PgListener:
+    """One dedicated LISTEN connection per worker, fanning NOTIFY payloads out to callbacks.
+
+    The connection is kept alive in a background task that reconnects with
+    exponential backoff. State callbacks are told when the listener goes up or
+    down: while it is down notifications may be missed, so caches relying on it
+    must fall back to short TTLs and drop their contents when it comes back.
+    """
+
+    def __init__(
+        self,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        keepalive_seconds: float = 30.0,
+    ):
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.keepalive_seconds = keepalive_seconds
+        self._channels: Dict[str, List[NotificationCallback]] = {}
+        self._state_callbacks: List[StateCallback] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def subscribe(self, channel: str, callback: NotificationCallback) -> None:
+        """Register `callback(payload)` for `channel`; effective on the next (re)connect
+        or immediately if the listener is already connected."""
+        first = channel not in self._channels
+        self._channels.setdefault(channel, []).append(callback)
+        if first and self.connected:
+            asyncio.ensure_future(self._conn.add_listener(channel, self._dispatch))
+
+    def add_state_callback(self, callback: StateCallback) -> None:
+        self._state_callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(**async_connect_kwargs())
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                for channel in list(self._channels):
+                    await conn.add_listener(channel, self._dispatch)
+                self._conn = conn
+                delay = self.reconnect_delay
+                logger.info(f"Listening for notifications on {sorted(self._channels)}")
+                self._set_state(True)
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        # Detect half-open TCP connections that never report termination
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification listener connection lost: {e}")
+            finally:
+                was_connected = self._conn is not None
+                self._conn = None
+                if was_connected:
+                    self._set_state(False)
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await asyncio.shield(conn.close(timeout=2))
+                    except Exception:
+                        conn.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _dispatch(self, _conn, _pid: int, channel: str, payload: str) -> None:
+        for callback in self._channels.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Notification callback for {channel} failed: {e}")
+
+    def _set_state(self, connected: bool) -> None:
+        for callback in self._state_callbacks:
+            try:
+                callback(connected)
+            except Exception as e:
+                logger.error(f"Listener state callback failed: {e}")
+
+
+_listener: Optional[PgListener] = None
+
+
+def get_listener() -> PgListener:
+    """Process-wide listener; call `start()` from the app's startup hook."""
+    global _listener
+    if _listener is None:
+        _listener = PgListener()
+    return _listener
@@ -1,4 +1,5 @@
 from typing import List, Tuple
+import asyncpg
 import psycopg2
 from psycopg2.extensions import connection as PgConnection
 from src.logging_config import logger
@@ -26,6 +27,347 @@ MIGRATIONS: List[Tuple[str, str]] = [
         CREATE INDEX IF NOT EXISTS idx_auth_sessions_user_id ON auth_sessions(user_id);
         """
     ),
+    (
+        "0002_create_notes",
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            id BIGSERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            title VARCHAR(200) NOT NULL DEFAULT '',
+            body TEXT NOT NULL DEFAULT '',
+            -- Summary text for list views, so listing never has to read the body
+            excerpt VARCHAR(140) GENERATED ALWAYS AS (left(body, 140)) STORED,
+            version INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        -- Keyset pagination over (user_id, updated_at, id); INCLUDE covers the summary
+        -- columns so list pages are index-only scans. Column sizes keep entries well
+        -- under the btree tuple limit.
+        CREATE INDEX IF NOT EXISTS idx_notes_user_updated
+            ON notes (user_id, updated_at DESC, id DESC)
+            INCLUDE (title, excerpt, version);
+        """
+    ),
+    (
+        "0003_notes_search",
+        """
+        -- Title terms rank above body terms. The body is capped so the vector stays
+        -- under Postgres' 1 MB tsvector limit for very large notes.
+        ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', left(coalesce(body, ''), 100000)), 'B')
+            ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_notes_search ON notes USING GIN (search_vector);
+        """
+    ),
+    (
+        "0004_note_revisions",
+        """
+        -- One row per note version: either a full snapshot (body) or a delta against
+        -- the previous revision. chain_length counts deltas back to the snapshot.
+        CREATE TABLE IF NOT EXISTS note_revisions (
+            note_id BIGINT NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+            revision INTEGER NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            body TEXT NULL,
+            delta TEXT NULL,
+            chain_length INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (note_id, revision),
+            CHECK ((body IS NULL) <> (delta IS NULL))
+        );
+
+        -- Lets compaction range-scan for chains longer than its target
+        CREATE INDEX IF NOT EXISTS idx_note_revisions_chain
+            ON note_revisions (chain_length) WHERE delta IS NOT NULL;
+        """
+    ),
+    (
+        "0005_note_text_ops",
+        """
+        -- Replace sorted, non-overlapping [start, end) character ranges of `src`
+        -- (offsets into the original text) with the matching `texts`, so patches
+        -- are applied in place without shipping the body to the app and back.
+        CREATE OR REPLACE FUNCTION apply_text_ops(src TEXT, starts INT[], ends INT[], texts TEXT[])
+        RETURNS TEXT
+        LANGUAGE sql IMMUTABLE
+        AS $$
+            SELECT coalesce(
+                       string_agg(
+                           substr(src, coalesce(ends[i - 1], 0) + 1, starts[i] - coalesce(ends[i - 1], 0)) || texts[i],
+                           '' ORDER BY i
+                       ),
+                       ''
+                   ) || substr(src, coalesce(ends[array_upper(ends, 1)], 0) + 1)
+            FROM generate_subscripts(starts, 1) AS i
+        $$;
+        """
+    ),
+    (
+        "0006_note_list_watermarks",
+        """
+        -- Per-user marker that changes whenever any of the user's notes does, so list
+        -- validators (ETags) are checked with one primary-key lookup. Values come from
+        -- a sequence, so a watermark is never reused.
+        CREATE SEQUENCE IF NOT EXISTS note_list_watermark_seq;
+
+        CREATE TABLE IF NOT EXISTS note_list_watermarks (
+            user_id BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            watermark BIGINT NOT NULL
+        );
+
+        INSERT INTO note_list_watermarks (user_id, watermark)
+        SELECT DISTINCT user_id, nextval('note_list_watermark_seq') FROM notes
+        ON CONFLICT (user_id) DO NOTHING;
+
+        -- Statement-level, so a bulk import bumps each user's watermark once
+        CREATE OR REPLACE FUNCTION bump_note_list_watermarks() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO note_list_watermarks (user_id, watermark)
+            SELECT changed.user_id, nextval('note_list_watermark_seq')
+            FROM (SELECT DISTINCT user_id FROM changed_notes) AS changed
+            -- Skip users being deleted (their notes go through ON DELETE CASCADE)
+            WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = changed.user_id)
+            ORDER BY changed.user_id
+            ON CONFLICT (user_id) DO UPDATE SET watermark = EXCLUDED.watermark;
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS notes_list_watermark_insert ON notes;
+        CREATE TRIGGER notes_list_watermark_insert
+            AFTER INSERT ON notes REFERENCING NEW TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_note_list_watermarks();
+
+        DROP TRIGGER IF EXISTS notes_list_watermark_update ON notes;
+        CREATE TRIGGER notes_list_watermark_update
+            AFTER UPDATE ON notes REFERENCING NEW TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_note_list_watermarks();
+
+        DROP TRIGGER IF EXISTS notes_list_watermark_delete ON notes;
+        CREATE TRIGGER notes_list_watermark_delete
+            AFTER DELETE ON notes REFERENCING OLD TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_note_list_watermarks();
+        """
+    ),
+    (
+        "0007_notes_change_notify",
+        """
+        -- Publish note changes on the notes_changed channel for live feeds. A statement
+        -- touching more than 100 of one user's notes sends a single "bulk" event for
+        -- that user instead; Postgres folds identical payloads within a transaction.
+        CREATE OR REPLACE FUNCTION notify_note_changes() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('notes_changed', payload)
+            FROM (
+                SELECT CASE
+                    WHEN count(*) OVER (PARTITION BY user_id) > 100
+                        THEN json_build_object('user_id', user_id, 'op', 'bulk')::text
+                    ELSE json_build_object(
+                        'user_id', user_id, 'note_id', id, 'version', version, 'op', lower(TG_OP)
+                    )::text
+                END AS payload
+                FROM changed_notes
+            ) AS events;
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS notes_notify_insert ON notes;
+        CREATE TRIGGER notes_notify_insert
+            AFTER INSERT ON notes REFERENCING NEW TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_note_changes();
+
+        DROP TRIGGER IF EXISTS notes_notify_update ON notes;
+        CREATE TRIGGER notes_notify_update
+            AFTER UPDATE ON notes REFERENCING NEW TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_note_changes();
+
+        DROP TRIGGER IF EXISTS notes_notify_delete ON notes;
+        CREATE TRIGGER notes_notify_delete
+            AFTER DELETE ON notes REFERENCING OLD TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_note_changes();
+        """
+    ),
+    (
+        "0008_notebooks",
+        """
+        -- path is the materialized chain of ids from the root, e.g. '/12/40/41/'.
+        -- With byte-wise ("C") ordering a subtree is one index range
+        -- [path, left(path, -1) || '0'), because '0' sorts right after '/', and a
+        -- move rewrites only the moved rows' path prefixes in a single UPDATE.
+        -- The length cap keeps paths well inside a btree index entry.
+        CREATE TABLE IF NOT EXISTS notebooks (
+            id BIGSERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            parent_id BIGINT NULL REFERENCES notebooks(id) ON DELETE CASCADE,
+            name VARCHAR(200) NOT NULL,
+            path TEXT COLLATE "C" NOT NULL CONSTRAINT notebooks_path_length CHECK (length(path) <= 2048),
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_notebooks_user_path ON notebooks (user_id, path);
+        CREATE INDEX IF NOT EXISTS idx_notebooks_user_parent ON notebooks (user_id, parent_id);
+        -- Needed by the parent_id ON DELETE CASCADE lookups
+        CREATE INDEX IF NOT EXISTS idx_notebooks_parent ON notebooks (parent_id);
+
+        ALTER TABLE notes ADD COLUMN IF NOT EXISTS notebook_id BIGINT NULL
+            REFERENCES notebooks(id) ON DELETE SET NULL;
+
+        CREATE INDEX IF NOT EXISTS idx_notes_notebook ON notes (notebook_id) WHERE notebook_id IS NOT NULL;
+        """
+    ),
+    (
+        "0009_note_tags",
+        """
+        -- user_id is copied from the note so each user's posting lists are one
+        -- (user_id, tag) index range ordered by note_id; the primary key answers
+        -- "does this note carry tag X" probes when intersecting tags.
+        CREATE TABLE IF NOT EXISTS note_tags (
+            note_id BIGINT NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+            user_id BIGINT NOT NULL,
+            tag VARCHAR(64) NOT NULL,
+            PRIMARY KEY (note_id, tag)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_note_tags_user_tag ON note_tags (user_id, tag, note_id);
+
+        -- Per-user facet counts for the tag sidebar, kept in step with note_tags by
+        -- the statement-level triggers below; rows at zero are removed.
+        CREATE TABLE IF NOT EXISTS user_tag_counts (
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            tag VARCHAR(64) NOT NULL,
+            note_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, tag)
+        );
+
+        CREATE OR REPLACE FUNCTION count_added_note_tags() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO user_tag_counts (user_id, tag, note_count)
+            SELECT user_id, tag, count(*) FROM changed_tags
+            GROUP BY user_id, tag
+            -- A fixed lock order keeps concurrent writers of one user from deadlocking
+            ORDER BY user_id, tag
+            ON CONFLICT (user_id, tag) DO UPDATE SET note_count = user_tag_counts.note_count + EXCLUDED.note_count;
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION count_removed_note_tags() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM 1 FROM user_tag_counts c
+            WHERE (c.user_id, c.tag) IN (SELECT user_id, tag FROM changed_tags)
+            ORDER BY c.user_id, c.tag
+            FOR UPDATE;
+
+            UPDATE user_tag_counts c
+            SET note_count = c.note_count - removed.n
+            FROM (SELECT user_id, tag, count(*) AS n FROM changed_tags GROUP BY user_id, tag) AS removed
+            WHERE c.user_id = removed.user_id AND c.tag = removed.tag;
+
+            DELETE FROM user_tag_counts c
+            WHERE (c.user_id, c.tag) IN (SELECT user_id, tag FROM changed_tags) AND c.note_count <= 0;
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS note_tags_count_insert ON note_tags;
+        CREATE TRIGGER note_tags_count_insert
+            AFTER INSERT ON note_tags REFERENCING NEW TABLE AS changed_tags
+            FOR EACH STATEMENT EXECUTE FUNCTION count_added_note_tags();
+
+        DROP TRIGGER IF EXISTS note_tags_count_delete ON note_tags;
+        CREATE TRIGGER note_tags_count_delete
+            AFTER DELETE ON note_tags REFERENCING OLD TABLE AS changed_tags
+            FOR EACH STATEMENT EXECUTE FUNCTION count_removed_note_tags();
+        """
+    ),
+    (
+        "0010_note_tags_watermarks",
+        """
+        -- Tag changes made without touching the note row (batch tag/untag) must still
+        -- invalidate list and tag sidebar ETags; note_tags carries user_id, which is
+        -- all bump_note_list_watermarks reads.
+        DROP TRIGGER IF EXISTS note_tags_list_watermark_insert ON note_tags;
+        CREATE TRIGGER note_tags_list_watermark_insert
+            AFTER INSERT ON note_tags REFERENCING NEW TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_note_list_watermarks();
+
+        DROP TRIGGER IF EXISTS note_tags_list_watermark_delete ON note_tags;
+        CREATE TRIGGER note_tags_list_watermark_delete
+            AFTER DELETE ON note_tags REFERENCING OLD TABLE AS changed_notes
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_note_list_watermarks();
+        """
+    ),
+    (
+        "0011_note_attachments",
+        """
+        -- Attachment bytes live in the blob store, keyed by sha256; identical uploads
+        -- share one blob. Unreferenced blobs are removed by the attachments GC once
+        -- last_used_at is older than its grace period.
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 CHAR(64) PRIMARY KEY,
+            size BIGINT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        CREATE TABLE IF NOT EXISTS note_attachments (
+            id BIGSERIAL PRIMARY KEY,
+            note_id BIGINT NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+            sha256 CHAR(64) NOT NULL REFERENCES blobs(sha256),
+            filename VARCHAR(255) NOT NULL,
+            content_type VARCHAR(127) NOT NULL,
+            size BIGINT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_note_attachments_note ON note_attachments (note_id, id);
+        CREATE INDEX IF NOT EXISTS idx_note_attachments_sha256 ON note_attachments (sha256);
+
+        -- Resumable uploads in progress; `received` bytes are durable in the staging area
+        CREATE TABLE IF NOT EXISTS attachment_uploads (
+            id UUID PRIMARY KEY,
+            note_id BIGINT NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+            filename VARCHAR(255) NOT NULL,
+            content_type VARCHAR(127) NOT NULL,
+            size BIGINT NOT NULL,
+            received BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_attachment_uploads_note ON attachment_uploads (note_id);
+        CREATE INDEX IF NOT EXISTS idx_attachment_uploads_updated ON attachment_uploads (updated_at);
+        """
+    ),
+    (
+        "0012_note_renders",
+        """
+        -- Rendered Markdown keyed by sha256(renderer version, body), shared by every
+        -- note with the same content. Rows of other renderer versions, or of bodies
+        -- no note has any more, are purged by the re-render job.
+        CREATE TABLE IF NOT EXISTS note_renders (
+            content_hash CHAR(64) PRIMARY KEY,
+            renderer_version VARCHAR(64) NOT NULL,
+            html TEXT NOT NULL,
+            render_ms REAL NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        """
+    ),
 ]
 
 
@@ -70,3 +412,13 @@ def run_migrations(conn: PgConnection):
         except Exception as e:
             logger.error(f"Migration {version} failed: {e}")
             raise
+
+
+async def pending_migrations(conn: asyncpg.Connection) -> List[str]:
+    """Versions in MIGRATIONS not yet applied (all of them before the first run)."""
+    try:
+        rows = await conn.fetch("SELECT version FROM schema_migrations")
+    except asyncpg.UndefinedTableError:
+        return [version for version, _ in MIGRATIONS]
+    applied = {r["version"] for r in rows}
+    return [version for version, _ in MIGRATIONS if version not in applied]
@@ -0,0 +1,348 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extensions import connection as PgConnection
+
+from src.config import config
+from src.logging_config import logger
+from src.infrastructure.database.connection import connect_kwargs
+from src.infrastructure.database.instrumentation import SYNC_ACQUIRE, TimedCursor
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: PgConnection):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of psycopg2 connections.
+
+    - Connections are opened lazily up to `max_size`; `min_size` are kept warm.
+    - `acquire` blocks for at most `acquire_timeout` seconds, then raises PoolTimeoutError.
+    - Connections idle longer than `max_idle` (above `min_size`) or older than
+      `max_lifetime` are closed and replaced.
+    - Connections idle longer than `ping_after_idle` are pinged before being handed
+      out; closed, broken or mid-transaction connections are discarded on release.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 5.0,
+        max_idle: float = 300.0,
+        max_lifetime: float = 1800.0,
+        ping_after_idle: float = 30.0,
+        connect_params: Optional[Dict[str, Any]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_after_idle = ping_after_idle
+        self._connect_params = connect_params if connect_params is not None else connect_kwargs()
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: List[_Slot] = []
+        self._in_use: Dict[int, _Slot] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self.pid = os.getpid()
+
+        # Counters for sizing under load
+        self._acquired_total = 0
+        self._created_total = 0
+        self._discarded_total = 0
+        self._timeouts_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    # -- public API -------------------------------------------------------
+
+    def open(self) -> None:
+        """Eagerly open `min_size` connections (e.g. at startup)."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                slot = self._new_slot()
+            except Exception:
+                self._release_capacity()
+                raise
+            with self._cond:
+                self._idle.append(slot)
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[PgConnection]:
+        """Borrow a connection for the duration of the `with` block."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def acquire(self, timeout: Optional[float] = None) -> PgConnection:
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            slot = None
+            create = False
+            expired: List[_Slot] = []
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts_total += 1
+                        SYNC_ACQUIRE.observe(time.monotonic() - started)
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.2f}s waiting for a database connection"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                expired = self._collect_idle_expired_locked()
+                if self._idle:
+                    # LIFO keeps the hot set small so surplus connections age out
+                    slot = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    create = True
+
+            for old in expired:
+                self._close_slot(old)
+
+            if create:
+                try:
+                    slot = self._new_slot()
+                except Exception:
+                    self._release_capacity()
+                    raise
+            elif slot is None:
+                continue
+            elif not self._is_usable(slot):
+                self._close_slot(slot)
+                self._release_capacity()
+                continue
+
+            waited = time.monotonic() - started
+            SYNC_ACQUIRE.observe(waited)
+            with self._cond:
+                self._in_use[id(slot.conn)] = slot
+                self._acquired_total += 1
+                self._wait_seconds_total += waited
+                if waited > self._wait_seconds_max:
+                    self._wait_seconds_max = waited
+            return slot.conn
+
+    def release(self, conn: PgConnection, discard: bool = False) -> None:
+        with self._cond:
+            slot = self._in_use.pop(id(conn), None)
+        if slot is None:
+            # Not ours (or already released): just make sure it does not leak.
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+
+        if not discard and not self._reset(conn):
+            discard = True
+        if not discard and time.monotonic() - slot.created_at > self.max_lifetime:
+            discard = True
+
+        if discard or self._closed:
+            self._close_slot(slot)
+            self._release_capacity()
+            return
+
+        slot.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(slot)
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            self._close_slot(slot, count=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": self._waiting,
+                "acquired_total": self._acquired_total,
+                "created_total": self._created_total,
+                "discarded_total": self._discarded_total,
+                "timeouts_total": self._timeouts_total,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+            }
+
+    # -- internals --------------------------------------------------------
+
+    def _new_slot(self) -> _Slot:
+        logger.debug("opening pooled database connection")
+        conn = psycopg2.connect(**{"cursor_factory": TimedCursor, **self._connect_params})
+        with self._cond:
+            self._created_total += 1
+        return _Slot(conn)
+
+    def _release_capacity(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _collect_idle_expired_locked(self) -> List[_Slot]:
+        """Remove idle connections past max_idle/max_lifetime. Caller holds the lock."""
+        now = time.monotonic()
+        keep: List[_Slot] = []
+        expired: List[_Slot] = []
+        for slot in self._idle:
+            too_old = now - slot.created_at > self.max_lifetime
+            too_idle = now - slot.last_used > self.max_idle
+            if too_old or (too_idle and self._size - len(expired) > self.min_size):
+                expired.append(slot)
+            else:
+                keep.append(slot)
+        if expired:
+            self._idle = keep
+            self._size -= len(expired)
+            self._cond.notify(len(expired))
+        return expired
+
+    def _is_usable(self, slot: _Slot) -> bool:
+        conn = slot.conn
+        if conn.closed:
+            return False
+        if time.monotonic() - slot.last_used < self.ping_after_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            logger.warning("Discarding broken pooled database connection")
+            return False
+
+    @staticmethod
+    def _reset(conn: PgConnection) -> bool:
+        """Return the connection to a clean idle state; False if it is unusable."""
+        if conn.closed:
+            return False
+        status = conn.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close_slot(self, slot: _Slot, count: bool = True) -> None:
+        if count:
+            with self._cond:
+                self._discarded_total += 1
+        try:
+            slot.conn.close()
+        except Exception:
+            pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _pool_from_config() -> ConnectionPool:
+    pool_cfg = config.get("database", {}).get("pool", {}) or {}
+    return ConnectionPool(
+        min_size=int(pool_cfg.get("min_size", 1)),
+        max_size=int(pool_cfg.get("max_size", 10)),
+        acquire_timeout=float(pool_cfg.get("acquire_timeout_seconds", 5)),
+        max_idle=float(pool_cfg.get("max_idle_seconds", 300)),
+        max_lifetime=float(pool_cfg.get("max_lifetime_seconds", 1800)),
+        ping_after_idle=float(pool_cfg.get("ping_after_idle_seconds", 30)),
+    )
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool, created lazily (and re-created after a fork)."""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = _pool_from_config()
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+@contextmanager
+def pooled_connection() -> Iterator[PgConnection]:
+    """Borrow a connection from the process-wide pool."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats()
+
+
+def existing_pool_stats() -> Optional[Dict[str, Any]]:
+    """Like pool_stats(), but None instead of creating the pool if this process has none."""
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        return None
+    return pool.stats()
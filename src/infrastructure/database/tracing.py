@@ -0,0 +1,127 @@
+import re
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config import config
+from src.logging_config import logger
+
+
+_TRACING_CFG = (config.get("database", {}) or {}).get("tracing", {}) or {}
+# Statements slower than this are logged (parameters redacted); null disables the log
+_slow_query_ms = _TRACING_CFG.get("slow_query_ms", 200)
+SLOW_QUERY_SECONDS: Optional[float] = float(_slow_query_ms) / 1000 if _slow_query_ms is not None else None
+# Requests running more statements than this are logged with their most repeated one
+QUERY_BUDGET: Optional[int] = int(_TRACING_CFG.get("query_budget", 30) or 0) or None
+# Per-statement entries kept per request; the count and total time cover every one
+MAX_TRACED_QUERIES = 200
+
+
+class QueryTrace:
+    """The statements one request ran: count, total time and per-statement entries.
+
+    Shared (through `current_trace`) with the threads sync endpoints run in,
+    hence the lock.
+    """
+
+    __slots__ = ("count", "seconds", "queries", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # (fingerprint, seconds, rows); rows is None where the driver does not say
+        self.queries: List[Tuple[str, float, Optional[int]]] = []
+        self._lock = threading.Lock()
+
+    def add(self, fingerprint: str, seconds: float, rows: Optional[int]) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            if len(self.queries) < MAX_TRACED_QUERIES:
+                self.queries.append((fingerprint, seconds, rows))
+
+    def most_repeated(self) -> Tuple[str, int]:
+        with self._lock:
+            counts = Counter(fingerprint for fingerprint, _, _ in self.queries)
+        return counts.most_common(1)[0] if counts else ("", 0)
+
+
+# Set for each request by QueryTraceMiddleware; None outside requests
+current_trace: ContextVar[Optional[QueryTrace]] = ContextVar("query_trace", default=None)
+
+_FINGERPRINT_RULES = (
+    (re.compile(r"--[^\n]*"), ""),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+|%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?, ...)"),
+)
+# Like query_operation's cache: repositories use a fixed set of statements
+_fingerprints: Dict[Any, str] = {}
+MAX_CACHED_FINGERPRINTS = 4096
+
+
+def fingerprint(query) -> str:
+    """The statement with literals and placeholders replaced by `?`, whitespace collapsed.
+
+    Statements differing only in their values share a fingerprint, so repeats
+    (N+1 loops) show up as one fingerprint many times.
+    """
+    cached = _fingerprints.get(query)
+    if cached is not None:
+        return cached
+    text = query.decode("utf-8", "replace") if isinstance(query, bytes) else str(query)
+    for pattern, replacement in _FINGERPRINT_RULES:
+        text = pattern.sub(replacement, text)
+    text = text.strip()
+    if isinstance(query, (str, bytes)):
+        if len(_fingerprints) >= MAX_CACHED_FINGERPRINTS:
+            _fingerprints.clear()
+        _fingerprints[query] = text
+    return text
+
+
+def _redact(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    name = type(value).__name__
+    if isinstance(value, (str, bytes, list, tuple, dict)):
+        return f"<{name} len={len(value)}>"
+    return f"<{name}>"
+
+
+def redact_params(params: Any) -> str:
+    """Parameter types (and sizes) only: values can be passwords, tokens or note text."""
+    if params is None:
+        return "[]"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {_redact(v)}" for k, v in params.items()) + "}"
+    if isinstance(params, Sequence) and not isinstance(params, (str, bytes)):
+        return "[" + ", ".join(_redact(v) for v in params) + "]"
+    return _redact(params)
+
+
+def record_query(query, params: Any, seconds: float, rows: Optional[int]) -> None:
+    """Add a finished statement to the request's trace, and log it if it was slow."""
+    trace = current_trace.get()
+    slow = SLOW_QUERY_SECONDS is not None and seconds >= SLOW_QUERY_SECONDS
+    if trace is None and not slow:
+        return
+    text = fingerprint(query)
+    if trace is not None:
+        trace.add(text, seconds, rows)
+    if slow:
+        logger.warning(
+            f"slow query: {seconds * 1000:.1f} ms, {rows if rows is not None else '?'} rows: "
+            f"{text} params={redact_params(params)}"
+        )
+
+
+def status_rows(status: Optional[str]) -> Optional[int]:
+    """Row count from a command tag such as "UPDATE 3" or "INSERT 0 1"."""
+    if not status:
+        return None
+    last = status.rsplit(" ", 1)[-1]
+    return int(last) if last.isdigit() else None
@@ -0,0 +1 @@
+"""On-demand diagnostics for a live worker: CPU stack sampling and tracemalloc snapshots."""
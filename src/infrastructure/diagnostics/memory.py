@@ -0,0 +1,75 @@
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# Allocations made by the import machinery and tracemalloc itself are noise here
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryTracer:
+    """tracemalloc snapshots of this worker, each diffed against the one before.
+
+    The first snapshot starts tracing (which slows allocations down and costs
+    memory per traced block) and becomes the baseline; `stop()` ends tracing,
+    so nothing is paid while no one is looking.
+    """
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, limit: int = 25, group_by: str = "lineno", frames: int = 1) -> Dict[str, Any]:
+        """Start tracing, or report the top allocation changes since the last snapshot."""
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        with self._lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(frames)
+            current = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+            baseline, self._baseline = self._baseline, current
+            size, peak = tracemalloc.get_traced_memory()
+            result: Dict[str, Any] = {
+                "started": started,
+                "frames": tracemalloc.get_traceback_limit(),
+                "traced_bytes": size,
+                "peak_bytes": peak,
+                "top": [],
+            }
+            if started or baseline is None:
+                return result
+            stats = current.compare_to(baseline, group_by)[:limit]
+            result["top"] = [_stat_entry(stat) for stat in stats]
+            return result
+
+    def stop(self) -> bool:
+        """Stop tracing and drop the baseline; False if it was not running."""
+        with self._lock:
+            self._baseline = None
+            if not tracemalloc.is_tracing():
+                return False
+            tracemalloc.stop()
+            return True
+
+
+def _stat_entry(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    frames: List[str] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {
+        "location": frames[-1] if frames else "?",
+        "traceback": frames,
+        "size_bytes": stat.size,
+        "size_diff_bytes": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+memory_tracer = MemoryTracer()
@@ -0,0 +1,77 @@
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+# A thread whose innermost Python frame is one of these (in the standard
+# library) is waiting, not working: the event loop in select(), pool workers in
+# a queue's Condition.wait(), and so on
+IDLE_FUNCTIONS = frozenset(("select", "poll", "_poll", "wait", "_wait_for_tstate_lock", "accept"))
+_STDLIB = os.path.normcase(sysconfig.get_paths()["stdlib"])
+
+# One profile at a time per process: two would sample each other
+_running = threading.Lock()
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    # `;` separates frames in the collapsed format
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _is_idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    return code.co_name in IDLE_FUNCTIONS and os.path.normcase(code.co_filename).startswith(_STDLIB)
+
+
+def _stack(frame: FrameType) -> List[str]:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def sample_stacks(seconds: float, hz: float = 100.0, include_idle: bool = False) -> Dict[str, int]:
+    """Sample every other thread's Python stack `hz` times a second for `seconds`.
+
+    Returns collapsed stacks, `thread;outermost;...;innermost` -> sample count,
+    the input format of flamegraph.pl and speedscope. Blocks the calling
+    thread for the duration (run it off the event loop); nothing is installed
+    in the other threads, so it costs nothing before or after.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running in this worker")
+    try:
+        me = threading.get_ident()
+        interval = 1.0 / hz
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        next_tick = time.monotonic()
+        while next_tick < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (not include_idle and _is_idle(frame)):
+                    continue
+                thread = names.get(ident, f"thread-{ident}").replace(";", ":")
+                counts[";".join([thread, *_stack(frame)])] += 1
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+        return dict(counts)
+    finally:
+        _running.release()
+
+
+def collapsed_text(stacks: Dict[str, int]) -> str:
+    """One `stack count` line per stack, most sampled first."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda kv: -kv[1]))
@@ -0,0 +1 @@
+"""Process metrics (counters, gauges, histograms) exposed in Prometheus text format."""
@@ -0,0 +1,228 @@
+import asyncio
+import contextlib
+import fcntl
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from src.config import config
+from src.logging_config import logger
+from src.infrastructure.metrics.registry import REGISTRY, Registry
+
+
+# Worker snapshot files are `<pid>-<start>.json`; dead workers' counters are folded into ARCHIVE
+_WORKER_FILE = re.compile(r"(\d+)-(\d+)\.json")
+ARCHIVE = "archive"
+
+
+def _process_start(pid: int) -> Optional[int]:
+    """Start time of process `pid` in clock ticks since boot; None where /proc cannot tell."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name (field 2) may contain spaces; starttime is field 22
+            return int(f.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _worker_alive(worker: str) -> bool:
+    """Whether the process that wrote `<worker>.json` still runs: same pid and, so
+    a reused pid does not pass for the dead worker, same start time (where known)."""
+    pid, start = (int(part) for part in worker.split("-"))
+    started = _process_start(pid)
+    return started == start if started is not None else _pid_alive(pid)
+
+
+def merge_snapshots(
+    snapshots: List[Tuple[Hashable, List[Dict[str, Any]]]], alive: Callable[[Any], bool] = _worker_alive
+) -> List[Dict[str, Any]]:
+    """Combine per-worker snapshots into one.
+
+    Counters and histograms are summed over every worker that ever wrote one,
+    so totals never go backwards when a worker is replaced; gauges are summed
+    over live workers only.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for worker, families in snapshots:
+        live: Optional[bool] = None
+        for family in families:
+            if family["type"] == "gauge":
+                if live is None:
+                    live = alive(worker)
+                if not live:
+                    continue
+            target = merged.get(family["name"])
+            if target is None:
+                target = merged[family["name"]] = {**family, "series": {}}
+            elif target["type"] != family["type"] or target.get("buckets") != family.get("buckets"):
+                continue
+            series = target["series"]
+            for labels, sample in family["series"]:
+                key = tuple(labels)
+                current = series.get(key)
+                if family["type"] == "histogram":
+                    if current is None:
+                        series[key] = {"counts": list(sample["counts"]), "sum": sample["sum"]}
+                    else:
+                        current["counts"] = [a + b for a, b in zip(current["counts"], sample["counts"])]
+                        current["sum"] += sample["sum"]
+                else:
+                    series[key] = (current or 0.0) + sample
+    return [{**f, "series": [[list(k), v] for k, v in f["series"].items()]} for f in merged.values()]
+
+
+class MultiprocessMetrics:
+    """Metrics shared by the workers of one server through a directory.
+
+    Each worker writes its registry snapshot to `<directory>/<pid>-<start>.json`
+    every `flush_seconds` (and when scraped); a scrape of any worker merges all
+    of them, so what it reports lags the other workers by at most `flush_seconds`.
+    The start time in the name keeps a worker that reuses a dead one's pid from
+    overwriting its counters. Dead workers' counters and histograms are folded
+    into `archive.json` (their gauges dropped) and their files removed, so the
+    directory does not grow as workers are replaced and totals never go back.
+    The first worker of a server, finding no other live one, empties it.
+    """
+
+    def __init__(self, directory: str, flush_seconds: float = 5.0, registry: Registry = REGISTRY):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.registry = registry
+        self.worker = f"{os.getpid()}-{_process_start(os.getpid()) or 0}"
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "MultiprocessMetrics":
+        return cls(directory=str(cfg["multiprocess_dir"]), flush_seconds=float(cfg.get("flush_seconds", 5)))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _dump(self, name: str, content: Any) -> None:
+        tmp = f"{self._path(name)}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(content, f, separators=(",", ":"))
+        os.replace(tmp, self._path(name))
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # Serializes folding and clearing across workers; plain snapshot writes need no lock
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield  # closing the file releases the lock
+
+    def write(self, families: Optional[List[Dict[str, Any]]] = None) -> None:
+        self._dump(self.worker, self.registry.snapshot() if families is None else families)
+
+    def read(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """(worker, families) of every worker snapshot in the directory."""
+        snapshots = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not _WORKER_FILE.fullmatch(entry.name):
+                    continue
+                try:
+                    with open(entry.path) as f:
+                        snapshots.append((entry.name[: -len(".json")], json.load(f)))
+                except (OSError, ValueError):
+                    continue  # replaced or removed while reading; next scrape gets it
+        return snapshots
+
+    def _read_archive(self) -> Dict[str, Any]:
+        try:
+            with open(self._path(ARCHIVE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"workers": [], "families": []}
+
+    def clear(self) -> None:
+        """Remove every snapshot and the archive (the server is starting afresh)."""
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith((".json", ".tmp")):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(entry.path)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Merged families of every worker, with this worker's current values."""
+        own = self.registry.snapshot()
+        self.write(own)
+        with self._locked():
+            archive = self._read_archive()
+            live, dead = [], []
+            for worker, families in self.read():
+                if worker != self.worker:
+                    (live if _worker_alive(worker) else dead).append((worker, families))
+            if dead:
+                # `workers` lists what the archive already holds, in case a fold
+                # stopped between writing it and removing the files it folded
+                folded = set(archive["workers"])
+                archive = {
+                    "workers": [w for w, _ in dead],
+                    "families": merge_snapshots(
+                        [(ARCHIVE, archive["families"]), *(s for s in dead if s[0] not in folded)],
+                        alive=lambda worker: False,
+                    ),
+                }
+                self._dump(ARCHIVE, archive)
+                for worker, _ in dead:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(self._path(worker))
+        return merge_snapshots([(self.worker, own), *live, (ARCHIVE, archive["families"])], alive=lambda worker: True)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await asyncio.to_thread(self.write)
+            except Exception as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            with self._locked():
+                if not any(w != self.worker and _worker_alive(w) for w, _ in self.read()):
+                    self.clear()
+                self.write()
+            self._task = asyncio.get_running_loop().create_task(self._flush_forever())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        # Final counters survive this worker (folded into the archive); its gauges are dropped
+        self.write()
+
+
+_multiprocess: Optional[MultiprocessMetrics] = None
+
+
+def get_multiprocess_metrics() -> Optional[MultiprocessMetrics]:
+    """The shared-directory aggregator, or None when `metrics.multiprocess_dir` is unset."""
+    global _multiprocess
+    cfg = config.get("metrics", {}) or {}
+    if _multiprocess is None and cfg.get("multiprocess_dir"):
+        _multiprocess = MultiprocessMetrics.from_config(cfg)
+    return _multiprocess
+
+
+def collect_metrics() -> List[Dict[str, Any]]:
+    """What /metrics reports: this process's registry, or every worker's merged."""
+    multiprocess = get_multiprocess_metrics()
+    return multiprocess.collect() if multiprocess is not None else REGISTRY.snapshot()
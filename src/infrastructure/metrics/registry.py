@@ -0,0 +1,231 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Upper bounds (seconds) for latency histograms; +Inf is implied
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Value:
+    """One labelled counter or gauge. A lock per series keeps contention off the hot path."""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def sample(self) -> float:
+        return self.value
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        # Per-bucket (not cumulative) counts; the last one is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def sample(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"counts": list(self.counts), "sum": self.sum}
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self.labels()
+
+    def _new_value(self):
+        return _Value()
+
+    def labels(self, *values: Any):
+        """The series for these label values; callers on hot paths should keep the result."""
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new_value())
+        return series
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "series": [[list(k), v.sample()] for k, v in list(self._series.items())],
+        }
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+
+class Gauge(_Metric):
+    """A value that goes up and down. With several workers, live workers' values are summed."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled.set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        family = super().snapshot()
+        family["buckets"] = list(self.buckets)
+        return family
+
+
+class Registry:
+    """The process's metrics, plus callbacks that produce gauge families at scrape time.
+
+    Snapshots are plain JSON-able dicts (one per family), which is also the
+    format workers exchange in multi-process mode (see multiprocess.py).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], List[Dict[str, Any]]]) -> None:
+        """`collect()` returns gauge families in snapshot form; errors are skipped at scrape."""
+        self._collectors.append(collect)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        families = [m.snapshot() for m in list(self._metrics.values())]
+        for collect in list(self._collectors):
+            try:
+                families.extend(collect())
+            except Exception:
+                continue
+        return families
+
+
+def gauge_family(name: str, documentation: str, labelnames: Sequence[str], series) -> Dict[str, Any]:
+    """A gauge family in snapshot form, for collectors: `series` is [(label values, value)]."""
+    return {
+        "name": name,
+        "type": "gauge",
+        "help": documentation,
+        "labelnames": list(labelnames),
+        "series": [[[str(v) for v in labels], float(value)] for labels, value in series],
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_text(families: List[Dict[str, Any]]) -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for family in families:
+        name, names = family["name"], family["labelnames"]
+        lines.append(f"# HELP {name} {_escape(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for values, sample in sorted(family["series"], key=lambda s: s[0]):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(names, values)} {_number(sample)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*family["buckets"], math.inf], sample["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(names, values, ('le', _number(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, values)} {_number(sample['sum'])}")
+            lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+# The application's registry; /metrics renders it
+REGISTRY = Registry()
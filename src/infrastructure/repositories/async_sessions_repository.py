@@ -0,0 +1,58 @@
+from typing import Any, Dict, Optional
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+# NOTIFY channel carrying the jti of every revoked session
+SESSION_REVOKED_CHANNEL = "auth_session_revoked"
+
+
+async def create_session(user_id: int, jti: str) -> None:
+    async with async_pooled_connection() as conn:
+        await conn.execute(
+            "INSERT INTO auth_sessions (jti, user_id) VALUES ($1, $2)",
+            jti,
+            user_id,
+        )
+
+
+async def is_session_active(jti: str) -> bool:
+    async with async_pooled_connection() as conn:
+        active = await conn.fetchval(
+            "SELECT revoked_at IS NULL FROM auth_sessions WHERE jti = $1",
+            jti,
+        )
+        return bool(active)
+
+
+async def get_active_principal(jti: str) -> Optional[Dict[str, Any]]:
+    """id/email of the user owning an active session, in a single PK lookup + join."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT u.id, u.email
+            FROM auth_sessions s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.jti = $1 AND s.revoked_at IS NULL
+            """,
+            jti,
+        )
+        return {"id": row["id"], "email": row["email"]} if row else None
+
+
+async def revoke_session(jti: str) -> bool:
+    async with async_pooled_connection() as conn:
+        # The notification is only delivered if the UPDATE commits
+        rows = await conn.fetch(
+            """
+            WITH revoked AS (
+                UPDATE auth_sessions SET revoked_at = NOW()
+                WHERE jti = $1 AND revoked_at IS NULL
+                RETURNING jti
+            )
+            SELECT pg_notify($2, jti) FROM revoked
+            """,
+            jti,
+            SESSION_REVOKED_CHANNEL,
+        )
+        return len(rows) > 0
@@ -0,0 +1,65 @@
+from typing import Optional, Dict, Any
+
+import asyncpg
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+def _record_to_user(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "email": row["email"],
+        "password_hash": row["password_hash"],
+        "created_at": row["created_at"],
+    }
+
+
+async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            "SELECT id, email, password_hash, created_at FROM users WHERE email = $1",
+            email,
+        )
+        return _record_to_user(row) if row else None
+
+
+async def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            "SELECT id, email, password_hash, created_at FROM users WHERE id = $1",
+            user_id,
+        )
+        return _record_to_user(row) if row else None
+
+
+async def create_user(email: str, password_hash: str) -> Dict[str, Any]:
+    try:
+        async with async_pooled_connection() as conn:
+            row = await conn.fetchrow(
+                """
+                INSERT INTO users (email, password_hash)
+                VALUES ($1, $2)
+                RETURNING id, email, password_hash, created_at
+                """,
+                email,
+                password_hash,
+            )
+            return _record_to_user(row)
+    except asyncpg.UniqueViolationError as e:
+        raise ValueError("Email already registered") from e
+
+
+async def update_password_hash(user_id: int, password_hash: str, current_hash: str) -> bool:
+    """Replace the stored hash, only if it is still `current_hash` (no lost password change)."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            UPDATE users SET password_hash = $2
+            WHERE id = $1 AND password_hash = $3
+            RETURNING id
+            """,
+            user_id,
+            password_hash,
+            current_hash,
+        )
+        return row is not None
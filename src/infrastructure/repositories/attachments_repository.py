@@ -0,0 +1,264 @@
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+ATTACHMENT_COLUMNS = "id, note_id, sha256, filename, content_type, size, created_at"
+UPLOAD_COLUMNS = "id, note_id, filename, content_type, size, received, created_at, updated_at"
+
+
+def _record_to_attachment(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "note_id": row["note_id"],
+        "sha256": row["sha256"],
+        "filename": row["filename"],
+        "content_type": row["content_type"],
+        "size": row["size"],
+        "created_at": row["created_at"],
+    }
+
+
+def _record_to_upload(row) -> Dict[str, Any]:
+    return {
+        "id": str(row["id"]),
+        "note_id": row["note_id"],
+        "filename": row["filename"],
+        "content_type": row["content_type"],
+        "size": row["size"],
+        "received": row["received"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def _upload_uuid(upload_id: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(upload_id)
+    except ValueError:
+        return None
+
+
+async def create_upload(
+    user_id: int, note_id: int, filename: str, content_type: str, size: int
+) -> Optional[Dict[str, Any]]:
+    """Register an upload to one of the user's notes; None if the note is not theirs."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            INSERT INTO attachment_uploads (id, note_id, filename, content_type, size)
+            SELECT $1, id, $4, $5, $6 FROM notes WHERE id = $2 AND user_id = $3
+            RETURNING {UPLOAD_COLUMNS}
+            """,
+            uuid.uuid4(),
+            note_id,
+            user_id,
+            filename,
+            content_type,
+            size,
+        )
+        return _record_to_upload(row) if row else None
+
+
+async def get_upload(user_id: int, note_id: int, upload_id: str) -> Optional[Dict[str, Any]]:
+    upload_uuid = _upload_uuid(upload_id)
+    if upload_uuid is None:
+        return None
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT u.id, u.note_id, u.filename, u.content_type, u.size, u.received, u.created_at, u.updated_at
+            FROM attachment_uploads u
+            JOIN notes n ON n.id = u.note_id
+            WHERE u.id = $1 AND u.note_id = $2 AND n.user_id = $3
+            """,
+            upload_uuid,
+            note_id,
+            user_id,
+        )
+        return _record_to_upload(row) if row else None
+
+
+async def set_upload_received(upload_id: str, expected: int, received: int) -> bool:
+    """Record durable progress, only if nobody else moved it since `expected`."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            UPDATE attachment_uploads SET received = $3, updated_at = NOW()
+            WHERE id = $1 AND received = $2
+            RETURNING id
+            """,
+            uuid.UUID(upload_id),
+            expected,
+            received,
+        )
+        return row is not None
+
+
+async def complete_upload(
+    upload_id: str, sha256: str, place_blob: Callable[[], Awaitable[Any]]
+) -> Optional[Dict[str, Any]]:
+    """Turn a fully received upload into an attachment of blob `sha256`.
+
+    The blob and attachment rows are written first and stay locked while
+    `place_blob` moves the bytes into the store, so a concurrent garbage
+    collection of the same content either finishes before (and the bytes are
+    placed again) or waits, and a failing insert leaves no bytes behind. Should
+    the commit itself fail after the bytes were placed, garbage collection
+    sweeps the blob file that has no row. Returns None if the upload no longer
+    exists.
+    """
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            upload = await conn.fetchrow(
+                f"SELECT {UPLOAD_COLUMNS} FROM attachment_uploads WHERE id = $1 FOR UPDATE",
+                uuid.UUID(upload_id),
+            )
+            if upload is None:
+                return None
+            await conn.execute(
+                """
+                INSERT INTO blobs (sha256, size) VALUES ($1, $2)
+                ON CONFLICT (sha256) DO UPDATE SET last_used_at = NOW()
+                """,
+                sha256,
+                upload["size"],
+            )
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO note_attachments (note_id, sha256, filename, content_type, size)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING {ATTACHMENT_COLUMNS}
+                """,
+                upload["note_id"],
+                sha256,
+                upload["filename"],
+                upload["content_type"],
+                upload["size"],
+            )
+            await conn.execute("DELETE FROM attachment_uploads WHERE id = $1", upload["id"])
+            await place_blob()
+            return _record_to_attachment(row)
+
+
+async def delete_upload(user_id: int, note_id: int, upload_id: str) -> bool:
+    upload_uuid = _upload_uuid(upload_id)
+    if upload_uuid is None:
+        return False
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            DELETE FROM attachment_uploads u
+            USING notes n
+            WHERE u.id = $1 AND u.note_id = $2 AND n.id = u.note_id AND n.user_id = $3
+            RETURNING u.id
+            """,
+            upload_uuid,
+            note_id,
+            user_id,
+        )
+        return row is not None
+
+
+async def list_attachments(user_id: int, note_id: int) -> List[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT a.id, a.note_id, a.sha256, a.filename, a.content_type, a.size, a.created_at
+            FROM note_attachments a
+            JOIN notes n ON n.id = a.note_id
+            WHERE a.note_id = $1 AND n.user_id = $2
+            ORDER BY a.id
+            """,
+            note_id,
+            user_id,
+        )
+        return [_record_to_attachment(r) for r in rows]
+
+
+async def get_attachment(user_id: int, note_id: int, attachment_id: int) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT a.id, a.note_id, a.sha256, a.filename, a.content_type, a.size, a.created_at
+            FROM note_attachments a
+            JOIN notes n ON n.id = a.note_id
+            WHERE a.id = $1 AND a.note_id = $2 AND n.user_id = $3
+            """,
+            attachment_id,
+            note_id,
+            user_id,
+        )
+        return _record_to_attachment(row) if row else None
+
+
+async def delete_attachment(user_id: int, note_id: int, attachment_id: int) -> bool:
+    """Drop the attachment row; its blob is reclaimed by GC once nothing references it."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            DELETE FROM note_attachments a
+            USING notes n
+            WHERE a.id = $1 AND a.note_id = $2 AND n.id = a.note_id AND n.user_id = $3
+            RETURNING a.id
+            """,
+            attachment_id,
+            note_id,
+            user_id,
+        )
+        return row is not None
+
+
+async def expire_uploads(min_age_seconds: float) -> List[str]:
+    """Delete uploads idle for `min_age_seconds`; returns their ids."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            "DELETE FROM attachment_uploads WHERE updated_at < NOW() - make_interval(secs => $1) RETURNING id",
+            float(min_age_seconds),
+        )
+        return [str(r["id"]) for r in rows]
+
+
+async def existing_uploads(upload_ids: List[str]) -> List[str]:
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            "SELECT id FROM attachment_uploads WHERE id = ANY($1::uuid[])",
+            [u for u in map(_upload_uuid, upload_ids) if u is not None],
+        )
+        return [str(r["id"]) for r in rows]
+
+
+async def existing_blobs(digests: List[str]) -> List[str]:
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch("SELECT sha256 FROM blobs WHERE sha256 = ANY($1::text[])", digests)
+        return [r["sha256"] for r in rows]
+
+
+async def delete_orphan_blobs(
+    min_age_seconds: float, limit: int, remove: Callable[[List[str]], Awaitable[Any]]
+) -> int:
+    """Delete up to `limit` unreferenced blobs unused for `min_age_seconds`.
+
+    `remove` deletes the bytes while the rows are still locked by this
+    transaction (see complete_upload); returns how many blobs went.
+    """
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            rows = await conn.fetch(
+                """
+                DELETE FROM blobs
+                WHERE sha256 IN (
+                    SELECT b.sha256 FROM blobs b
+                    WHERE b.last_used_at < NOW() - make_interval(secs => $1)
+                      AND NOT EXISTS (SELECT 1 FROM note_attachments a WHERE a.sha256 = b.sha256)
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING sha256
+                """,
+                float(min_age_seconds),
+                limit,
+            )
+            await remove([r["sha256"] for r in rows])
+            return len(rows)
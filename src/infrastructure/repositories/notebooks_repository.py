@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+NOTEBOOK_COLUMNS = "id, parent_id, name, created_at"
+# Transaction-scoped lock taken by every statement sequence that rewires a user's tree
+TREE_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended('notebooks', $1))"
+# Raised when a path would exceed the notebooks_path_length check
+TOO_DEEP_MESSAGE = "Notebooks are nested too deeply"
+# `sub` ranges over the subtree of `nb`, itself included: one (user_id, path) index range
+SUBTREE_JOIN = """
+    JOIN notebooks sub
+      ON sub.user_id = nb.user_id AND sub.path >= nb.path AND sub.path < left(nb.path, -1) || '0'
+"""
+
+
+def _record_to_notebook(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "parent_id": row["parent_id"],
+        "name": row["name"],
+        "created_at": row["created_at"],
+    }
+
+
+def _subtree_upper_bound(path: str) -> str:
+    # '0' is the byte right after '/', so this bounds every path extending `path`
+    return path[:-1] + "0"
+
+
+async def create_notebook(user_id: int, name: str, parent_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Insert a notebook under `parent_id`; None if the parent is not the user's."""
+    try:
+        return await _create_notebook(user_id, name, parent_id)
+    except asyncpg.CheckViolationError as e:
+        raise ValueError(TOO_DEEP_MESSAGE) from e
+
+
+async def _create_notebook(user_id: int, name: str, parent_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            # Tree changes are serialised per user, so the parent's path cannot move underneath us
+            await conn.execute(TREE_LOCK_SQL, user_id)
+            row = await conn.fetchrow(
+                f"""
+                WITH parent AS (
+                    SELECT path FROM notebooks WHERE id = $2 AND user_id = $1
+                ), new AS (
+                    SELECT nextval(pg_get_serial_sequence('notebooks', 'id')) AS id
+                )
+                INSERT INTO notebooks (id, user_id, parent_id, name, path)
+                SELECT new.id, $1, $2, $3, coalesce((SELECT path FROM parent), '/') || new.id || '/'
+                FROM new
+                WHERE $2::bigint IS NULL OR EXISTS (SELECT 1 FROM parent)
+                RETURNING {NOTEBOOK_COLUMNS}
+                """,
+                user_id,
+                parent_id,
+                name,
+            )
+            return _record_to_notebook(row) if row else None
+
+
+async def get_notebook(user_id: int, notebook_id: int) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"SELECT {NOTEBOOK_COLUMNS} FROM notebooks WHERE id = $1 AND user_id = $2",
+            notebook_id,
+            user_id,
+        )
+        return _record_to_notebook(row) if row else None
+
+
+async def list_root_notebooks(user_id: int) -> List[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT {NOTEBOOK_COLUMNS} FROM notebooks
+            WHERE user_id = $1 AND parent_id IS NULL
+            ORDER BY name, id
+            """,
+            user_id,
+        )
+        return [_record_to_notebook(r) for r in rows]
+
+
+async def list_subtree(user_id: int, notebook_id: int) -> List[Dict[str, Any]]:
+    """Every notebook under `notebook_id` (itself first) with its depth and direct note count.
+
+    One path range scan, whatever the shape of the tree.
+    """
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT sub.id, sub.parent_id, sub.name, sub.created_at,
+                   length(replace(sub.path, '/', '//')) - length(sub.path)
+                       - (length(replace(nb.path, '/', '//')) - length(nb.path)) AS depth,
+                   (SELECT count(*) FROM notes n WHERE n.notebook_id = sub.id) AS note_count
+            FROM notebooks nb
+            {SUBTREE_JOIN}
+            WHERE nb.id = $1 AND nb.user_id = $2
+            ORDER BY depth, sub.name, sub.id
+            """,
+            notebook_id,
+            user_id,
+        )
+        return [dict(_record_to_notebook(r), depth=r["depth"], note_count=r["note_count"]) for r in rows]
+
+
+async def count_subtree(user_id: int, notebook_id: int) -> Dict[str, int]:
+    """Notebooks and notes anywhere under `notebook_id`, in one query."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            WITH sub AS (
+                SELECT sub.id FROM notebooks nb
+                {SUBTREE_JOIN}
+                WHERE nb.id = $1 AND nb.user_id = $2
+            )
+            SELECT (SELECT count(*) FROM sub) AS notebooks,
+                   (SELECT count(*) FROM notes n WHERE n.user_id = $2 AND n.notebook_id IN (SELECT id FROM sub))
+                       AS notes
+            """,
+            notebook_id,
+            user_id,
+        )
+        return {"notebooks": row["notebooks"], "notes": row["notes"]}
+
+
+async def rename_notebook(user_id: int, notebook_id: int, name: str) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            UPDATE notebooks SET name = $3
+            WHERE id = $1 AND user_id = $2
+            RETURNING {NOTEBOOK_COLUMNS}
+            """,
+            notebook_id,
+            user_id,
+            name,
+        )
+        return _record_to_notebook(row) if row else None
+
+
+async def move_notebook(user_id: int, notebook_id: int, parent_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Re-parent a whole subtree with one UPDATE of the moved rows' path prefixes.
+
+    Returns None if either notebook is not the user's; raises ValueError when
+    the new parent lies inside the moved subtree or the move nests it too deeply.
+    """
+    try:
+        return await _move_notebook(user_id, notebook_id, parent_id)
+    except asyncpg.CheckViolationError as e:
+        raise ValueError(TOO_DEEP_MESSAGE) from e
+
+
+async def _move_notebook(user_id: int, notebook_id: int, parent_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            # Serialise tree changes per user so concurrent moves cannot build a cycle
+            await conn.execute(TREE_LOCK_SQL, user_id)
+            paths = {
+                r["id"]: r["path"]
+                for r in await conn.fetch(
+                    "SELECT id, path FROM notebooks WHERE user_id = $1 AND id = ANY($2::bigint[])",
+                    user_id,
+                    [notebook_id] if parent_id is None else [notebook_id, parent_id],
+                )
+            }
+            if notebook_id not in paths or (parent_id is not None and parent_id not in paths):
+                return None
+            old_path = paths[notebook_id]
+            parent_path = "/" if parent_id is None else paths[parent_id]
+            if parent_path.startswith(old_path):
+                raise ValueError("Cannot move a notebook into itself or its descendants")
+
+            row = await conn.fetchrow(
+                f"""
+                WITH moved AS (
+                    UPDATE notebooks
+                    SET path = $4 || substr(path, length($3) + 1),
+                        parent_id = CASE WHEN id = $1 THEN $6::bigint ELSE parent_id END
+                    WHERE user_id = $2 AND path >= $3 AND path < $5
+                    RETURNING {NOTEBOOK_COLUMNS}
+                )
+                SELECT {NOTEBOOK_COLUMNS} FROM moved WHERE id = $1
+                """,
+                notebook_id,
+                user_id,
+                old_path,
+                f"{parent_path}{notebook_id}/",
+                _subtree_upper_bound(old_path),
+                parent_id,
+            )
+            return _record_to_notebook(row)
+
+
+async def delete_notebook(user_id: int, notebook_id: int) -> int:
+    """Delete a notebook and its whole subtree; their notes become unfiled."""
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            await conn.execute(TREE_LOCK_SQL, user_id)
+            result = await conn.execute(
+                f"""
+                DELETE FROM notebooks
+                WHERE id IN (
+                    SELECT sub.id FROM notebooks nb
+                    {SUBTREE_JOIN}
+                    WHERE nb.id = $1 AND nb.user_id = $2
+                )
+                """,
+                notebook_id,
+                user_id,
+            )
+            return int(result.split()[-1])
@@ -0,0 +1,629 @@
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+# NOTIFY channel fed by the notes triggers (see migration 0007)
+NOTES_CHANGED_CHANNEL = "notes_changed"
+
+# Columns served by list endpoints; all covered by idx_notes_user_updated
+SUMMARY_COLUMNS = "id, title, excerpt, version, updated_at"
+NOTE_COLUMNS = "id, user_id, notebook_id, title, body, version, created_at, updated_at"
+# A note's tags, sorted; appended to NOTE_COLUMNS where the full note is served
+TAGS_COLUMN = "ARRAY(SELECT t.tag FROM note_tags t WHERE t.note_id = notes.id ORDER BY t.tag) AS tags"
+# Tag filters whose rarest tag has more notes than this first try this many notes newest-first
+TAG_SCAN_ROWS = 2000
+# `notes` carries every tag in $2 (one primary-key probe per tag)
+_ALL_TAGS_FILTER = """(
+    SELECT count(*) FROM note_tags t WHERE t.note_id = notes.id AND t.tag = ANY($2::text[])
+) = cardinality($2::text[])"""
+
+# ts_headline markers; control characters cannot collide with note text, so the
+# service can HTML-escape the snippet and then turn them into <mark> tags
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+_HEADLINE_OPTIONS = (
+    f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", '
+    "MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=\" ... \""
+)
+
+
+def _record_to_note(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "notebook_id": row["notebook_id"],
+        "title": row["title"],
+        "body": row["body"],
+        "version": row["version"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def _record_to_tagged_note(row) -> Dict[str, Any]:
+    return dict(_record_to_note(row), tags=list(row["tags"]))
+
+
+def _record_to_summary(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "excerpt": row["excerpt"],
+        "version": row["version"],
+        "updated_at": row["updated_at"],
+    }
+
+
+async def create_note(user_id: int, title: str, body: str, tags: Sequence[str] = ()) -> Dict[str, Any]:
+    """Insert a note and its (already normalized) tags in one statement."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            WITH note AS (
+                INSERT INTO notes (user_id, title, body)
+                VALUES ($1, $2, $3)
+                RETURNING {NOTE_COLUMNS}
+            ), tagged AS (
+                INSERT INTO note_tags (note_id, user_id, tag)
+                SELECT note.id, $1, tag FROM note, unnest($4::text[]) AS tag
+            )
+            SELECT * FROM note
+            """,
+            user_id,
+            title,
+            body,
+            list(tags),
+        )
+        return dict(_record_to_note(row), tags=list(tags))
+
+
+async def get_note(user_id: int, note_id: int) -> Optional[Dict[str, Any]]:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"SELECT {NOTE_COLUMNS}, {TAGS_COLUMN} FROM notes WHERE id = $1 AND user_id = $2",
+            note_id,
+            user_id,
+        )
+        return _record_to_tagged_note(row) if row else None
+
+
+async def update_note(
+    user_id: int, note_id: int, title: str, body: str, tags: Optional[Sequence[str]] = None
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Overwrite a note; returns the updated note and the body it replaced.
+
+    `tags` (normalized) replaces the note's tags; only the difference is written,
+    so unchanged tags cost no facet count updates. None keeps the current tags.
+    """
+    async with async_pooled_connection() as conn:
+        # FOR UPDATE returns the latest committed row and holds it, so the old body
+        # is exactly the one this update replaces, fetched in the same round trip
+        row = await conn.fetchrow(
+            """
+            WITH old AS (
+                SELECT id, body FROM notes WHERE id = $1 AND user_id = $2 FOR UPDATE
+            ),
+            untagged AS (
+                DELETE FROM note_tags t
+                USING old
+                WHERE $5::text[] IS NOT NULL AND t.note_id = old.id AND t.tag <> ALL($5::text[])
+            ),
+            tagged AS (
+                INSERT INTO note_tags (note_id, user_id, tag)
+                SELECT old.id, $2, tag FROM old, unnest($5::text[]) AS tag
+                ON CONFLICT (note_id, tag) DO NOTHING
+            )
+            UPDATE notes n
+            SET title = $3, body = $4, version = n.version + 1, updated_at = NOW()
+            FROM old
+            WHERE n.id = old.id
+            RETURNING n.id, n.user_id, n.notebook_id, n.title, n.body, n.version, n.created_at, n.updated_at,
+                      old.body AS previous_body,
+                      coalesce($5::text[], ARRAY(SELECT t.tag FROM note_tags t WHERE t.note_id = n.id ORDER BY t.tag))
+                          AS tags
+            """,
+            note_id,
+            user_id,
+            title,
+            body,
+            None if tags is None else list(tags),
+        )
+        return (_record_to_tagged_note(row), row["previous_body"]) if row else None
+
+
+async def patch_note(
+    user_id: int,
+    note_id: int,
+    base_version: int,
+    ops: Sequence[Tuple[int, int, str]],
+    title: Optional[str],
+    min_length: int,
+    max_length: int,
+) -> Optional[Dict[str, Any]]:
+    """Apply text-range ops to the body in place, only if the note is at `base_version`.
+
+    The body never leaves the database. Returns the new version, title and the
+    replaced body's length, or None when the note is missing, has moved past
+    `base_version`, is shorter than `min_length` or would exceed `max_length`
+    characters; get_note_state tells these apart.
+    """
+    growth = sum(len(text) - (end - start) for start, end, text in ops)
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            WITH old AS (
+                SELECT id, length(body) AS length FROM notes
+                WHERE id = $1 AND user_id = $2 AND version = $3
+                FOR UPDATE
+            )
+            UPDATE notes n
+            SET body = apply_text_ops(n.body, $4::int[], $5::int[], $6::text[]),
+                title = coalesce($7, n.title),
+                version = n.version + 1,
+                updated_at = NOW()
+            FROM old
+            WHERE n.id = old.id AND old.length >= $8 AND old.length + $9 <= $10
+            RETURNING n.version, n.title, old.length AS previous_length
+            """,
+            note_id,
+            user_id,
+            base_version,
+            [start for start, _, _ in ops],
+            [end for _, end, _ in ops],
+            [text for _, _, text in ops],
+            title,
+            min_length,
+            growth,
+            max_length,
+        )
+        return dict(row) if row else None
+
+
+async def get_note_validator(user_id: int, note_id: int) -> Optional[Dict[str, Any]]:
+    """What a note's ETag covers (id, version, notebook and tags), without the body."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            f"SELECT id, version, notebook_id, {TAGS_COLUMN} FROM notes WHERE id = $1 AND user_id = $2",
+            note_id,
+            user_id,
+        )
+        return dict(row, tags=list(row["tags"])) if row else None
+
+
+async def get_list_watermark(user_id: int) -> int:
+    """Changes whenever any of the user's notes is created, updated or deleted."""
+    async with async_pooled_connection() as conn:
+        watermark = await conn.fetchval(
+            "SELECT watermark FROM note_list_watermarks WHERE user_id = $1",
+            user_id,
+        )
+        return watermark or 0
+
+
+async def get_note_state(user_id: int, note_id: int) -> Optional[Dict[str, Any]]:
+    """Current version and body length of a note, without transferring the body."""
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            "SELECT version, length(body) AS length FROM notes WHERE id = $1 AND user_id = $2",
+            note_id,
+            user_id,
+        )
+        return dict(row) if row else None
+
+
+async def set_notebook(user_id: int, note_id: int, notebook_id: Optional[int]) -> Optional[bool]:
+    """File a note under a notebook (None = unfiled).
+
+    Returns None if the note is not the user's and False if the notebook is not.
+    """
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            WITH target AS (
+                SELECT $3::bigint AS id
+                WHERE $3::bigint IS NULL OR EXISTS (SELECT 1 FROM notebooks WHERE id = $3 AND user_id = $2)
+            )
+            UPDATE notes SET notebook_id = target.id
+            FROM target
+            WHERE notes.id = $1 AND notes.user_id = $2
+            RETURNING notes.id
+            """,
+            note_id,
+            user_id,
+            notebook_id,
+        )
+        if row:
+            return True
+        exists = await conn.fetchval("SELECT 1 FROM notes WHERE id = $1 AND user_id = $2", note_id, user_id)
+        return False if exists else None
+
+
+async def delete_note(user_id: int, note_id: int) -> bool:
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            "DELETE FROM notes WHERE id = $1 AND user_id = $2 RETURNING id",
+            note_id,
+            user_id,
+        )
+        return row is not None
+
+
+async def apply_batch(
+    user_id: int,
+    note_ids: Sequence[int],
+    notebook_ids: Sequence[int],
+    tags_added: Sequence[Tuple[int, str]],
+    tags_removed: Sequence[Tuple[int, str]],
+    filed: Sequence[Tuple[int, Optional[int]]],
+    deleted: Sequence[int],
+    max_tags: int,
+) -> Tuple[Set[int], Set[int], Set[int]]:
+    """Apply bulk tag, untag, file and delete operations in one transaction.
+
+    Every kind of operation is a single multi-row statement over unnest()ed
+    arrays, run in that order. Operations naming a note (or, for filing, a
+    notebook) that is not the user's are skipped; the ids that were found are
+    returned so the caller can report per item. So are the notes whose tags
+    were left alone because the batch would have given them more than
+    `max_tags` tags.
+    """
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            # Lock the notes in id order: concurrent batches over overlapping selections cannot deadlock
+            found = {
+                r["id"]
+                for r in await conn.fetch(
+                    "SELECT id FROM notes WHERE user_id = $1 AND id = ANY($2::bigint[]) ORDER BY id FOR UPDATE",
+                    user_id,
+                    list(note_ids),
+                )
+            }
+            notebooks = set()
+            if notebook_ids:
+                notebooks = {
+                    r["id"]
+                    for r in await conn.fetch(
+                        "SELECT id FROM notebooks WHERE user_id = $1 AND id = ANY($2::bigint[]) FOR KEY SHARE",
+                        user_id,
+                        list(notebook_ids),
+                    )
+                }
+
+            tags_added = [(note_id, tag) for note_id, tag in tags_added if note_id in found]
+            over_limit: Set[int] = set()
+            if tags_added:
+                # The cap is on the tags a note ends up with, which depend on the ones it has
+                # (locked above with the note); untag runs after tag, so removals count
+                resulting: Dict[int, Set[str]] = {note_id: set() for note_id, _ in tags_added}
+                for r in await conn.fetch(
+                    "SELECT note_id, tag FROM note_tags WHERE note_id = ANY($1::bigint[])", list(resulting)
+                ):
+                    resulting[r["note_id"]].add(r["tag"])
+                for note_id, tag in tags_added:
+                    resulting[note_id].add(tag)
+                for note_id, tag in tags_removed:
+                    resulting.get(note_id, set()).discard(tag)
+                over_limit = {note_id for note_id, tags in resulting.items() if len(tags) > max_tags}
+                tags_added = [(note_id, tag) for note_id, tag in tags_added if note_id not in over_limit]
+            if tags_added:
+                await conn.execute(
+                    """
+                    INSERT INTO note_tags (note_id, user_id, tag)
+                    SELECT note_id, $1, tag FROM unnest($2::bigint[], $3::text[]) AS r(note_id, tag)
+                    ON CONFLICT (note_id, tag) DO NOTHING
+                    """,
+                    user_id,
+                    [note_id for note_id, _ in tags_added],
+                    [tag for _, tag in tags_added],
+                )
+            tags_removed = [(note_id, tag) for note_id, tag in tags_removed if note_id in found]
+            if tags_removed:
+                await conn.execute(
+                    """
+                    DELETE FROM note_tags t
+                    USING unnest($1::bigint[], $2::text[]) AS r(note_id, tag)
+                    WHERE t.note_id = r.note_id AND t.tag = r.tag
+                    """,
+                    [note_id for note_id, _ in tags_removed],
+                    [tag for _, tag in tags_removed],
+                )
+            filed = [
+                (note_id, notebook_id)
+                for note_id, notebook_id in filed
+                if note_id in found and (notebook_id is None or notebook_id in notebooks)
+            ]
+            if filed:
+                await conn.execute(
+                    """
+                    UPDATE notes n SET notebook_id = r.notebook_id
+                    FROM unnest($1::bigint[], $2::bigint[]) AS r(note_id, notebook_id)
+                    WHERE n.id = r.note_id AND n.notebook_id IS DISTINCT FROM r.notebook_id
+                    """,
+                    [note_id for note_id, _ in filed],
+                    [notebook_id for _, notebook_id in filed],
+                )
+            deleted = [note_id for note_id in deleted if note_id in found]
+            if deleted:
+                await conn.execute("DELETE FROM notes WHERE id = ANY($1::bigint[])", deleted)
+            return found, notebooks, over_limit
+
+
+async def list_notes(
+    user_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """Summaries newest-first, strictly after the `(updated_at, id)` keyset position.
+
+    The row comparison seeks straight into idx_notes_user_updated, so every page
+    costs the same however deep it is.
+    """
+    async with async_pooled_connection() as conn:
+        if after is None:
+            rows = await conn.fetch(
+                f"""
+                SELECT {SUMMARY_COLUMNS} FROM notes
+                WHERE user_id = $1
+                ORDER BY updated_at DESC, id DESC
+                LIMIT $2
+                """,
+                user_id,
+                limit,
+            )
+        else:
+            rows = await conn.fetch(
+                f"""
+                SELECT {SUMMARY_COLUMNS} FROM notes
+                WHERE user_id = $1 AND (updated_at, id) < ($2, $3)
+                ORDER BY updated_at DESC, id DESC
+                LIMIT $4
+                """,
+                user_id,
+                after[0],
+                after[1],
+                limit,
+            )
+        return [_record_to_summary(r) for r in rows]
+
+
+async def list_tagged_notes(
+    user_id: int, tags: Sequence[str], limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """Like list_notes, restricted to notes carrying every one of `tags`.
+
+    Candidates normally come from the posting list of the rarest requested tag
+    (per user_tag_counts), with the other tags as primary-key probes. When even
+    the rarest tag is common, sorting its whole posting list costs more than
+    walking idx_notes_user_updated and probing each note, so the next
+    TAG_SCAN_ROWS notes are tried first; if they do not fill the page (the tags
+    rarely occur together) the posting list is used after all.
+    """
+    async with async_pooled_connection() as conn:
+        rarest = await conn.fetchrow(
+            """
+            SELECT wanted.tag, coalesce(c.note_count, 0) AS note_count
+            FROM unnest($2::text[]) AS wanted(tag)
+            LEFT JOIN user_tag_counts c ON c.user_id = $1 AND c.tag = wanted.tag
+            ORDER BY 2
+            LIMIT 1
+            """,
+            user_id,
+            list(tags),
+        )
+        if rarest is None or rarest["note_count"] == 0:
+            return []
+        args = (
+            user_id,
+            list(tags),
+            after[0] if after else None,
+            after[1] if after else None,
+            limit,
+        )
+        if rarest["note_count"] > TAG_SCAN_ROWS:
+            rows = await conn.fetch(
+                f"""
+                SELECT {SUMMARY_COLUMNS} FROM (
+                    SELECT {SUMMARY_COLUMNS} FROM notes
+                    WHERE user_id = $1 AND ($3::timestamptz IS NULL OR (updated_at, id) < ($3, $4::bigint))
+                    ORDER BY updated_at DESC, id DESC
+                    LIMIT $6
+                ) AS notes
+                WHERE {_ALL_TAGS_FILTER}
+                ORDER BY updated_at DESC, id DESC
+                LIMIT $5
+                """,
+                *args,
+                TAG_SCAN_ROWS,
+            )
+            if len(rows) == limit:
+                return [_record_to_summary(r) for r in rows]
+        rows = await conn.fetch(
+            f"""
+            SELECT {SUMMARY_COLUMNS} FROM notes
+            WHERE user_id = $1
+              AND id IN (SELECT note_id FROM note_tags WHERE user_id = $1 AND tag = $6)
+              AND {_ALL_TAGS_FILTER}
+              AND ($3::timestamptz IS NULL OR (updated_at, id) < ($3, $4::bigint))
+            ORDER BY updated_at DESC, id DESC
+            LIMIT $5
+            """,
+            *args,
+            rarest["tag"],
+        )
+        return [_record_to_summary(r) for r in rows]
+
+
+async def get_tag_counts(user_id: int) -> List[Dict[str, Any]]:
+    """The user's tags with their note counts: one primary-key range read."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            "SELECT tag, note_count FROM user_tag_counts WHERE user_id = $1 ORDER BY tag",
+            user_id,
+        )
+        return [{"tag": r["tag"], "count": r["note_count"]} for r in rows]
+
+
+async def list_notebook_notes(
+    user_id: int, notebook_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """Like list_notes, restricted to notes filed anywhere under `notebook_id`."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT {SUMMARY_COLUMNS} FROM notes
+            WHERE user_id = $2
+              AND notebook_id IN (
+                  SELECT sub.id FROM notebooks nb
+                  JOIN notebooks sub
+                    ON sub.user_id = nb.user_id AND sub.path >= nb.path AND sub.path < left(nb.path, -1) || '0'
+                  WHERE nb.id = $1 AND nb.user_id = $2
+              )
+              AND ($3::timestamptz IS NULL OR (updated_at, id) < ($3, $4::bigint))
+            ORDER BY updated_at DESC, id DESC
+            LIMIT $5
+            """,
+            notebook_id,
+            user_id,
+            after[0] if after else None,
+            after[1] if after else None,
+            limit,
+        )
+        return [_record_to_summary(r) for r in rows]
+
+
+async def search_notes(
+    user_id: int, query: str, limit: int, after: Optional[Tuple[float, int]] = None
+) -> List[Dict[str, Any]]:
+    """Ranked full-text matches, best first, strictly after the `(rank, id)` position.
+
+    Matching and ranking use the GIN-indexed search_vector; the body is only read
+    (for ts_headline) for the rows of the returned page.
+    """
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            WITH q AS (SELECT websearch_to_tsquery('english', $2) AS query),
+            page AS (
+                SELECT n.id, ts_rank_cd(n.search_vector, q.query) AS rank
+                FROM notes n, q
+                WHERE n.user_id = $1 AND n.search_vector @@ q.query
+                  AND ($3::real IS NULL OR (ts_rank_cd(n.search_vector, q.query), n.id) < ($3::real, $4::bigint))
+                ORDER BY rank DESC, n.id DESC
+                LIMIT $5
+            )
+            SELECT n.id, n.title, n.version, n.updated_at, page.rank,
+                   ts_headline('english', left(n.body, 100000), q.query, $6) AS snippet
+            FROM page
+            JOIN notes n ON n.id = page.id, q
+            ORDER BY page.rank DESC, page.id DESC
+            """,
+            user_id,
+            query,
+            after[0] if after else None,
+            after[1] if after else None,
+            limit,
+            _HEADLINE_OPTIONS,
+        )
+        return [
+            {
+                "id": r["id"],
+                "title": r["title"],
+                "version": r["version"],
+                "updated_at": r["updated_at"],
+                "rank": r["rank"],
+                "snippet": r["snippet"],
+            }
+            for r in rows
+        ]
+
+
+async def iter_notes(user_id: int, prefetch: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every note of a user through a server-side cursor.
+
+    Only `prefetch` rows are held in memory at a time. The snapshot is consistent
+    (repeatable read) for the whole export, and the pooled connection stays
+    borrowed until the iterator is exhausted or closed.
+    """
+    async with async_pooled_connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            async for row in conn.cursor(
+                f"SELECT {NOTE_COLUMNS} FROM notes WHERE user_id = $1 ORDER BY id",
+                user_id,
+                prefetch=prefetch,
+            ):
+                yield _record_to_note(row)
+
+
+# Staging row layout used by import_notes
+IMPORT_COLUMNS = ["line", "note_id", "title", "body", "created_at", "updated_at"]
+
+
+async def import_notes(user_id: int, records: AsyncIterable[Tuple]) -> Dict[str, int]:
+    """Bulk-load `records` (IMPORT_COLUMNS tuples) with COPY, then merge into notes.
+
+    Rows whose note_id is one of the user's notes update it; all others are
+    inserted as new notes. Each resulting version is stored as a revision
+    snapshot. Everything happens in one transaction, so a failure
+    anywhere in the stream (including a parse error raised by `records`) leaves
+    no partial import behind.
+    """
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                """
+                CREATE TEMP TABLE notes_import (
+                    line BIGINT NOT NULL,
+                    note_id BIGINT,
+                    title TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    created_at TIMESTAMPTZ,
+                    updated_at TIMESTAMPTZ
+                ) ON COMMIT DROP
+                """
+            )
+            await conn.copy_records_to_table("notes_import", records=records, columns=IMPORT_COLUMNS)
+            counts = await conn.fetchrow(
+                """
+                WITH latest AS (
+                    -- The last line wins when a note id appears more than once
+                    SELECT DISTINCT ON (note_id) *
+                    FROM notes_import
+                    WHERE note_id IS NOT NULL
+                    ORDER BY note_id, line DESC
+                ),
+                updated AS (
+                    UPDATE notes n
+                    SET title = l.title,
+                        body = l.body,
+                        version = n.version + 1,
+                        updated_at = COALESCE(l.updated_at, NOW())
+                    FROM latest l
+                    WHERE n.id = l.note_id AND n.user_id = $1
+                    RETURNING n.id, n.version, n.title, n.body
+                ),
+                inserted AS (
+                    INSERT INTO notes (user_id, title, body, created_at, updated_at)
+                    SELECT $1, s.title, s.body,
+                           COALESCE(s.created_at, NOW()),
+                           COALESCE(s.updated_at, s.created_at, NOW())
+                    FROM notes_import s
+                    WHERE s.note_id IS NULL
+                       OR NOT EXISTS (SELECT 1 FROM notes n WHERE n.id = s.note_id AND n.user_id = $1)
+                    ORDER BY s.line
+                    RETURNING id, version, title, body
+                ),
+                revisions AS (
+                    -- Imported versions start fresh revision chains
+                    INSERT INTO note_revisions (note_id, revision, title, body)
+                    SELECT id, version, title, body FROM updated
+                    UNION ALL
+                    SELECT id, version, title, body FROM inserted
+                    ON CONFLICT (note_id, revision) DO NOTHING
+                )
+                SELECT (SELECT count(*) FROM updated) AS updated,
+                       (SELECT count(*) FROM inserted) AS inserted,
+                       (SELECT count(*) FROM notes_import) AS total
+                """,
+                user_id,
+            )
+            return {"rows": counts["total"], "inserted": counts["inserted"], "updated": counts["updated"]}
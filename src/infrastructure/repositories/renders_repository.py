@@ -0,0 +1,61 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+# Same key as src.domain.notes.markdown.render_key, computed from a note's body in SQL
+_BODY_KEY = "encode(sha256(convert_to($1 || chr(10) || n.body, 'UTF8')), 'hex')"
+
+
+async def get_render(content_hash: str) -> Optional[str]:
+    async with async_pooled_connection() as conn:
+        return await conn.fetchval("SELECT html FROM note_renders WHERE content_hash = $1", content_hash)
+
+
+async def put_renders(renderer_version: str, renders: Sequence[Tuple[str, str, float]]) -> None:
+    """Store (content_hash, html, render_ms) rows; existing keys are left alone."""
+    if not renders:
+        return
+    hashes, htmls, timings = zip(*renders)
+    async with async_pooled_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO note_renders (content_hash, renderer_version, html, render_ms)
+            SELECT h, $1, html, ms FROM unnest($2::text[], $3::text[], $4::real[]) AS t(h, html, ms)
+            ON CONFLICT (content_hash) DO NOTHING
+            """,
+            renderer_version,
+            list(hashes),
+            list(htmls),
+            list(timings),
+        )
+
+
+async def list_note_bodies(after_id: int, limit: int) -> List[Dict[str, Any]]:
+    """A page of (id, body) over every note, in id order."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch("SELECT id, body FROM notes WHERE id > $1 ORDER BY id LIMIT $2", after_id, limit)
+        return [{"id": r["id"], "body": r["body"]} for r in rows]
+
+
+async def existing_renders(content_hashes: Sequence[str]) -> List[str]:
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            "SELECT content_hash FROM note_renders WHERE content_hash = ANY($1::text[])", list(content_hashes)
+        )
+        return [r["content_hash"] for r in rows]
+
+
+async def purge_renders(renderer_version: str) -> int:
+    """Delete renders of other renderer versions and of bodies no note has any more."""
+    async with async_pooled_connection() as conn:
+        result = await conn.execute(
+            f"""
+            DELETE FROM note_renders r
+            WHERE r.renderer_version <> $1
+               OR NOT EXISTS (SELECT 1 FROM notes n WHERE {_BODY_KEY} = r.content_hash)
+            """,
+            renderer_version,
+        )
+        return int(result.split()[-1])
+
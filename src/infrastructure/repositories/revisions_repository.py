@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.infrastructure.database.async_pool import async_pooled_connection
+
+
+def _record_to_summary(row) -> Dict[str, Any]:
+    return {
+        "revision": row["revision"],
+        "title": row["title"],
+        "snapshot": row["snapshot"],
+        "created_at": row["created_at"],
+    }
+
+
+async def insert_delta(
+    note_id: int, revision: int, title: str, delta: str, max_chain: int
+) -> bool:
+    """Store `revision` as a delta on `revision - 1`.
+
+    Returns False without writing when the previous revision is missing or its
+    chain already holds `max_chain` deltas; the caller then stores a snapshot.
+    """
+    async with async_pooled_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            INSERT INTO note_revisions (note_id, revision, title, delta, chain_length)
+            SELECT $1, $2, $3, $4, prev.chain_length + 1
+            FROM note_revisions prev
+            WHERE prev.note_id = $1 AND prev.revision = $2 - 1 AND prev.chain_length < $5
+            ON CONFLICT (note_id, revision) DO NOTHING
+            RETURNING revision
+            """,
+            note_id,
+            revision,
+            title,
+            delta,
+            max_chain,
+        )
+        return row is not None
+
+
+async def insert_snapshot(note_id: int, revision: int, title: str, body: str) -> None:
+    async with async_pooled_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO note_revisions (note_id, revision, title, body, chain_length)
+            VALUES ($1, $2, $3, $4, 0)
+            ON CONFLICT (note_id, revision) DO NOTHING
+            """,
+            note_id,
+            revision,
+            title,
+            body,
+        )
+
+
+async def list_revisions(
+    user_id: int, note_id: int, limit: int, before: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Revision summaries of one of the user's notes, newest first, below `before`."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT r.revision, r.title, r.body IS NOT NULL AS snapshot, r.created_at
+            FROM note_revisions r
+            JOIN notes n ON n.id = r.note_id
+            WHERE r.note_id = $1 AND n.user_id = $2 AND ($3::int IS NULL OR r.revision < $3)
+            ORDER BY r.revision DESC
+            LIMIT $4
+            """,
+            note_id,
+            user_id,
+            before,
+            limit,
+        )
+        return [_record_to_summary(r) for r in rows]
+
+
+async def load_chain(user_id: int, note_id: int, revision: int) -> List[Dict[str, Any]]:
+    """The nearest snapshot at or below `revision` plus every delta up to it, in order.
+
+    Empty when the note is not the user's or the revision does not exist.
+    """
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            WITH base AS (
+                SELECT max(r.revision) AS revision
+                FROM note_revisions r
+                JOIN notes n ON n.id = r.note_id
+                WHERE r.note_id = $1 AND n.user_id = $2
+                  AND r.revision <= $3 AND r.body IS NOT NULL
+            )
+            SELECT r.revision, r.title, r.body, r.delta, r.created_at
+            FROM note_revisions r, base
+            WHERE r.note_id = $1 AND r.revision BETWEEN base.revision AND $3
+            ORDER BY r.revision
+            """,
+            note_id,
+            user_id,
+            revision,
+        )
+        return [dict(r) for r in rows]
+
+
+async def find_long_chains(max_chain: int, min_age_seconds: float, limit: int) -> List[int]:
+    """Ids of notes holding a settled revision more than `max_chain` deltas from its snapshot."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT DISTINCT note_id FROM note_revisions
+            WHERE delta IS NOT NULL AND chain_length > $1
+              AND created_at < NOW() - make_interval(secs => $2)
+            LIMIT $3
+            """,
+            max_chain,
+            float(min_age_seconds),
+            limit,
+        )
+        return [r["note_id"] for r in rows]
+
+
+async def load_history(note_id: int, min_age_seconds: float) -> List[Dict[str, Any]]:
+    """Every settled revision of a note from its first snapshot on, in order."""
+    async with async_pooled_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT revision, body, delta, chain_length FROM note_revisions
+            WHERE note_id = $1 AND created_at < NOW() - make_interval(secs => $2)
+            ORDER BY revision
+            """,
+            note_id,
+            float(min_age_seconds),
+        )
+        return [dict(r) for r in rows]
+
+
+async def convert_to_snapshots(note_id: int, snapshots: Sequence[Tuple[int, str]]) -> int:
+    """Store full bodies for the given revisions and renumber the note's chains."""
+    async with async_pooled_connection() as conn:
+        async with conn.transaction():
+            converted = await conn.fetchval(
+                """
+                WITH converted AS (
+                    UPDATE note_revisions r
+                    SET body = s.body, delta = NULL, chain_length = 0
+                    FROM unnest($2::int[], $3::text[]) AS s(revision, body)
+                    WHERE r.note_id = $1 AND r.revision = s.revision AND r.delta IS NOT NULL
+                    RETURNING 1
+                )
+                SELECT count(*) FROM converted
+                """,
+                note_id,
+                [revision for revision, _ in snapshots],
+                [body for _, body in snapshots],
+            )
+            # Chains are contiguous, so a delta's length is its distance to the last snapshot
+            await conn.execute(
+                """
+                UPDATE note_revisions r
+                SET chain_length = r.revision - s.base
+                FROM (
+                    SELECT revision,
+                           max(revision) FILTER (WHERE body IS NOT NULL) OVER (ORDER BY revision) AS base
+                    FROM note_revisions
+                    WHERE note_id = $1
+                ) s
+                WHERE r.note_id = $1 AND r.revision = s.revision AND r.delta IS NOT NULL
+                  AND r.chain_length <> r.revision - s.base
+                """,
+                note_id,
+            )
+            return converted
@@ -1,24 +1,21 @@
 from typing import Optional
 
-from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.pool import pooled_connection
+from src.infrastructure.repositories.async_sessions_repository import SESSION_REVOKED_CHANNEL
 
 
 def create_session(user_id: int, jti: str) -> None:
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn:
             with conn.cursor() as cur:
                 cur.execute(
                     "INSERT INTO auth_sessions (jti, user_id) VALUES (%s, %s)",
                     (jti, user_id),
                 )
-    finally:
-        conn.close()
 
 
 def is_session_active(jti: str) -> bool:
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 "SELECT revoked_at IS NULL FROM auth_sessions WHERE jti = %s",
@@ -28,19 +25,21 @@ def is_session_active(jti: str) -> bool:
             if not row:
                 return False
             return bool(row[0])
-    finally:
-        conn.close()
 
 
 def revoke_session(jti: str) -> bool:
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    "UPDATE auth_sessions SET revoked_at = NOW() WHERE jti = %s AND revoked_at IS NULL",
-                    (jti,),
+                    """
+                    WITH revoked AS (
+                        UPDATE auth_sessions SET revoked_at = NOW()
+                        WHERE jti = %s AND revoked_at IS NULL
+                        RETURNING jti
+                    )
+                    SELECT pg_notify(%s, jti) FROM revoked
+                    """,
+                    (jti, SESSION_REVOKED_CHANNEL),
                 )
                 return cur.rowcount > 0
-    finally:
-        conn.close()
@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any
 
 import psycopg2
 
-from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.pool import pooled_connection
 
 
 def _row_to_user(row) -> Dict[str, Any]:
@@ -15,8 +15,7 @@ def _row_to_user(row) -> Dict[str, Any]:
 
 
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 "SELECT id, email, password_hash, created_at FROM users WHERE email = %s",
@@ -24,13 +23,10 @@ def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
             )
             row = cur.fetchone()
             return _row_to_user(row) if row else None
-    finally:
-        conn.close()
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 "SELECT id, email, password_hash, created_at FROM users WHERE id = %s",
@@ -38,29 +34,25 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
             )
             row = cur.fetchone()
             return _row_to_user(row) if row else None
-    finally:
-        conn.close()
 
 
 def create_user(email: str, password_hash: str) -> Dict[str, Any]:
-    conn = get_db_connection()
     try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO users (email, password_hash)
-                    VALUES (%s, %s)
-                    RETURNING id, email, password_hash, created_at
-                    """,
-                    (email, password_hash),
-                )
-                row = cur.fetchone()
-                return _row_to_user(row)
+        with pooled_connection() as conn:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO users (email, password_hash)
+                        VALUES (%s, %s)
+                        RETURNING id, email, password_hash, created_at
+                        """,
+                        (email, password_hash),
+                    )
+                    row = cur.fetchone()
+                    return _row_to_user(row)
     except psycopg2.Error as e:
         # Unique violation for email
         if getattr(e, "pgcode", None) == "23505":
             raise ValueError("Email already registered") from e
         raise
-    finally:
-        conn.close()
@@ -0,0 +1,63 @@
+"""Pick pbkdf2_sha256 rounds that hit a hashing latency target on this host.
+
+    python -m src.infrastructure.security.calibrate --target-ms 50
+
+Prints the measured timings and the `security.kdf.rounds` value to put in the
+YAML config. Existing hashes are upgraded to the new cost on their next login.
+"""
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+from src.infrastructure.security.password import build_context
+
+
+_PROBE_PASSWORD = "calibration-password-123"
+
+
+def measure_hash_seconds(rounds: int, samples: int = 5) -> float:
+    """Median wall time of one hash at `rounds` iterations."""
+    context = build_context({"rounds": rounds})
+    timings: List[float] = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash(_PROBE_PASSWORD)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int = 5, min_rounds: int = 1000) -> Tuple[int, float]:
+    """Return (rounds, measured_ms) closest to `target_ms`, rounded to 1000 rounds.
+
+    pbkdf2 cost is linear in rounds, so one probe gives a first estimate and a
+    second measurement at that estimate corrects for fixed overhead.
+    """
+    if target_ms <= 0:
+        raise ValueError("target_ms must be positive")
+    probe = 20000
+    estimate = probe * target_ms / (measure_hash_seconds(probe, samples) * 1000)
+    rounds = max(min_rounds, int(estimate))
+    measured = measure_hash_seconds(rounds, samples) * 1000
+    rounds = max(min_rounds, int(round(rounds * target_ms / measured, -3)))
+    return rounds, measure_hash_seconds(rounds, samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate pbkdf2_sha256 rounds for a latency target.")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="desired time per hash (default 50)")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per measurement")
+    parser.add_argument("--min-rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    rounds, measured_ms = calibrate(args.target_ms, args.samples, args.min_rounds)
+    print(f"target: {args.target_ms:.1f} ms per hash")
+    print(f"rounds: {rounds} (measured {measured_ms:.1f} ms)")
+    print()
+    print("security:")
+    print("  kdf:")
+    print(f"    rounds: {rounds}")
+
+
+if __name__ == "__main__":
+    main()
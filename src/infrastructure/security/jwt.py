@@ -1,3 +1,5 @@
+import hashlib
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
@@ -5,49 +7,126 @@ from typing import Dict, Any, Optional
 import jwt
 
 from src.config import config
+from src.infrastructure.cache.ttl_lru import TTLCache
 
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _signing_keys(jwt_cfg: Dict[str, Any]) -> Dict[Optional[str], bytes]:
+    """kid -> key bytes. The legacy `secret` is stored under kid None (tokens without a kid)."""
+    keys: Dict[Optional[str], bytes] = {}
+    if jwt_cfg.get("secret"):
+        keys[None] = str(jwt_cfg["secret"]).encode("utf-8")
+    for entry in jwt_cfg.get("keys") or []:
+        keys[str(entry["kid"])] = str(entry["secret"]).encode("utf-8")
+    if not keys:
+        raise ValueError("jwt config needs `secret` or `keys`")
+    return keys
+
+
+class TokenSigner:
+    """Issues access tokens with parameters computed once from the `jwt:` config."""
+
+    def __init__(self, jwt_cfg: Dict[str, Any]):
+        keys = _signing_keys(jwt_cfg)
+        self.kid: Optional[str] = jwt_cfg.get("active_kid")
+        if self.kid is not None:
+            self.kid = str(self.kid)
+        if self.kid not in keys:
+            raise ValueError(f"jwt active_kid {self.kid!r} has no key")
+        self._key = keys[self.kid]
+        self._headers = {"kid": self.kid} if self.kid is not None else None
+        self.algorithm = jwt_cfg.get("algorithm", "HS256")
+        self.issuer = jwt_cfg.get("issuer", "note-clone")
+        self.audience = jwt_cfg.get("audience", "note-clone-users")
+        self.ttl = timedelta(minutes=int(jwt_cfg.get("access_token_ttl_minutes", 60)))
+
+    def create(self, sub: str, extra_claims: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        jti = uuid.uuid4().hex
+        now = _now()
+        payload: Dict[str, Any] = {
+            "iss": self.issuer,
+            "aud": self.audience,
+            "iat": int(now.timestamp()),
+            "nbf": int(now.timestamp()),
+            "exp": int((now + self.ttl).timestamp()),
+            "sub": sub,
+            "jti": jti,
+        }
+        if extra_claims:
+            payload.update(extra_claims)
+
+        token = jwt.encode(payload, self._key, algorithm=self.algorithm, headers=self._headers)
+        return {"token": token, "jti": jti}
+
+
+class TokenVerifier:
+    """Verifies access tokens against every configured key, selected by `kid`.
+
+    Successfully verified claims are cached under a SHA-256 digest of the token
+    until the token's `exp` (or `cache_ttl`, whichever comes first), so a
+    repeated token costs one hash and a dict lookup. Failures are never cached.
+    The returned claims dict is shared between callers and must not be mutated.
+    """
+
+    def __init__(self, jwt_cfg: Dict[str, Any]):
+        self._keys = _signing_keys(jwt_cfg)
+        self._algorithms = [jwt_cfg.get("algorithm", "HS256")]
+        self._issuer = jwt_cfg.get("issuer", "note-clone")
+        self._audience = jwt_cfg.get("audience", "note-clone-users")
+        self._options = {"require": ["exp"]}
+        cache_cfg = jwt_cfg.get("verify_cache", {}) or {}
+        self.cache_ttl = float(cache_cfg.get("ttl_seconds", 300))
+        self._cache = TTLCache(int(cache_cfg.get("max_entries", 10_000)))
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self._cache.get(digest)
+        if claims is not None:
+            return claims
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid!r}")
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=self._algorithms,
+            audience=self._audience,
+            issuer=self._issuer,
+            options=self._options,
+        )
+        self._cache.set(digest, claims, min(float(claims["exp"]), time.time() + self.cache_ttl))
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_signer: Optional[TokenSigner] = None
+_verifier: Optional[TokenVerifier] = None
+
+
+def get_token_signer() -> TokenSigner:
+    global _signer
+    if _signer is None:
+        _signer = TokenSigner(config.get("jwt", {}))
+    return _signer
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = TokenVerifier(config.get("jwt", {}))
+    return _verifier
+
+
 def create_access_token(sub: str, extra_claims: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
-    jwt_cfg = config.get("jwt", {})
-    secret = jwt_cfg["secret"]
-    algorithm = jwt_cfg.get("algorithm", "HS256")
-    issuer = jwt_cfg.get("issuer", "note-clone")
-    audience = jwt_cfg.get("audience", "note-clone-users")
-    ttl_minutes = int(jwt_cfg.get("access_token_ttl_minutes", 60))
-
-    jti = uuid.uuid4().hex
-    now = _now()
-    payload: Dict[str, Any] = {
-        "iss": issuer,
-        "aud": audience,
-        "iat": int(now.timestamp()),
-        "nbf": int(now.timestamp()),
-        "exp": int((now + timedelta(minutes=ttl_minutes)).timestamp()),
-        "sub": sub,
-        "jti": jti,
-    }
-    if extra_claims:
-        payload.update(extra_claims)
-
-    token = jwt.encode(payload, secret, algorithm=algorithm)
-    return {"token": token, "jti": jti}
+    return get_token_signer().create(sub, extra_claims)
 
 
 def decode_and_verify_token(token: str) -> Dict[str, Any]:
-    jwt_cfg = config.get("jwt", {})
-    secret = jwt_cfg["secret"]
-    algorithm = jwt_cfg.get("algorithm", "HS256")
-    issuer = jwt_cfg.get("issuer", "note-clone")
-    audience = jwt_cfg.get("audience", "note-clone-users")
-
-    return jwt.decode(
-        token,
-        secret,
-        algorithms=[algorithm],
-        audience=audience,
-        issuer=issuer,
-    )
+    return get_token_verifier().verify(token)
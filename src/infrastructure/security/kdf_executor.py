@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import config
+
+
+class KdfBusyError(Exception):
+    """Raised when the KDF queue is full; callers should answer 503 and ask for a retry."""
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class KdfExecutor:
+    """Dedicated, separately sized executor for password hashing.
+
+    At most `workers` hashes run at once and at most `max_queue` more wait for a
+    worker; anything beyond that is rejected immediately with KdfBusyError rather
+    than queueing without bound. Latency is measured from submission to result
+    (queue wait included), which is what the request sees.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 2, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError("kind must be 'thread' or 'process'")
+        if workers < 1 or max_queue < 0:
+            raise ValueError("workers must be >= 1 and max_queue >= 0")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._failed_total = 0
+        self._latency_counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "KdfExecutor":
+        return cls(
+            kind=str(cfg.get("executor", "thread")),
+            workers=int(cfg.get("workers", 2)),
+            max_queue=int(cfg.get("max_queue", 32)),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on the KDF pool; raises KdfBusyError when saturated."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected_total += 1
+                raise KdfBusyError("Password hashing queue is full")
+            self._pending += 1
+            self._submitted_total += 1
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._finish(started, failed=True)
+            raise
+        # Release the slot when the work really ends, even if the caller was cancelled
+        # (which cancels the job too if it has not started; exception() would raise then)
+        future.add_done_callback(
+            lambda f: self._finish(started, failed=not f.cancelled() and f.exception() is not None)
+        )
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+            completed = sum(self._latency_counts)
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(pending, self.workers),
+                "queue_depth": max(0, pending - self.workers),
+                "submitted_total": self._submitted_total,
+                "rejected_total": self._rejected_total,
+                "failed_total": self._failed_total,
+                "latency_seconds": {
+                    "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self._latency_counts)),
+                    "count": completed,
+                    "sum": round(self._latency_sum, 6),
+                    "max": round(self._latency_max, 6),
+                },
+            }
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # spawn: forking a process that runs an event loop and threads is unsafe
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="kdf"
+                        )
+        return self._executor
+
+    def _finish(self, started: float, failed: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._pending -= 1
+            if failed:
+                self._failed_total += 1
+            self._latency_counts[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            self._latency_sum += elapsed
+            if elapsed > self._latency_max:
+                self._latency_max = elapsed
+
+
+_kdf_executor: Optional[KdfExecutor] = None
+
+
+def get_kdf_executor() -> KdfExecutor:
+    global _kdf_executor
+    if _kdf_executor is None:
+        _kdf_executor = KdfExecutor.from_config(config.get("security", {}).get("kdf", {}) or {})
+    return _kdf_executor
+
+
+def kdf_stats() -> Dict[str, Any]:
+    return get_kdf_executor().stats()
@@ -1,8 +1,31 @@
+from typing import Any, Dict
+
 from passlib.context import CryptContext
 
+from src.config import config
+from src.infrastructure.security.kdf_executor import get_kdf_executor
+
+
+def build_context(kdf_cfg: Dict[str, Any]) -> CryptContext:
+    """CryptContext for the configured cost.
 
-# Use pbkdf2_sha256 to avoid external bcrypt backend issues in some environments
-_pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+    With `rounds` set, hashes made with any other round count are reported by
+    `password_needs_rehash`, so changing the cost migrates hashes on login.
+    """
+    kwargs: Dict[str, Any] = {}
+    rounds = kdf_cfg.get("rounds")
+    if rounds:
+        rounds = int(rounds)
+        kwargs = {
+            "pbkdf2_sha256__default_rounds": rounds,
+            "pbkdf2_sha256__min_rounds": rounds,
+            "pbkdf2_sha256__max_rounds": rounds,
+        }
+    # Use pbkdf2_sha256 to avoid external bcrypt backend issues in some environments
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto", **kwargs)
+
+
+_pwd_context = build_context(config.get("security", {}).get("kdf", {}) or {})
 
 
 def hash_password(password: str) -> str:
@@ -11,3 +34,18 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, password_hash: str) -> bool:
     return _pwd_context.verify(password, password_hash)
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if the hash was made with another scheme or cost than the configured one."""
+    return _pwd_context.needs_update(password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the dedicated KDF executor; raises KdfBusyError when saturated."""
+    return await get_kdf_executor().run(hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """verify_password on the dedicated KDF executor; raises KdfBusyError when saturated."""
+    return await get_kdf_executor().run(verify_password, password, password_hash)
@@ -0,0 +1 @@
+"""Blob storage for note attachments."""
@@ -0,0 +1,196 @@
+import fcntl
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import config
+
+
+class UploadBusyError(Exception):
+    """Another request is currently writing to the same upload."""
+
+
+class UploadWriter:
+    """Append handle on one staged upload; holds an exclusive lock until closed.
+
+    Blocking; call from a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "ab+")
+        try:
+            # flock is per open file, so this also excludes other requests of this process
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._file.close()
+            raise UploadBusyError("Upload is already being written")
+
+    @property
+    def size(self) -> int:
+        return os.fstat(self._file.fileno()).st_size
+
+    def truncate(self, size: int) -> None:
+        self._file.truncate(size)
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> None:
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()  # releases the lock
+
+
+class BlobStore(ABC):
+    """Content-addressed (sha256) blob storage plus a staging area for uploads.
+
+    Uploads are appended under their id and, once complete, committed under the
+    hash of their content; identical content is stored once. Every method blocks,
+    so async callers run them in a thread.
+    """
+
+    @abstractmethod
+    def open_upload(self, upload_id: str) -> UploadWriter:
+        """Lock and open (creating if needed) an upload for appending."""
+
+    @abstractmethod
+    def iter_upload(self, upload_id: str, length: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """The first `length` bytes of a staged upload, in chunks."""
+
+    @abstractmethod
+    def commit_upload(self, upload_id: str, sha256: str) -> bool:
+        """Store a finished upload as blob `sha256`; False if it already existed (deduplicated)."""
+
+    @abstractmethod
+    def discard_upload(self, upload_id: str) -> None:
+        """Remove a staged upload, if present."""
+
+    @abstractmethod
+    def list_uploads(self, older_than_seconds: float) -> List[str]:
+        """Ids of staged uploads not written to for `older_than_seconds`."""
+
+    @abstractmethod
+    def list_blobs(self, older_than_seconds: float) -> List[str]:
+        """Digests of stored blobs not committed (or reused) for `older_than_seconds`."""
+
+    @abstractmethod
+    def delete(self, sha256: str) -> None:
+        """Remove a blob, if present."""
+
+    @abstractmethod
+    def local_path(self, sha256: str) -> Optional[str]:
+        """Filesystem path of a blob, for zero-copy responses; None if not on local disk."""
+
+    @abstractmethod
+    def relative_path(self, sha256: str) -> str:
+        """Blob location relative to the store root (used for X-Accel-Redirect)."""
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs under `root/blobs/ab/cd/<sha256>`, staged uploads under `root/uploads/<id>`.
+
+    Commits are a rename within one filesystem, so a blob appears atomically and
+    is never copied.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._uploads = os.path.join(self.root, "uploads")
+        os.makedirs(self._uploads, exist_ok=True)
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "LocalBlobStore":
+        return cls(root=str(cfg.get("root", "data/attachments")))
+
+    def _upload_path(self, upload_id: str) -> str:
+        if not upload_id or os.sep in upload_id or upload_id.startswith("."):
+            raise ValueError("Invalid upload id")
+        return os.path.join(self._uploads, upload_id)
+
+    def relative_path(self, sha256: str) -> str:
+        if len(sha256) != 64 or not all(c in "0123456789abcdef" for c in sha256):
+            raise ValueError("Invalid blob id")
+        return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        return os.path.join(self.root, self.relative_path(sha256))
+
+    def open_upload(self, upload_id: str) -> UploadWriter:
+        return UploadWriter(self._upload_path(upload_id))
+
+    def iter_upload(self, upload_id: str, length: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        with open(self._upload_path(upload_id), "rb") as f:
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError("Staged upload is shorter than recorded")
+                remaining -= len(chunk)
+                yield chunk
+
+    def commit_upload(self, upload_id: str, sha256: str) -> bool:
+        target = self.local_path(sha256)
+        if os.path.exists(target):
+            self.discard_upload(upload_id)
+            # Reusing the bytes makes them recent, so the sweep of blob files
+            # without a row (list_blobs) leaves them alone until this commits
+            os.utime(target)
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self._upload_path(upload_id), target)
+        return True
+
+    def discard_upload(self, upload_id: str) -> None:
+        try:
+            os.unlink(self._upload_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    def list_uploads(self, older_than_seconds: float) -> List[str]:
+        cutoff = time.time() - older_than_seconds
+        stale = []
+        with os.scandir(self._uploads) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    stale.append(entry.name)
+        return stale
+
+    def list_blobs(self, older_than_seconds: float) -> List[str]:
+        cutoff = time.time() - older_than_seconds
+        stale = []
+        for directory, _, names in os.walk(os.path.join(self.root, "blobs")):
+            for name in names:
+                try:
+                    if len(name) == 64 and os.stat(os.path.join(directory, name)).st_mtime < cutoff:
+                        stale.append(name)
+                except FileNotFoundError:
+                    pass
+        return stale
+
+    def delete(self, sha256: str) -> None:
+        try:
+            os.unlink(self.local_path(sha256))
+        except FileNotFoundError:
+            pass
+
+
+# Store implementations selectable with `attachments.store`
+BLOB_STORES = {"local": LocalBlobStore}
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+    if _blob_store is None:
+        cfg = config.get("attachments", {}) or {}
+        kind = str(cfg.get("store", "local"))
+        if kind not in BLOB_STORES:
+            raise ValueError(f"Unknown attachments.store {kind!r}")
+        _blob_store = BLOB_STORES[kind].from_config(cfg)
+    return _blob_store
+
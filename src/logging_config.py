@@ -1,5 +1,27 @@
+import atexit
+import json
 import logging
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
 from .config import config
+from .infrastructure.metrics.registry import REGISTRY
+
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Log records discarded instead of written, by reason.", ["reason"]
+)
+_DROPPED_QUEUE_FULL = LOG_RECORDS_DROPPED.labels("queue_full")
+_DROPPED_RATE_LIMITED = LOG_RECORDS_DROPPED.labels("rate_limited")
+
+# Set per request by RequestIdMiddleware; every record logged while handling it carries it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
 
 def _to_level(level_value):
@@ -10,26 +32,234 @@ def _to_level(level_value):
     return logging.INFO
 
 
+class RequestIdFilter(logging.Filter):
+    """Stamps `record.request_id` ("-" outside a request); usable as `%(request_id)s`.
+
+    Runs in the thread that logs, before the record is queued, so the context
+    variable is still the caller's.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Caps how often each logging call site of a logger is written.
+
+    `limits` maps logger names to records per second, allowed separately for
+    each place in the code that logs (`pathname`, `lineno`: messages are mostly
+    f-strings, so their text would make every record a new key), so one noisy
+    line cannot silence the rest of the logger, with bursts of up to one
+    second's worth. Records over the limit are dropped and counted; the next one
+    written carries `record.suppressed`. At most MAX_BUCKETS call sites are
+    tracked; buckets idle long enough to have refilled are evicted first.
+    """
+
+    MAX_BUCKETS = 1024
+
+    def __init__(self, limits: Dict[str, float]):
+        super().__init__()
+        self.limits = {name: float(rate) for name, rate in limits.items()}
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.limits.get(record.name)
+        if rate is None:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_BUCKETS:
+                    self._evict(now)
+                # [tokens, last refill, suppressed since the last record written]
+                bucket = self._buckets[key] = [rate, now, 0]
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                _DROPPED_RATE_LIMITED.inc()
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _evict(self, now: float) -> None:
+        # A bucket untouched for a second is full again: dropping it changes
+        # nothing but the suppressed count it would have reported
+        for key in [k for k, bucket in self._buckets.items() if now - bucket[1] >= 1.0]:
+            del self._buckets[key]
+        if len(self._buckets) >= self.MAX_BUCKETS:
+            self._buckets.clear()
+
+
+class AccessTokenRedactionFilter(logging.Filter):
+    """Blanks `access_token=` query values in uvicorn's access log.
+
+    EventSource clients cannot send headers, so the note stream takes the
+    bearer token in its URL, which the access log would otherwise write verbatim.
+    """
+
+    _TOKEN = re.compile(r"(access_token=)[^&\s]*")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                self._TOKEN.sub(r"\1[redacted]", arg) if isinstance(arg, str) and "access_token=" in arg else arg
+                for arg in record.args
+            )
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id (+ exc_info, suppressed)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: when the queue is full the record is dropped.
+
+    Drops are counted (`dropped`, and log_records_dropped_total), and a warning
+    saying how many were lost is queued ahead of the next record that fits.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener is a thread of this process, so nothing has to be made
+        # picklable: only the message is rendered now (its arguments may change
+        # later); the format and any traceback are done on the listener thread
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._unreported:
+                self._report_drops()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported += 1
+            _DROPPED_QUEUE_FULL.inc()
+
+    def _report_drops(self) -> None:
+        with self._lock:
+            count, self._unreported = self._unreported, 0
+        warning = logging.LogRecord(
+            "app.logging", logging.WARNING, __file__, 0, "%d log records dropped: log queue full", (count,), None
+        )
+        warning.request_id = "-"
+        try:
+            self.queue.put_nowait(warning)
+        except queue.Full:
+            with self._lock:
+                self._unreported += count
+            raise
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+def build_handler(
+    stream=None,
+    level: int = logging.INFO,
+    log_format: str = "%(message)s",
+    queue_size: int = 0,
+    json_format: bool = False,
+    rate_limits: Optional[Dict[str, float]] = None,
+) -> Tuple[logging.Handler, Optional[QueueListener]]:
+    """The root handler for a logging setup, and its listener (to start) when queued.
+
+    With `queue_size` > 0 callers only format the message and queue the record;
+    a listener thread writes it out to `stream`.
+    """
+    output = logging.StreamHandler(stream)
+    output.setLevel(level)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter(log_format))
+    if queue_size <= 0:
+        handler, listener = output, None
+    else:
+        handler = BoundedQueueHandler(queue.Queue(queue_size))
+        handler.setLevel(level)
+        listener = _DrainingQueueListener(handler.queue, output, respect_handler_level=True)
+    handler.addFilter(RequestIdFilter())
+    if rate_limits:
+        handler.addFilter(RateLimitFilter(rate_limits))
+    return handler, listener
+
+
+_listener: Optional[QueueListener] = None
+
+
+def stop_logging() -> None:
+    """Write out whatever is still queued and stop the listener thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
 def setup_logging():
     """Configure production-grade logging once for the whole app.
     - Uses level/format from YAML config
     - Resets root handlers to avoid duplicates in reloads
-    - Integrates uvicorn loggers to use the same formatting
+    - Hands records to a background thread through a bounded queue (`queue_size`),
+      optionally as JSON, with per-logger rate limits (`rate_limits`)
+    - Integrates uvicorn loggers to use the same formatting, with stream tokens
+      redacted from the access log
     """
-    level = _to_level(config['logging']['level'])
-    log_format = config['logging']['format']
+    global _listener
+    log_cfg = config['logging']
+    level = _to_level(log_cfg['level'])
 
     root = logging.getLogger()
     root.setLevel(level)
 
     # Clear existing handlers to avoid duplicates (e.g., in reloads)
+    stop_logging()
     for h in list(root.handlers):
         root.removeHandler(h)
 
-    handler = logging.StreamHandler()
-    handler.setLevel(level)
-    handler.setFormatter(logging.Formatter(log_format))
+    handler, _listener = build_handler(
+        level=level,
+        log_format=log_cfg['format'],
+        queue_size=int(log_cfg.get('queue_size', 0) or 0),
+        json_format=bool(log_cfg.get('json', False)),
+        rate_limits=log_cfg.get('rate_limits') or {},
+    )
     root.addHandler(handler)
+    if _listener is not None:
+        _listener.start()
 
     # Make uvicorn loggers consistent
     for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
@@ -37,9 +267,13 @@ def setup_logging():
         lg.handlers = []
         lg.propagate = True
         lg.setLevel(level)
+    access = logging.getLogger("uvicorn.access")
+    if not any(isinstance(f, AccessTokenRedactionFilter) for f in access.filters):
+        access.addFilter(AccessTokenRedactionFilter())
 
     return logging.getLogger("app")
 
 
-# Initialize on import
+# Initialize on import; registered after logging's own exit hook, so it runs first
+atexit.register(stop_logging)
 logger = setup_logging()
@@ -2,13 +2,33 @@ from fastapi import FastAPI
 from src.config import config, ENV_NAME
 from src.logging_config import logger
 from src.infrastructure.database.connection import get_db_connection
-from src.presentation.routes import router
+from src.infrastructure.database.pool import close_pool
+from src.infrastructure.database.async_pool import get_async_pool, close_async_pool
+from src.infrastructure.database.listener import get_listener
+from src.application.auth.service import subscribe_session_invalidation
+from src.application.notes.stream import subscribe_note_changes
+from src.application.health_monitor import health_monitor
+from src.infrastructure.security.kdf_executor import get_kdf_executor
+from src.presentation.routes import admin_router, router
 from src.presentation.auth_routes import auth_router
+from src.presentation.notes_routes import notes_router
+from src.presentation.notebooks_routes import notebooks_router
+from src.presentation.attachments_routes import attachments_router
 from src.presentation.auth_middleware import AuthMiddleware
+from src.presentation.metrics_middleware import MetricsMiddleware
+from src.presentation.query_trace_middleware import QueryTraceMiddleware
+from src.presentation.request_id_middleware import RequestIdMiddleware
+from src.infrastructure.metrics.multiprocess import get_multiprocess_metrics
 from src.infrastructure.database.migrations import run_migrations
 
 app = FastAPI()
 app.add_middleware(AuthMiddleware)
+# Outside auth, so it also times requests the auth layer rejects
+app.add_middleware(MetricsMiddleware)
+# Outside auth, so the session lookups it runs count towards the request's queries
+app.add_middleware(QueryTraceMiddleware)
+# Outermost of all, so every log record of a request (access log included) has its id
+app.add_middleware(RequestIdMiddleware)
 
 @app.on_event("startup")
 async def startup_event():
@@ -26,7 +46,35 @@ async def startup_event():
                 conn.close()
             except Exception:
                 pass
+        # Warm the connection pool so the first requests skip the connect handshake
+        await get_async_pool()
+        # One LISTEN connection per worker keeps in-process caches coherent
+        listener = get_listener()
+        subscribe_session_invalidation(listener)
+        subscribe_note_changes(listener)
+        await listener.start()
+        # First readiness check before taking traffic, then one every interval
+        await health_monitor.check_once()
+        health_monitor.start()
+    multiprocess_metrics = get_multiprocess_metrics()
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.start()
     logger.info(f"starting server on port:{config['server']['port']} number")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await health_monitor.stop()
+    multiprocess_metrics = get_multiprocess_metrics()
+    if multiprocess_metrics is not None:
+        await multiprocess_metrics.stop()
+    await get_listener().stop()
+    await close_async_pool()
+    close_pool()
+    get_kdf_executor().shutdown()
+
 app.include_router(router)
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+app.include_router(notes_router, prefix="/notes", tags=["notes"])
+app.include_router(notebooks_router, prefix="/notebooks", tags=["notebooks"])
+app.include_router(attachments_router, prefix="/notes", tags=["attachments"])
@@ -0,0 +1,155 @@
+import asyncio
+import os
+from urllib.parse import quote
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse
+from pydantic import BaseModel
+
+from src.application.notes import attachments as attachments_service
+from src.presentation import etags
+from src.presentation.ids import PathId
+from src.presentation.request_user import current_user_id
+
+
+class UploadIn(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+
+# Blobs are immutable and addressed by content, so a cached copy never goes stale
+BLOB_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+attachments_router = APIRouter()
+
+
+def _inline_disposition(filename: str) -> str:
+    # RFC 6266 filename* keeps non-ASCII names intact
+    return f"inline; filename*=utf-8''{quote(filename)}"
+
+
+def _offset_headers(upload) -> dict:
+    return {"Upload-Offset": str(upload["offset"]), "Upload-Length": str(upload["size"])}
+
+
+@attachments_router.post("/{note_id}/attachments/uploads", status_code=status.HTTP_201_CREATED)
+async def start_upload(note_id: PathId, payload: UploadIn, request: Request, response: Response):
+    try:
+        upload = await attachments_service.start_upload(
+            current_user_id(request), note_id, payload.filename, payload.content_type, payload.size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@attachments_router.api_route("/{note_id}/attachments/uploads/{upload_id}", methods=["GET", "HEAD"])
+async def get_upload(note_id: PathId, upload_id: str, request: Request, response: Response):
+    try:
+        upload = await attachments_service.get_upload(current_user_id(request), note_id, upload_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers.update(_offset_headers(upload))
+    response.headers["Cache-Control"] = "no-store"
+    return upload
+
+
+@attachments_router.patch("/{note_id}/attachments/uploads/{upload_id}")
+async def upload_chunk(
+    note_id: PathId,
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+):
+    """Append the request body at `Upload-Offset`; streamed, never held in memory whole."""
+    try:
+        upload = await attachments_service.write_chunk(
+            current_user_id(request), note_id, upload_id, upload_offset, request.stream()
+        )
+    except attachments_service.UploadOffsetError as e:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": str(e), "offset": e.offset},
+            headers={"Upload-Offset": str(e.offset)},
+        )
+    except attachments_service.UploadBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if "attachment" in upload:
+        return JSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=jsonable_encoder(upload["attachment"]),
+            headers=_offset_headers(upload),
+        )
+    return JSONResponse(content=jsonable_encoder(upload), headers=_offset_headers(upload))
+
+
+@attachments_router.delete("/{note_id}/attachments/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(note_id: PathId, upload_id: str, request: Request):
+    try:
+        await attachments_service.abort_upload(current_user_id(request), note_id, upload_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@attachments_router.get("/{note_id}/attachments")
+async def list_attachments(note_id: PathId, request: Request):
+    return await attachments_service.list_attachments(current_user_id(request), note_id)
+
+
+@attachments_router.api_route("/{note_id}/attachments/{attachment_id}", methods=["GET", "HEAD"])
+async def download_attachment(note_id: PathId, attachment_id: PathId, request: Request):
+    """Serve the blob with Range support, by path so no copy passes through Python where avoidable.
+
+    Behind nginx with `attachments.x_accel_redirect` set, the proxy sends the
+    file (sendfile, ranges) itself; otherwise FileResponse uses the ASGI
+    pathsend extension where the server offers it and streams 64 KiB reads
+    where it does not.
+    """
+    try:
+        attachment = await attachments_service.get_attachment(current_user_id(request), note_id, attachment_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    etag = f'"{attachment["sha256"]}"'
+    if etags.matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": BLOB_CACHE_CONTROL},
+        )
+    headers = {
+        "ETag": etag,
+        "Cache-Control": BLOB_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+        "Content-Disposition": _inline_disposition(attachment["filename"]),
+    }
+    path, accel = attachments_service.blob_location(attachment["sha256"])
+    if accel is not None:
+        return Response(media_type=attachment["content_type"], headers={**headers, "X-Accel-Redirect": accel})
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment content is missing")
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=attachment["content_type"],
+        stat_result=stat_result,
+    )
+
+
+@attachments_router.delete("/{note_id}/attachments/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_attachment(note_id: PathId, attachment_id: PathId, request: Request):
+    try:
+        await attachments_service.delete_attachment(current_user_id(request), note_id, attachment_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
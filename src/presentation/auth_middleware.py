@@ -1,15 +1,18 @@
-from typing import Callable, Iterable
+import re
+from typing import Iterable, Optional
+from urllib.parse import parse_qs
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-# Lazy import heavy dependencies inside the request cycle to avoid import-time
-# errors in environments where optional deps aren't installed (e.g., tests).
+from src.application.auth.principal import principal_resolver
+from src.infrastructure.security.jwt import decode_and_verify_token
 
 
 PUBLIC_PATHS: Iterable[str] = (
     "/health-check",
+    "/health",
+    "/metrics",
     "/auth/login",
     "/auth/signup",
     "/docs",
@@ -18,49 +21,108 @@ PUBLIC_PATHS: Iterable[str] = (
     "/favicon.ico",
 )
 
+# Endpoints opened by browser EventSource, which cannot send headers; these may
+# carry the token as `?access_token=` instead
+QUERY_TOKEN_PATHS: Iterable[str] = ("/notes/stream",)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        path = request.url.path
-        if request.method == "OPTIONS" or any(
-            path == p or path.startswith(p + "/") for p in PUBLIC_PATHS
-        ):
-            return await call_next(request)
 
-        # Expect Authorization: Bearer <token>
-        auth_header = request.headers.get("Authorization", "")
-        if not auth_header.startswith("Bearer "):
-            return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+class PublicPathMatcher:
+    """Precompiled check for "path is a public path or lives under one".
+
+    Exact hits are a set lookup; sub-paths are one anchored regex match
+    instead of a startswith() scan over every public prefix.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        paths = tuple(paths)
+        self._exact = frozenset(paths)
+        alternation = "|".join(re.escape(p) for p in sorted(paths, key=len, reverse=True))
+        self._prefix = re.compile(f"(?:{alternation})/") if paths else None
+
+    def __call__(self, path: str) -> bool:
+        if path in self._exact:
+            return True
+        return self._prefix is not None and self._prefix.match(path) is not None
+
+
+def _bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            header = value.decode("latin-1")
+            if not header.startswith("Bearer "):
+                return None
+            return header.split(" ", 1)[1].strip()
+    return None
+
+
+def _query_token(scope: Scope) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("access_token")
+    return values[0] if values else None
+
+
+class AuthMiddleware:
+    """Pure ASGI authentication middleware.
+
+    Requests outside the public paths need `Authorization: Bearer <token>` for an
+    active session; the Principal and the token claims are exposed to handlers
+    as `request.state.user` and `request.state.token_claims`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_paths: Iterable[str] = PUBLIC_PATHS,
+        query_token_paths: Iterable[str] = QUERY_TOKEN_PATHS,
+    ):
+        self.app = app
+        self._is_public = PublicPathMatcher(public_paths)
+        self._query_token_paths = frozenset(query_token_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or self._is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(scope)
+        if token is None and scope["path"] in self._query_token_paths:
+            token = _query_token(scope)
+        if token is None:
+            await _unauthorized("Not authenticated")(scope, receive, send)
+            return
 
-        token = auth_header.split(" ", 1)[1].strip()
         try:
-            from src.infrastructure.security.jwt import decode_and_verify_token
             claims = decode_and_verify_token(token)
         except Exception:
-            return JSONResponse({"detail": "Invalid token"}, status_code=401)
+            await _unauthorized("Invalid token")(scope, receive, send)
+            return
 
         jti = claims.get("jti")
         sub = claims.get("sub")
         if not jti or not sub:
-            return JSONResponse({"detail": "Invalid token"}, status_code=401)
-
-        # Verify session is active
-        from src.infrastructure.repositories.sessions_repository import is_session_active
-        if not is_session_active(jti):
-            return JSONResponse({"detail": "Session revoked"}, status_code=401)
+            await _unauthorized("Invalid token")(scope, receive, send)
+            return
 
-        # Load user
         try:
             user_id = int(sub)
         except (TypeError, ValueError):
-            return JSONResponse({"detail": "Invalid subject"}, status_code=401)
+            await _unauthorized("Invalid subject")(scope, receive, send)
+            return
 
-        from src.infrastructure.repositories.users_repository import get_user_by_id
-        user = get_user_by_id(user_id)
-        if not user:
-            return JSONResponse({"detail": "User not found"}, status_code=401)
+        # Active session + owning user in one (cached) lookup
+        principal = await principal_resolver.resolve(jti, claims.get("exp"))
+        if principal is None:
+            await _unauthorized("Session revoked")(scope, receive, send)
+            return
+        if principal.id != user_id:
+            await _unauthorized("Invalid subject")(scope, receive, send)
+            return
 
         # Attach user context
-        request.state.user = {"id": user["id"], "email": user["email"]}
-        request.state.token_claims = claims
-        return await call_next(request)
+        state = scope.setdefault("state", {})
+        state["user"] = principal
+        state["token_claims"] = claims
+        await self.app(scope, receive, send)
+
+
+def _unauthorized(detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=401)
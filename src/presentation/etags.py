@@ -0,0 +1,48 @@
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+
+# Clients may cache, but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+
+def note_etag(note: Dict[str, Any], *variant: Any) -> str:
+    """Validator for one note: its version, plus notebook and tags, which change without one.
+
+    `variant` tells apart representations that can change on their own, e.g. the
+    renderer version of rendered HTML.
+    """
+    digest = hashlib.sha1(repr((note["notebook_id"], note["tags"], *variant)).encode("utf-8")).hexdigest()[:8]
+    return f'"n{note["id"]}.{note["version"]}.{digest}"'
+
+
+def list_etag(watermark: int, *params: Any) -> str:
+    """Validator for a list page: the user's list watermark plus the query that shaped it."""
+    digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:12]
+    return f'"l{watermark}.{digest}"'
+
+
+def matches(request: Request, etag: str) -> bool:
+    """True if `If-None-Match` names `etag` (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,17 @@
+"""Id types for route parameters and request bodies, bounded to what the columns hold.
+
+An id out of range is then a 422 from validation instead of a database error.
+"""
+from typing import Annotated
+
+from fastapi import Path
+from pydantic import Field
+
+from src.domain.notes.ids import MAX_ID, MAX_REVISION
+
+# A note, notebook or attachment id in the URL path
+PathId = Annotated[int, Path(ge=1, le=MAX_ID)]
+# The same in a JSON body
+BodyId = Annotated[int, Field(ge=1, le=MAX_ID)]
+# A note revision number in the URL path (an INTEGER column)
+PathRevision = Annotated[int, Path(ge=1, le=MAX_REVISION)]
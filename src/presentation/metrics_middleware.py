@@ -0,0 +1,79 @@
+import time
+from typing import Any, Dict, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.infrastructure.metrics.registry import REGISTRY
+
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to the end of its response, by route template; "
+    "_count is the request count.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests being handled right now.")
+
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+# Label for requests no route matched (404s, and 401s answered before routing),
+# so arbitrary paths cannot create series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's full template, e.g. `/notes/{note_id}` for `/notes/12`.
+
+    Included routers keep their routes' paths relative to the router prefix, so
+    the prefix is taken from the leading segments of the request path: the
+    route's own path covers the rest, one segment per `/` (path parameters never
+    span a `/`).
+    """
+    relative = getattr(scope.get("route"), "path", None)
+    if relative is None:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    depth = relative.count("/")
+    if depth == 0:
+        return path.rstrip("/") or "/"
+    return "/".join(path.split("/")[: -depth]) + relative
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and requests in flight.
+
+    Requests are labelled with the route template (`/notes/{note_id}`), never
+    the raw path. Routing stores the matched route in the scope, so the label
+    is worked out after the app returns; the series for each label set is looked up
+    once and kept, leaving one bisect and one uncontended lock per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._series: Dict[Tuple[str, str, int], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = route_template(scope)
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            key = (method, route, status)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = HTTP_REQUEST_SECONDS.labels(*key)
+            series.observe(time.perf_counter() - started)
@@ -0,0 +1,91 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from pydantic import BaseModel
+
+from src.application.notes import notebooks as notebooks_service
+from src.presentation.ids import BodyId, PathId
+from src.presentation.request_user import current_user_id
+
+
+class NotebookIn(BaseModel):
+    name: str
+    parent_id: Optional[BodyId] = None
+
+
+class NotebookUpdate(BaseModel):
+    name: Optional[str] = None
+    # Present (even as null) means move; null makes the notebook a root
+    parent_id: Optional[BodyId] = None
+
+
+notebooks_router = APIRouter()
+
+
+@notebooks_router.post("", status_code=status.HTTP_201_CREATED)
+async def create_notebook(payload: NotebookIn, request: Request):
+    try:
+        return await notebooks_service.create_notebook(current_user_id(request), payload.name, payload.parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notebooks_router.get("")
+async def list_root_notebooks(request: Request):
+    return await notebooks_service.list_root_notebooks(current_user_id(request))
+
+
+@notebooks_router.get("/{notebook_id}")
+async def get_notebook(notebook_id: PathId, request: Request):
+    try:
+        return await notebooks_service.get_notebook(current_user_id(request), notebook_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notebooks_router.get("/{notebook_id}/tree")
+async def get_tree(notebook_id: PathId, request: Request):
+    try:
+        return await notebooks_service.get_tree(current_user_id(request), notebook_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notebooks_router.get("/{notebook_id}/notes")
+async def list_notebook_notes(
+    notebook_id: PathId,
+    request: Request,
+    limit: int = Query(notebooks_service.DEFAULT_PAGE_SIZE, ge=1, le=notebooks_service.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    try:
+        return await notebooks_service.list_notebook_notes(current_user_id(request), notebook_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@notebooks_router.patch("/{notebook_id}")
+async def update_notebook(notebook_id: PathId, payload: NotebookUpdate, request: Request):
+    try:
+        return await notebooks_service.update_notebook(
+            current_user_id(request),
+            notebook_id,
+            name=payload.name,
+            parent_id=payload.parent_id,
+            move="parent_id" in payload.model_fields_set,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notebooks_router.delete("/{notebook_id}")
+async def delete_notebook(notebook_id: PathId, request: Request):
+    try:
+        deleted = await notebooks_service.delete_notebook(current_user_id(request), notebook_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"success": True, "deleted": deleted}
@@ -0,0 +1,304 @@
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.application.auth import service as auth_service
+from src.application.notes import batch as batch_service
+from src.application.notes import notebooks as notebooks_service
+from src.application.notes import rendering as rendering_service
+from src.application.notes import revisions as revisions_service
+from src.application.notes import service as notes_service
+from src.application.notes import stream as note_stream
+from src.domain.notes.ids import MAX_REVISION
+from src.presentation import etags
+from src.presentation.ids import BodyId, PathId, PathRevision
+from src.presentation.request_user import current_user_id, require_admin
+
+
+class NoteIn(BaseModel):
+    title: str = ""
+    body: str = ""
+    # On update, None keeps the note's current tags
+    tags: Optional[List[str]] = None
+
+
+class TextOp(BaseModel):
+    # Replace base body[start:end] (character offsets) with text
+    start: int = Field(ge=0, le=notes_service.MAX_BODY_LENGTH)
+    end: int = Field(ge=0, le=notes_service.MAX_BODY_LENGTH)
+    text: str = ""
+
+
+class NoteNotebook(BaseModel):
+    notebook_id: Optional[BodyId] = None
+
+
+class BatchOperation(BaseModel):
+    # One of batch.OPERATIONS; checked with the rest of the batch so it is reported per item
+    op: str
+    id: int
+    tags: List[str] = []
+    # For "file": the target notebook, or null to unfile
+    notebook_id: Optional[int] = None
+
+
+class NoteBatch(BaseModel):
+    operations: List[BatchOperation]
+
+
+class NotePatch(BaseModel):
+    base_version: int = Field(ge=0, le=MAX_REVISION)
+    ops: List[TextOp] = []
+    title: Optional[str] = None
+
+
+notes_router = APIRouter()
+
+
+@notes_router.post("", status_code=status.HTTP_201_CREATED)
+async def create_note(payload: NoteIn, request: Request):
+    try:
+        return await notes_service.create_note(current_user_id(request), payload.title, payload.body, payload.tags)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@notes_router.get("")
+async def list_notes(
+    request: Request,
+    response: Response,
+    limit: int = Query(notes_service.DEFAULT_PAGE_SIZE, ge=1, le=notes_service.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None, description="Only notes carrying every given tag"),
+):
+    user_id = current_user_id(request)
+    # Read the watermark before the page: a write racing in between only makes the ETag stale
+    etag = etags.list_etag(await notes_service.get_list_watermark(user_id), "list", limit, cursor, *(tag or ()))
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    try:
+        page = await notes_service.list_notes(user_id, limit=limit, cursor=cursor, tags=tag)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    etags.set_validators(response, etag)
+    return page
+
+
+@notes_router.get("/search")
+async def search_notes(
+    request: Request,
+    response: Response,
+    q: str = Query(..., description="Search terms (web-search syntax: quotes, OR, -term)"),
+    limit: int = Query(notes_service.DEFAULT_PAGE_SIZE, ge=1, le=notes_service.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    user_id = current_user_id(request)
+    etag = etags.list_etag(await notes_service.get_list_watermark(user_id), "search", q, limit, cursor)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    try:
+        page = await notes_service.search_notes(user_id, q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    etags.set_validators(response, etag)
+    return page
+
+
+@notes_router.get("/export")
+async def export_notes(request: Request):
+    return StreamingResponse(
+        notes_service.export_notes(current_user_id(request)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="notes.ndjson"'},
+    )
+
+
+@notes_router.post("/import")
+async def import_notes(request: Request):
+    try:
+        return await notes_service.import_notes(current_user_id(request), request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@notes_router.post("/batch")
+async def batch_notes(payload: NoteBatch, request: Request):
+    """Apply bulk operations in one transaction; returns one result per operation."""
+    try:
+        return await batch_service.run_batch(current_user_id(request), [op.model_dump() for op in payload.operations])
+    except batch_service.BatchValidationError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": str(e), "errors": e.errors},
+        )
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    name = "resync" if event.get("op") == "resync" else "note"
+    return f"event: {name}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def _change_events(subscription: note_stream.Subscription, claims: Dict[str, Any]) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        checked = time.monotonic()
+        while True:
+            event = await subscription.get(timeout=note_stream.HEARTBEAT_SECONDS)
+            # Re-apply the auth rules to the long-lived stream at least every heartbeat
+            # interval, whether it is idle or busy, so logout and expiry end it
+            if event is None or time.monotonic() - checked >= note_stream.HEARTBEAT_SECONDS:
+                exp = claims.get("exp")
+                if (exp is not None and exp <= time.time()) or not await auth_service.is_session_active(
+                    claims["jti"], exp
+                ):
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                checked = time.monotonic()
+            if event is not None:
+                yield _sse(event)
+            else:
+                # Idle: keep proxies from timing out
+                yield ": ping\n\n"
+    finally:
+        note_stream.note_change_hub.unsubscribe(subscription)
+
+
+@notes_router.get("/stream")
+async def stream_note_changes(request: Request):
+    """Server-sent events for every change to the caller's notes (EventSource may pass
+    the token as `?access_token=`). A `resync` event means events were missed."""
+    subscription = note_stream.note_change_hub.subscribe(current_user_id(request))
+    return StreamingResponse(
+        _change_events(subscription, request.state.token_claims),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@notes_router.get("/stream/stats")
+async def stream_stats(request: Request):
+    """This worker's hub counters (all users); admin only, like /admin/*."""
+    require_admin(request)
+    return note_stream.note_change_hub.stats()
+
+
+@notes_router.get("/tags")
+async def tag_counts(request: Request, response: Response):
+    """Tag sidebar: every tag of the caller with its note count."""
+    user_id = current_user_id(request)
+    etag = etags.list_etag(await notes_service.get_list_watermark(user_id), "tags")
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    counts = await notes_service.get_tag_counts(user_id)
+    etags.set_validators(response, etag)
+    return counts
+
+
+@notes_router.get("/{note_id}")
+async def get_note(note_id: PathId, request: Request, response: Response):
+    user_id = current_user_id(request)
+    try:
+        if request.headers.get("if-none-match"):
+            # Revalidation only needs the version, notebook and tags, not the body
+            etag = etags.note_etag(await notes_service.get_note_validator(user_id, note_id))
+            if etags.matches(request, etag):
+                return etags.not_modified(etag)
+        note = await notes_service.get_note(user_id, note_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    etags.set_validators(response, etags.note_etag(note))
+    return note
+
+
+@notes_router.get("/render/stats")
+async def render_stats(request: Request):
+    require_admin(request)
+    return rendering_service.render_cache.stats()
+
+
+@notes_router.get("/{note_id}/html")
+async def get_rendered_note(note_id: PathId, request: Request, response: Response):
+    """The note with its body rendered to sanitized HTML, for web and share views."""
+    user_id = current_user_id(request)
+    try:
+        if request.headers.get("if-none-match"):
+            validator = await notes_service.get_note_validator(user_id, note_id)
+            etag = etags.note_etag(validator, rendering_service.RENDERER_VERSION)
+            if etags.matches(request, etag):
+                return etags.not_modified(etag)
+        note = await rendering_service.get_rendered_note(user_id, note_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    etags.set_validators(response, etags.note_etag(note, rendering_service.RENDERER_VERSION))
+    return note
+
+
+@notes_router.put("/{note_id}")
+async def update_note(note_id: PathId, payload: NoteIn, request: Request):
+    try:
+        return await notes_service.update_note(
+            current_user_id(request), note_id, payload.title, payload.body, payload.tags
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notes_router.patch("/{note_id}")
+async def patch_note(note_id: PathId, payload: NotePatch, request: Request):
+    ops = [(op.start, op.end, op.text) for op in payload.ops]
+    try:
+        return await notes_service.patch_note(current_user_id(request), note_id, payload.base_version, ops, payload.title)
+    except notes_service.VersionConflictError as e:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": str(e), "current_version": e.current_version, "rebase": e.rebase},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@notes_router.put("/{note_id}/notebook")
+async def file_note(note_id: PathId, payload: NoteNotebook, request: Request):
+    try:
+        await notebooks_service.file_note(current_user_id(request), note_id, payload.notebook_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"success": True}
+
+
+@notes_router.delete("/{note_id}")
+async def delete_note(note_id: PathId, request: Request):
+    try:
+        await notes_service.delete_note(current_user_id(request), note_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"success": True}
+
+
+@notes_router.get("/{note_id}/revisions")
+async def list_revisions(
+    note_id: PathId,
+    request: Request,
+    limit: int = Query(revisions_service.DEFAULT_PAGE_SIZE, ge=1, le=revisions_service.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    try:
+        return await revisions_service.list_revisions(current_user_id(request), note_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@notes_router.get("/{note_id}/revisions/{revision}")
+async def get_revision(note_id: PathId, revision: PathRevision, request: Request):
+    try:
+        return await revisions_service.get_revision(current_user_id(request), note_id, revision)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -0,0 +1,53 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import config
+from src.infrastructure.database import tracing
+from src.infrastructure.database.tracing import QueryTrace, current_trace
+from src.logging_config import logger
+from src.presentation.metrics_middleware import route_template
+
+
+RESPONSE_HEADERS = bool(((config.get("database", {}) or {}).get("tracing", {}) or {}).get("response_headers", True))
+
+
+class QueryTraceMiddleware:
+    """Pure ASGI middleware tracing the database statements each request runs.
+
+    A fresh QueryTrace is set in `current_trace` for the request; the DB layer's
+    connection and cursor wrappers add to it. The count and time so far go out
+    as `X-DB-Query-Count` / `X-DB-Time-Ms` response headers, and a request
+    running more than `query_budget` statements is logged with its most
+    repeated one, which is how N+1 loops show up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = QueryTrace()
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start" and RESPONSE_HEADERS:
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-db-query-count", str(trace.count).encode()),
+                    (b"x-db-time-ms", f"{trace.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            current_trace.reset(token)
+            budget = tracing.QUERY_BUDGET
+            if budget is not None and trace.count > budget:
+                statement, times = trace.most_repeated()
+                logger.warning(
+                    f"{scope['method']} {route_template(scope)} ran {trace.count} queries "
+                    f"in {trace.seconds * 1000:.1f} ms (budget {budget}); most repeated, {times}x: {statement}"
+                )
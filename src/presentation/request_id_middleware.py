@@ -0,0 +1,48 @@
+import re
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.logging_config import request_id_var
+
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Ids from upstream proxies are kept only if they are short and safe to log verbatim
+_VALID_REQUEST_ID = re.compile(rb"[A-Za-z0-9._:-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware giving each request an id for log correlation.
+
+    The id comes from the incoming `X-Request-ID` header when it looks sane,
+    else a fresh one is generated. It is set in `request_id_var` while the
+    request is handled (so log records carry it) and echoed in the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                if _VALID_REQUEST_ID.fullmatch(value):
+                    request_id = value
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex.encode()
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, request_id)]
+            await send(message)
+
+        token = request_id_var.set(request_id.decode())
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
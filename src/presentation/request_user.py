@@ -0,0 +1,29 @@
+import hmac
+
+from fastapi import HTTPException, Request, status
+
+from src.config import config
+
+
+def current_user_id(request: Request) -> int:
+    """Id of the user AuthMiddleware attached to the request."""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        # Shouldn't happen if middleware works, but guard anyway
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return user.id
+
+
+def require_admin(request: Request) -> None:
+    """Admin endpoints need, on top of a valid bearer token, the `admin.token`
+    shared secret in X-Admin-Token. It is configured out of band, so unlike an
+    account's email it cannot be claimed by signing up. With no secret
+    configured the endpoints do not exist (404).
+    """
+    token = (config.get("admin", {}) or {}).get("token")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    current_user_id(request)
+    sent = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(sent.encode(), str(token).encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -1,14 +1,96 @@
-from fastapi import APIRouter
-from fastapi.responses import PlainTextResponse
+import asyncio
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
 from src.application.health_check_handler import HealthCheckHandler
+from src.config import config
+from src.domain.health_check_service import FAILING
+from src.infrastructure.diagnostics.memory import GROUP_BY, memory_tracer
+from src.infrastructure.diagnostics.sampler import ProfilerBusyError, collapsed_text, sample_stacks
+from src.infrastructure.metrics.multiprocess import collect_metrics
+from src.infrastructure.metrics.registry import render_text
+from src.presentation.request_user import require_admin
 
 
 router = APIRouter()
+# Diagnostics of the worker answering the request; see require_admin
+admin_router = APIRouter()
 _health_handler = HealthCheckHandler()
 
 
 @router.get("/health-check", response_class=PlainTextResponse)
-def health_check():
-    # Return plain text "ok" with 200 status code
-    return _health_handler.handle()
+async def health_check():
+    # Readiness as plain text from the last background check: "ok" or "degraded"
+    # with 200, "failing" with 503; "ok" until the first check has run
+    health = _health_handler.handle()
+    return PlainTextResponse(health, status_code=503 if health == FAILING else 200)
+
+
+@router.get("/health/live", response_class=PlainTextResponse)
+async def liveness():
+    """The worker's event loop is answering; says nothing about its dependencies."""
+    return "ok"
+
+
+@router.get("/health/ready")
+async def readiness():
+    """The last background check, per dependency; 503 when failing."""
+    report = _health_handler.readiness()
+    return JSONResponse(report, status_code=503 if report["status"] == FAILING else 200)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus scrape target (text format 0.0.4); merges all workers in multi-process mode."""
+    if not (config.get("metrics", {}) or {}).get("enabled", True):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    families = await asyncio.to_thread(collect_metrics)
+    return Response(render_text(families), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _admin_config() -> Dict[str, Any]:
+    return config.get("admin", {}) or {}
+
+
+@admin_router.get("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    request: Request,
+    seconds: float = Query(10.0, gt=0),
+    hz: float = Query(100.0, ge=1, le=1000),
+    idle: bool = Query(False, description="Keep samples of threads that are only waiting"),
+):
+    """Sample this worker's stacks for `seconds`; collapsed stacks for flamegraph.pl / speedscope."""
+    require_admin(request)
+    max_seconds = float(_admin_config().get("profile_max_seconds", 60))
+    if seconds > max_seconds:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"seconds must be at most {max_seconds:g}")
+    try:
+        stacks = await asyncio.to_thread(sample_stacks, seconds, hz, idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(collapsed_text(stacks), headers={"X-Profile-Samples": str(sum(stacks.values()))})
+
+
+@admin_router.post("/memory/snapshot")
+async def memory_snapshot(
+    request: Request,
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", description=f"One of {', '.join(GROUP_BY)}"),
+    frames: int = Query(1, ge=1, le=25, description="Stack depth recorded per allocation, when this starts tracing"),
+):
+    """First call starts tracemalloc; each later one returns the top changes since the previous."""
+    require_admin(request)
+    try:
+        return await asyncio.to_thread(memory_tracer.snapshot, limit, group_by, frames)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@admin_router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def memory_stop(request: Request):
+    """Stop tracemalloc, so allocations are no longer slowed down."""
+    require_admin(request)
+    await asyncio.to_thread(memory_tracer.stop)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,70 @@
+import os
+import re
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+
+ADMIN_TOKEN = {"X-Admin-Token": "test_admin_token"}
+_retained = []
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _signup(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "AdminPass123"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _admin(client: TestClient) -> dict:
+    r = client.post("/auth/login", json={"email": "admin_diagnostics@example.com", "password": "AdminPass123"})
+    if r.status_code != 200:
+        return {**_signup(client, "admin_diagnostics@example.com"), **ADMIN_TOKEN}
+    return {"Authorization": f"Bearer {r.json()['access_token']}", **ADMIN_TOKEN}
+
+
+def test_admin_endpoints_need_a_user_and_the_admin_secret(monkeypatch):
+    client = _get_client()
+    assert client.get("/admin/profile/cpu?seconds=0.1", headers=ADMIN_TOKEN).status_code == 401
+    user = _signup(client, "not_admin@example.com")
+    assert client.get("/admin/profile/cpu?seconds=0.1", headers=user).status_code == 403
+    assert client.post("/admin/memory/snapshot", headers={**user, "X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/profile/cpu?seconds=600", headers=_admin(client)).status_code == 400
+
+    from src.config import config
+
+    # Without a configured secret there is nothing to unlock
+    monkeypatch.setitem(config, "admin", {"token": None})
+    assert client.get("/admin/profile/cpu?seconds=0.1", headers=_admin(client)).status_code == 404
+
+
+def test_cpu_profile_returns_collapsed_stacks():
+    client = _get_client()
+    r = client.get("/admin/profile/cpu?seconds=0.3&hz=200&idle=true", headers=_admin(client))
+    assert r.status_code == 200
+    lines = r.text.splitlines()
+    assert lines and all(re.fullmatch(r"[^;]+(;[^;]+)+ \d+", line) for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == int(r.headers["x-profile-samples"])
+
+
+def test_memory_snapshots_diff_against_the_previous_one():
+    client = _get_client()
+    headers = _admin(client)
+    r = client.post("/admin/memory/snapshot", headers=headers)
+    assert r.status_code == 200 and r.json()["started"] is True
+    try:
+        _retained.append([bytearray(1024) for _ in range(2000)])
+        r = client.post("/admin/memory/snapshot?limit=50", headers=headers)
+        assert r.status_code == 200
+        here = [e for e in r.json()["top"] if e["location"].startswith(__file__)]
+        assert here and here[0]["size_diff_bytes"] > 2000 * 1024
+        assert client.post("/admin/memory/snapshot?group_by=nope", headers=headers).status_code == 400
+    finally:
+        _retained.clear()
+        assert client.delete("/admin/memory", headers=headers).status_code == 204
+    assert not tracemalloc.is_tracing()
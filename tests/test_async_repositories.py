@@ -0,0 +1,59 @@
+import asyncio
+import os
+import uuid
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def test_async_create_and_read_user():
+    _ensure_test_env()
+    from src.infrastructure.repositories import async_users_repository as users_repo
+
+    async def scenario():
+        user = await users_repo.create_user(email="async_repo@example.com", password_hash="h")
+        by_email = await users_repo.get_user_by_email("async_repo@example.com")
+        by_id = await users_repo.get_user_by_id(user["id"])
+        missing = await users_repo.get_user_by_id(-1)
+        return user, by_email, by_id, missing
+
+    user, by_email, by_id, missing = asyncio.run(scenario())
+    assert isinstance(user["id"], int)
+    assert by_email["id"] == user["id"]
+    assert by_id["email"] == "async_repo@example.com"
+    assert missing is None
+
+
+def test_async_create_user_duplicate_email_raises_value_error():
+    _ensure_test_env()
+    from src.infrastructure.repositories import async_users_repository as users_repo
+
+    async def scenario():
+        await users_repo.create_user(email="async_dupe@example.com", password_hash="h1")
+        await users_repo.create_user(email="async_dupe@example.com", password_hash="h2")
+
+    try:
+        asyncio.run(scenario())
+        assert False, "Expected ValueError for duplicate email"
+    except ValueError as e:
+        assert str(e) == "Email already registered"
+
+
+def test_async_session_lifecycle():
+    _ensure_test_env()
+    from src.infrastructure.repositories import async_users_repository as users_repo
+    from src.infrastructure.repositories import async_sessions_repository as sessions_repo
+
+    jti = uuid.uuid4().hex
+
+    async def scenario():
+        user = await users_repo.create_user(email="async_session@example.com", password_hash="h")
+        await sessions_repo.create_session(user_id=user["id"], jti=jti)
+        active_before = await sessions_repo.is_session_active(jti)
+        revoked = await sessions_repo.revoke_session(jti)
+        revoked_again = await sessions_repo.revoke_session(jti)
+        active_after = await sessions_repo.is_session_active(jti)
+        return active_before, revoked, revoked_again, active_after
+
+    assert asyncio.run(scenario()) == (True, True, False, False)
@@ -0,0 +1,48 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def test_public_path_matcher_matches_exact_and_sub_paths_only():
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.presentation.auth_middleware import PublicPathMatcher
+
+    is_public = PublicPathMatcher(("/docs", "/auth/login"))
+    assert is_public("/docs")
+    assert is_public("/docs/oauth2-redirect")
+    assert is_public("/auth/login")
+    assert not is_public("/docsearch")
+    assert not is_public("/auth/logout")
+    assert not is_public("/")
+    assert not PublicPathMatcher(())("/docs")
+
+
+def test_invalid_bearer_token_returns_401_json():
+    client = _get_client()
+    r = client.get("/auth/logout", headers={"Authorization": "Bearer not-a-jwt"})
+    assert r.status_code == 401
+    assert r.json() == {"detail": "Invalid token"}
+
+
+def test_non_bearer_scheme_returns_not_authenticated():
+    client = _get_client()
+    r = client.post("/auth/logout", headers={"Authorization": "Basic abc"})
+    assert r.status_code == 401
+    assert r.json() == {"detail": "Not authenticated"}
+
+
+def test_valid_token_passes_through_to_routing():
+    client = _get_client()
+    r = client.post(
+        "/auth/signup", json={"email": "middleware_user@example.com", "password": "StrongPass123"}
+    )
+    token = r.json()["access_token"]
+    r = client.get("/does-not-exist", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 404
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def _make_pool(**kwargs):
+    _ensure_test_env()
+    from src.infrastructure.database.pool import ConnectionPool
+
+    return ConnectionPool(**kwargs)
+
+
+def test_pool_reuses_released_connection():
+    pool = _make_pool(min_size=0, max_size=2)
+    try:
+        with pool.connection() as conn:
+            first_pid = conn.get_backend_pid()
+        with pool.connection() as conn:
+            assert conn.get_backend_pid() == first_pid
+
+        stats = pool.stats()
+        assert stats["created_total"] == 1
+        assert stats["acquired_total"] == 2
+        assert stats["in_use"] == 0
+        assert stats["idle"] == 1
+    finally:
+        pool.close()
+
+
+def test_pool_acquire_times_out_when_exhausted():
+    from src.infrastructure.database.pool import PoolTimeoutError
+
+    pool = _make_pool(min_size=0, max_size=1, acquire_timeout=0.1)
+    try:
+        with pool.connection():
+            with pytest.raises(PoolTimeoutError):
+                pool.acquire()
+        assert pool.stats()["timeouts_total"] == 1
+    finally:
+        pool.close()
+
+
+def test_pool_discards_broken_and_open_transaction_connections():
+    pool = _make_pool(min_size=0, max_size=1)
+    try:
+        with pool.connection() as conn:
+            conn.close()
+        assert pool.stats()["size"] == 0
+        assert pool.stats()["discarded_total"] == 1
+
+        # A leftover open transaction is rolled back, not leaked to the next borrower
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+        with pool.connection() as conn:
+            from psycopg2 import extensions
+
+            assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+    finally:
+        pool.close()
+
+
+def test_pool_recycles_connections_past_max_lifetime():
+    pool = _make_pool(min_size=0, max_size=1, max_lifetime=0)
+    try:
+        with pool.connection() as conn:
+            first_pid = conn.get_backend_pid()
+        with pool.connection() as conn:
+            assert conn.get_backend_pid() != first_pid
+        assert pool.stats()["created_total"] == 2
+    finally:
+        pool.close()
@@ -1,4 +1,6 @@
+import asyncio
 import os
+import time
 
 from fastapi.testclient import TestClient
 
@@ -14,3 +16,102 @@ def test_health_check_returns_ok(monkeypatch=None):
     resp = client.get("/health-check")
     assert resp.status_code == 200
     assert resp.text == "ok"
+
+
+def _client_with_monitor(monkeypatch, monitor) -> TestClient:
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.application.health_check_handler import HealthCheckHandler
+    from src.main import app
+    from src.presentation import routes
+
+    monkeypatch.setattr(routes, "_health_handler", HealthCheckHandler(monitor))
+    return TestClient(app)
+
+
+def test_readiness_serves_the_last_background_check(monkeypatch):
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.application.health_monitor import HealthMonitor
+
+    monitor = HealthMonitor(interval_seconds=60)
+    client = _client_with_monitor(monkeypatch, monitor)
+    assert client.get("/health/ready").json() == {"status": "ok", "checked_at": None, "age_seconds": None, "checks": {}}
+
+    asyncio.run(monitor.check_once())
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "ok"
+    assert {"database", "migrations", "async_pool", "kdf_executor"} <= set(body["checks"])
+    assert body["checks"]["migrations"] == {"status": "ok", "pending": []}
+    assert client.get("/health-check").text == "ok"
+    assert client.get("/health/live").text == "ok"
+
+    # Probes never touch the database themselves
+    calls = []
+    monkeypatch.setattr(monitor, "_ping", lambda: calls.append(1))
+    for _ in range(20):
+        client.get("/health-check")
+    assert calls == []
+
+
+def test_failing_database_and_stale_results_fail_readiness(monkeypatch):
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.application.health_monitor import HealthMonitor
+
+    async def unreachable():
+        raise ConnectionRefusedError("connection refused")
+
+    monitor = HealthMonitor(interval_seconds=60)
+    monkeypatch.setattr(monitor, "_ping", unreachable)
+    client = _client_with_monitor(monkeypatch, monitor)
+    asyncio.run(monitor.check_once())
+    r = client.get("/health-check")
+    assert (r.status_code, r.text) == (503, "failing")
+    assert client.get("/health/ready").json()["checks"]["database"]["error"] == "ConnectionRefusedError: connection refused"
+    assert client.get("/health/live").status_code == 200
+
+    stale = HealthMonitor(interval_seconds=60, stale_after_seconds=0.01)
+    monkeypatch.setattr(stale, "_check_executors", lambda: [])
+    monkeypatch.setattr(stale, "_check_database", lambda: asyncio.sleep(0, result=[]))
+    asyncio.run(stale.check_once())
+    client = _client_with_monitor(monkeypatch, stale)
+    time.sleep(0.05)
+    r = client.get("/health/ready")
+    assert r.status_code == 503 and r.json()["checks"]["monitor"]["error"] == "stale"
+
+
+def test_pools_near_capacity_report_degraded(monkeypatch):
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.application.health_monitor import HealthMonitor
+
+    # Every pool and queue counts as "near capacity" at a threshold of 0
+    monitor = HealthMonitor(interval_seconds=60, degraded_utilization=0.0)
+    client = _client_with_monitor(monkeypatch, monitor)
+    asyncio.run(monitor.check_once())
+    r = client.get("/health-check")
+    assert (r.status_code, r.text) == (200, "degraded")
+    assert client.get("/health/ready").json()["checks"]["kdf_executor"]["status"] == "degraded"
+
+
+def test_saturated_request_pool_degrades_without_failing_the_database(monkeypatch):
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.application.health_monitor import HealthMonitor
+    from src.infrastructure.database.async_pool import close_async_pool, get_async_pool
+
+    monitor = HealthMonitor(interval_seconds=60, timeout_seconds=1)
+
+    async def scenario():
+        # Every request connection is taken: a ping borrowing one would time out
+        pool = await get_async_pool()
+        held = [await pool.acquire() for _ in range(pool.get_max_size())]
+        try:
+            return {r.name: r.status for r in await monitor.check_once()}
+        finally:
+            for conn in held:
+                await pool.release(conn)
+            await monitor.stop()
+            await close_async_pool()
+
+    statuses = asyncio.run(scenario())
+    assert statuses["database"] == "ok"
+    assert statuses["async_pool"] == "degraded"
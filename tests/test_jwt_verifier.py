@@ -0,0 +1,72 @@
+import os
+import time
+
+import jwt as pyjwt
+import pytest
+
+
+_BASE_CFG = {
+    "algorithm": "HS256",
+    "issuer": "note-clone",
+    "audience": "note-clone-users",
+    "access_token_ttl_minutes": 60,
+}
+
+
+def _cfg(**overrides):
+    os.environ["APP_ENVIRONMENT"] = "test"
+    cfg = dict(_BASE_CFG)
+    cfg.update(overrides)
+    return cfg
+
+
+def test_verifier_caches_verified_claims():
+    from src.infrastructure.security.jwt import TokenSigner, TokenVerifier
+
+    cfg = _cfg(secret="s" * 32)
+    token = TokenSigner(cfg).create(sub="42")["token"]
+    verifier = TokenVerifier(cfg)
+
+    first = verifier.verify(token)
+    second = verifier.verify(token)
+    assert first["sub"] == "42"
+    assert second is first
+    assert verifier.stats()["hits"] == 1
+
+    with pytest.raises(pyjwt.InvalidTokenError):
+        verifier.verify(token[:-2] + "xx")
+
+
+def test_cached_claims_never_outlive_exp():
+    from src.infrastructure.security.jwt import TokenSigner, TokenVerifier
+
+    cfg = _cfg(secret="s" * 32)
+    token = TokenSigner(cfg).create(sub="1", extra_claims={"exp": int(time.time()) + 1})["token"]
+    verifier = TokenVerifier(cfg)
+    verifier.verify(token)
+
+    time.sleep(1.1)
+    with pytest.raises(pyjwt.ExpiredSignatureError):
+        verifier.verify(token)
+
+
+def test_key_rotation_by_kid_keeps_old_tokens_valid():
+    from src.infrastructure.security.jwt import TokenSigner, TokenVerifier
+
+    old_key = {"kid": "k1", "secret": "a" * 32}
+    new_key = {"kid": "k2", "secret": "b" * 32}
+    legacy_token = TokenSigner(_cfg(secret="l" * 32)).create(sub="1")["token"]
+    old_token = TokenSigner(_cfg(keys=[old_key], active_kid="k1")).create(sub="1")["token"]
+
+    rotated = _cfg(secret="l" * 32, keys=[old_key, new_key], active_kid="k2")
+    new_token = TokenSigner(rotated).create(sub="2")["token"]
+    assert pyjwt.get_unverified_header(new_token)["kid"] == "k2"
+
+    verifier = TokenVerifier(rotated)
+    assert verifier.verify(legacy_token)["sub"] == "1"
+    assert verifier.verify(old_token)["sub"] == "1"
+    assert verifier.verify(new_token)["sub"] == "2"
+
+    stranger = TokenSigner(_cfg(keys=[{"kid": "k9", "secret": "c" * 32}], active_kid="k9"))
+    with pytest.raises(pyjwt.InvalidKeyError):
+        verifier.verify(stranger.create(sub="3")["token"])
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def test_kdf_executor_rejects_when_queue_is_full():
+    _ensure_test_env()
+    from src.infrastructure.security.kdf_executor import KdfBusyError, KdfExecutor
+
+    executor = KdfExecutor(kind="thread", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        depth = executor.stats()["queue_depth"]
+        with pytest.raises(KdfBusyError):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(running, queued)
+        return depth
+
+    try:
+        assert asyncio.run(scenario()) == 1
+        stats = executor.stats()
+        assert stats["rejected_total"] == 1
+        assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+        assert stats["latency_seconds"]["count"] == 2
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_queued_calls_release_their_slots():
+    _ensure_test_env()
+    from src.infrastructure.security.kdf_executor import KdfExecutor
+
+    executor = KdfExecutor(kind="thread", workers=1, max_queue=4)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        for task in queued:
+            task.cancel()  # e.g. the client disconnected
+        await asyncio.gather(*queued, return_exceptions=True)
+        release.set()
+        await running
+
+    try:
+        asyncio.run(scenario())
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+        assert executor._pending == 0
+        assert stats["failed_total"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_async_password_wrappers_round_trip():
+    _ensure_test_env()
+    from src.infrastructure.security.password import hash_password_async, verify_password_async
+
+    async def scenario():
+        hashed = await hash_password_async("CorrectHorse1")
+        return (
+            await verify_password_async("CorrectHorse1", hashed),
+            await verify_password_async("WrongHorse1", hashed),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_process_kdf_executor_hashes_out_of_process():
+    _ensure_test_env()
+    from src.infrastructure.security.kdf_executor import KdfExecutor
+    from src.infrastructure.security.password import hash_password, verify_password
+
+    executor = KdfExecutor(kind="process", workers=1, max_queue=0)
+    try:
+        hashed = asyncio.run(executor.run(hash_password, "ProcessPass1"))
+        assert verify_password("ProcessPass1", hashed)
+    finally:
+        executor.shutdown()
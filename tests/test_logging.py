@@ -0,0 +1,106 @@
+import io
+import json
+import logging
+import os
+import queue
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _record(msg: str, *args, name: str = "app", lineno: int = 1) -> logging.LogRecord:
+    return logging.LogRecord(name, logging.INFO, __file__, lineno, msg, args, None)
+
+
+def test_full_queue_drops_records_and_reports_them_later():
+    from src.logging_config import BoundedQueueHandler
+
+    handler = BoundedQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(_record("line %d", i))
+    assert handler.dropped == 3
+
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    handler.handle(_record("after"))
+    warning, after = handler.queue.get_nowait(), handler.queue.get_nowait()
+    assert warning.getMessage() == "3 log records dropped: log queue full"
+    assert after.getMessage() == "after"
+
+
+def test_rate_limit_applies_per_logger_and_call_site():
+    from src.logging_config import RateLimitFilter
+
+    limiter = RateLimitFilter({"app": 3})
+    # Same line, different text (an f-string): still one call site
+    passed = [limiter.filter(_record(f"connecting database connection {i}")) for i in range(10)]
+    assert passed.count(True) == 3
+    assert limiter.filter(_record("another message", lineno=2))
+    assert all(limiter.filter(_record("x", name="other")) for _ in range(10))
+
+    limiter._buckets[("app", __file__, 1)][0] = 1.0  # a second later
+    record = _record("connecting database connection 10")
+    assert limiter.filter(record)
+    assert record.suppressed == 7
+
+
+def test_rate_limit_keeps_a_bounded_number_of_call_sites():
+    from src.logging_config import RateLimitFilter
+
+    limiter = RateLimitFilter({"app": 1})
+    for lineno in range(3 * RateLimitFilter.MAX_BUCKETS):
+        assert limiter.filter(_record("x", lineno=lineno))
+    assert len(limiter._buckets) <= RateLimitFilter.MAX_BUCKETS
+
+
+def test_json_lines_carry_the_request_id_through_the_queue():
+    from src.logging_config import build_handler, request_id_var
+
+    stream = io.StringIO()
+    handler, listener = build_handler(stream, queue_size=100, json_format=True)
+    listener.start()
+    log = logging.getLogger("test_logging.json")
+    log.addHandler(handler)
+    log.propagate = False
+    token = request_id_var.set("req-42")
+    try:
+        log.info("hello %s", "world")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed")
+    finally:
+        request_id_var.reset(token)
+        log.removeHandler(handler)
+        listener.stop()
+
+    hello, failed = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert (hello["message"], hello["request_id"], hello["level"]) == ("hello world", "req-42", "INFO")
+    assert failed["request_id"] == "req-42"
+    assert failed["message"] == "failed" and "ValueError: boom" in failed["exc_info"]
+
+
+def test_request_id_is_echoed_or_generated():
+    client = _get_client()
+    r = client.get("/health-check", headers={"X-Request-ID": "edge-abc.123"})
+    assert r.headers["x-request-id"] == "edge-abc.123"
+    generated = client.get("/health-check", headers={"X-Request-ID": "bad id\twith junk"}).headers["x-request-id"]
+    assert len(generated) == 32 and generated != client.get("/health-check").headers["x-request-id"]
+
+
+def test_stream_tokens_are_redacted_from_the_access_log():
+    from src.logging_config import AccessTokenRedactionFilter
+
+    record = logging.LogRecord(
+        "uvicorn.access", logging.INFO, __file__, 1, '%s - "%s %s HTTP/%s" %d',
+        ("127.0.0.1:5000", "GET", "/notes/stream?access_token=eyJ.secret.sig&x=1", "1.1", 200), None,
+    )
+    assert AccessTokenRedactionFilter().filter(record)
+    assert record.getMessage() == '127.0.0.1:5000 - "GET /notes/stream?access_token=[redacted]&x=1 HTTP/1.1" 200'
+    assert any(isinstance(f, AccessTokenRedactionFilter) for f in logging.getLogger("uvicorn.access").filters)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import re
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_are_public_and_labelled_by_route_template():
+    client = _get_client()
+    r = client.post("/auth/signup", json={"email": "metrics_routes@example.com", "password": "MetricsPass123"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    note_id = client.post("/notes", json={"title": "t", "body": "b"}, headers=headers).json()["id"]
+
+    series = 'http_request_duration_seconds_count{method="GET",route="/notes/{note_id}",status="200"}'
+    before = _sample(client.get("/metrics").text, series)
+    client.get(f"/notes/{note_id}", headers=headers)
+    client.get(f"/notes/{note_id}", headers=headers)
+    client.get("/notes/1")  # 401 before routing
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert _sample(r.text, series) == before + 2
+    assert f"/notes/{note_id}\"" not in r.text
+    assert 'route="<unmatched>",status="401"' in r.text
+    assert 'method="POST",route="/notes",status="201"' in r.text
+    assert "# TYPE http_requests_in_flight gauge" in r.text
+    assert _sample(r.text, 'db_query_seconds_count{operation="select"}') > 0
+    assert _sample(r.text, 'db_pool_acquire_seconds_count{pool="async"}') > 0
+
+
+def test_registry_renders_histograms_cumulatively_and_escapes_labels():
+    from src.infrastructure.metrics.registry import Registry, render_text
+
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Op latency.", ["name"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.labels('a "quoted"\nname').observe(value)
+    registry.counter("ops_total", "Ops.").inc(3)
+
+    text = render_text(registry.snapshot())
+    assert 'op_seconds_bucket{name="a \\"quoted\\"\\nname",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{name="a \\"quoted\\"\\nname",le="1"} 3' in text
+    assert 'op_seconds_bucket{name="a \\"quoted\\"\\nname",le="+Inf"} 4' in text
+    assert 'op_seconds_count{name="a \\"quoted\\"\\nname"} 4' in text
+    assert "ops_total 3" in text
+
+
+def test_workers_are_merged_through_the_shared_directory(tmp_path):
+    from src.infrastructure.metrics.multiprocess import MultiprocessMetrics, merge_snapshots
+    from src.infrastructure.metrics.registry import Registry
+
+    def worker():
+        registry = Registry()
+        return registry, registry.counter("jobs_total", "Jobs."), registry.gauge("busy", "Busy."), registry.histogram(
+            "job_seconds", "Job time.", buckets=(1.0,)
+        )
+
+    registry, jobs, busy, seconds = worker()
+    jobs.inc(2)
+    busy.set(1)
+    seconds.observe(0.5)
+    MultiprocessMetrics(str(tmp_path), registry=registry).write()
+    own = os.getpid()
+
+    other, other_jobs, other_busy, other_seconds = worker()
+    other_jobs.inc(5)
+    other_busy.set(4)
+    other_seconds.observe(2.0)
+    snapshots = [(own, registry.snapshot()), (own + 1, other.snapshot())]
+
+    merged = {f["name"]: f for f in merge_snapshots(snapshots, alive=lambda pid: True)}
+    assert merged["jobs_total"]["series"] == [[[], 7.0]]
+    assert merged["busy"]["series"] == [[[], 5.0]]
+    assert merged["job_seconds"]["series"] == [[[], {"counts": [1, 1], "sum": 2.5}]]
+    # A dead worker's counters still count; its gauges do not
+    merged = {f["name"]: f for f in merge_snapshots(snapshots, alive=lambda pid: pid == own)}
+    assert (merged["jobs_total"]["series"], merged["busy"]["series"]) == ([[[], 7.0]], [[[], 1.0]])
+
+    metrics = MultiprocessMetrics(str(tmp_path), registry=registry)
+    assert [worker for worker, _ in metrics.read()] == [metrics.worker]
+
+
+def test_exited_workers_are_archived_and_a_reused_pid_does_not_overwrite_them(tmp_path):
+    from src.infrastructure.metrics.multiprocess import MultiprocessMetrics
+    from src.infrastructure.metrics.registry import Registry
+
+    def snapshot(jobs, busy):
+        registry = Registry()
+        registry.counter("jobs_total", "Jobs.").inc(jobs)
+        registry.gauge("busy", "Busy.").set(busy)
+        return registry.snapshot()
+
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs.").inc(1)
+    registry.gauge("busy", "Busy.")
+    metrics = MultiprocessMetrics(str(tmp_path), registry=registry)
+    # An exited worker, and one that ran under this process's pid before it was reused
+    metrics._dump("999999999-1", snapshot(5, 3))
+    metrics._dump(f"{os.getpid()}-1", snapshot(10, 4))
+    assert metrics.worker != f"{os.getpid()}-1"
+
+    def totals():
+        merged = {f["name"]: f["series"] for f in metrics.collect()}
+        return merged["jobs_total"], merged["busy"]
+
+    assert totals() == ([[[], 16.0]], [[[], 0.0]])
+    # Folded into the archive: their files are gone, their counters are not
+    assert set(os.listdir(tmp_path)) == {".lock", "archive.json", f"{metrics.worker}.json"}
+    assert totals() == ([[[], 16.0]], [[[], 0.0]])
+
+    # A new server: the first worker finds nobody else alive and starts from zero
+    async def restart():
+        metrics.start()
+        await metrics.stop()
+
+    asyncio.run(restart())
+    assert set(os.listdir(tmp_path)) == {".lock", f"{metrics.worker}.json"}
+    assert totals() == ([[[], 1.0]], [[[], 0.0]])
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import os
+
+from fastapi.testclient import TestClient
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(300_000)
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "AttachPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _note(client, headers) -> int:
+    r = client.post("/notes", json={"title": "t", "body": "b"}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _start(client, headers, note_id, data, filename="scan.png", content_type="image/png"):
+    r = client.post(
+        f"/notes/{note_id}/attachments/uploads",
+        json={"filename": filename, "content_type": content_type, "size": len(data)},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _upload(client, headers, note_id, data, chunk=100_000):
+    upload = _start(client, headers, note_id, data)
+    url = f"/notes/{note_id}/attachments/uploads/{upload}"
+    for offset in range(0, len(data), chunk):
+        r = client.patch(url, content=data[offset:offset + chunk], headers={**headers, "Upload-Offset": str(offset)})
+        assert r.status_code in (200, 201), r.text
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_chunked_upload_resumes_from_the_server_offset():
+    client = _get_client()
+    headers = _auth_headers(client, "attach_resume@example.com")
+    note_id = _note(client, headers)
+    upload = _start(client, headers, note_id, PNG)
+    url = f"/notes/{note_id}/attachments/uploads/{upload}"
+
+    r = client.patch(url, content=PNG[:120_000], headers={**headers, "Upload-Offset": "0"})
+    assert (r.status_code, r.json()["offset"], r.headers["upload-offset"]) == (200, 120_000, "120000")
+    # A chunk sent for the wrong offset is refused and told where to resume
+    r = client.patch(url, content=PNG[100_000:200_000], headers={**headers, "Upload-Offset": "100000"})
+    assert (r.status_code, r.json()["offset"]) == (409, 120_000)
+
+    resume = int(client.head(url, headers=headers).headers["upload-offset"])
+    r = client.patch(url, content=PNG[resume:], headers={**headers, "Upload-Offset": str(resume)})
+    assert r.status_code == 201, r.text
+    attachment = r.json()
+    assert (attachment["sha256"], attachment["size"]) == (hashlib.sha256(PNG).hexdigest(), len(PNG))
+    assert client.get(url, headers=headers).status_code == 404
+
+    r = client.get(f"/notes/{note_id}/attachments", headers=headers)
+    assert [a["id"] for a in r.json()["items"]] == [attachment["id"]]
+
+
+def test_oversized_or_disallowed_uploads_are_rejected():
+    client = _get_client()
+    headers = _auth_headers(client, "attach_reject@example.com")
+    note_id = _note(client, headers)
+    r = client.post(
+        f"/notes/{note_id}/attachments/uploads",
+        json={"filename": "page.html", "content_type": "text/html", "size": 10},
+        headers=headers,
+    )
+    assert r.status_code == 400
+
+    upload = _start(client, headers, note_id, b"x" * 10)
+    url = f"/notes/{note_id}/attachments/uploads/{upload}"
+    r = client.patch(url, content=b"x" * 11, headers={**headers, "Upload-Offset": "0"})
+    assert r.status_code == 400
+    assert client.get(url, headers=headers).json()["offset"] == 0
+
+    for filename in ("a\u0000.png", "a\nb.png", "a\u009b.png"):
+        r = client.post(
+            f"/notes/{note_id}/attachments/uploads",
+            json={"filename": filename, "content_type": "image/png", "size": 10},
+            headers=headers,
+        )
+        assert r.status_code == 400, filename
+    huge = "99999999999999999999"
+    r = client.post(
+        f"/notes/{huge}/attachments/uploads",
+        json={"filename": "a.png", "content_type": "image/png", "size": 10},
+        headers=headers,
+    )
+    assert r.status_code == 422
+    assert client.get(f"/notes/{note_id}/attachments/{huge}", headers=headers).status_code == 422
+    assert client.delete(f"/notes/{note_id}/attachments/{huge}", headers=headers).status_code == 422
+
+
+def test_download_supports_ranges_and_revalidation():
+    client = _get_client()
+    headers = _auth_headers(client, "attach_range@example.com")
+    note_id = _note(client, headers)
+    attachment = _upload(client, headers, note_id, PNG)
+    url = f"/notes/{note_id}/attachments/{attachment['id']}"
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200 and r.content == PNG
+    assert r.headers["content-type"] == "image/png"
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["x-content-type-options"] == "nosniff"
+
+    r = client.get(url, headers={**headers, "Range": "bytes=1000-1999"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes 1000-1999/{len(PNG)}"
+    assert r.content == PNG[1000:2000]
+
+    r = client.get(url, headers={**headers, "If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+
+
+def test_identical_content_is_stored_once_and_collected_when_unreferenced():
+    from src.application.notes import attachments
+    from src.infrastructure.storage.blob_store import get_blob_store
+
+    client = _get_client()
+    headers = _auth_headers(client, "attach_dedup@example.com")
+    data = b"%PDF-1.7\n" + os.urandom(50_000)
+    first, second = _note(client, headers), _note(client, headers)
+    a = _upload(client, headers, first, data)
+    b = _upload(client, headers, second, data)
+    assert a["sha256"] == b["sha256"]
+    path = get_blob_store().local_path(a["sha256"])
+    assert os.path.exists(path)
+
+    assert client.delete(f"/notes/{first}/attachments/{a['id']}", headers=headers).status_code == 204
+    asyncio.run(attachments.collect_garbage(blob_grace_seconds=0))
+    assert client.get(f"/notes/{second}/attachments/{b['id']}", headers=headers).content == data
+
+    assert client.delete(f"/notes/{second}/attachments/{b['id']}", headers=headers).status_code == 204
+    result = asyncio.run(attachments.collect_garbage(blob_grace_seconds=0))
+    assert result["blobs"] >= 1
+    assert not os.path.exists(path)
+
+
+def test_blob_files_without_a_row_are_collected():
+    from src.application.notes import attachments
+    from src.infrastructure.storage.blob_store import get_blob_store
+
+    client = _get_client()
+    headers = _auth_headers(client, "attach_orphan_file@example.com")
+    kept = _upload(client, headers, _note(client, headers), b"%PDF-1.7\n" + os.urandom(20_000))
+    # Bytes placed by an upload whose transaction then failed to commit
+    store = get_blob_store()
+    path = store.local_path(hashlib.sha256(os.urandom(16)).hexdigest())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"orphan")
+
+    result = asyncio.run(attachments.collect_garbage(blob_grace_seconds=0))
+    assert result["blob_files"] >= 1
+    assert not os.path.exists(path)
+    assert os.path.exists(store.local_path(kept["sha256"]))
+
+
+def test_attachments_are_private_to_the_note_owner():
+    client = _get_client()
+    owner = _auth_headers(client, "attach_owner@example.com")
+    other = _auth_headers(client, "attach_other@example.com")
+    note_id = _note(client, owner)
+    attachment = _upload(client, owner, note_id, PNG[:5000])
+    upload = _start(client, owner, note_id, PNG[:5000])
+
+    assert client.get(f"/notes/{note_id}/attachments/{attachment['id']}", headers=other).status_code == 404
+    assert client.get(f"/notes/{note_id}/attachments", headers=other).json()["items"] == []
+    assert client.get(f"/notes/{note_id}/attachments/uploads/{upload}", headers=other).status_code == 404
+    r = client.patch(
+        f"/notes/{note_id}/attachments/uploads/{upload}",
+        content=PNG[:5000],
+        headers={**other, "Upload-Offset": "0"},
+    )
+    assert r.status_code == 404
+    r = client.post(
+        f"/notes/{note_id}/attachments/uploads",
+        json={"filename": "a.png", "content_type": "image/png", "size": 1},
+        headers=other,
+    )
+    assert r.status_code == 404
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import uuid
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "RenderPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _note(client, headers, body) -> int:
+    r = client.post("/notes", json={"title": "t", "body": body}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_rendered_html_is_sanitized_and_revalidates():
+    client = _get_client()
+    headers = _auth_headers(client, "render_html@example.com")
+    note_id = _note(
+        client,
+        headers,
+        "# Plan\n\n<script>alert(1)</script>\n\n[bad](javascript:alert(1)) [good](https://example.com)\n\n"
+        "| a | b |\n|---|---|\n| 1 | ~~2~~ |\n",
+    )
+
+    r = client.get(f"/notes/{note_id}/html", headers=headers)
+    assert r.status_code == 200, r.text
+    html = r.json()["html"]
+    assert "<h1>Plan</h1>" in html
+    assert "<script>" not in html and "&lt;script&gt;" in html
+    assert 'href="javascript:' not in html
+    assert '<a href="https://example.com" rel="nofollow noopener noreferrer">good</a>' in html
+    assert "<td><s>2</s></td>" in html
+
+    etag = r.headers["etag"]
+    assert etag != client.get(f"/notes/{note_id}", headers=headers).headers["etag"]
+    assert client.get(f"/notes/{note_id}/html", headers={**headers, "If-None-Match": etag}).status_code == 304
+    client.put(f"/notes/{note_id}", json={"title": "t", "body": "*changed*"}, headers=headers)
+    r = client.get(f"/notes/{note_id}/html", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["html"] == "<p><em>changed</em></p>\n"
+    assert client.get(f"/notes/{note_id}/html", headers=_auth_headers(client, "render_other@example.com")).status_code == 404
+
+
+def test_renders_are_served_from_memory_then_from_the_table():
+    from src.application.notes.rendering import render_cache
+
+    client = _get_client()
+    headers = _auth_headers(client, "render_tiers@example.com")
+    body = f"unique **{uuid.uuid4().hex}**"
+    first, second = _note(client, headers, body), _note(client, headers, body)
+
+    # Process-wide numbers: admins only
+    assert client.get("/notes/render/stats", headers=headers).status_code == 403
+
+    def counts():
+        stats = client.get("/notes/render/stats", headers={**headers, "X-Admin-Token": "test_admin_token"}).json()
+        return stats["renders"], stats["memory_hits"], stats["stored_hits"]
+
+    renders, memory_hits, stored_hits = counts()
+    html = client.get(f"/notes/{first}/html", headers=headers).json()["html"]
+    # Same content in another note: one render serves both
+    assert client.get(f"/notes/{second}/html", headers=headers).json()["html"] == html
+    assert counts() == (renders + 1, memory_hits + 1, stored_hits)
+
+    render_cache.clear()
+    assert client.get(f"/notes/{first}/html", headers=headers).json()["html"] == html
+    assert counts() == (renders + 1, memory_hits + 1, stored_hits + 1)
+
+
+def test_rerender_fills_the_table_once():
+    from src.application.notes import rendering
+    from src.domain.notes.markdown import render_key
+    from src.infrastructure.repositories import renders_repository
+
+    client = _get_client()
+    headers = _auth_headers(client, "render_bulk@example.com")
+    bodies = [f"- item {uuid.uuid4().hex}" for _ in range(30)]
+    for body in bodies:
+        _note(client, headers, body)
+
+    first = asyncio.run(rendering.rerender_all(workers=2, batch_size=16))
+    assert first["rendered"] >= len(bodies)
+    second = asyncio.run(rendering.rerender_all(workers=2, batch_size=16, purge=True))
+    assert second["rendered"] == 0 and second["scanned"] == first["scanned"]
+    assert asyncio.run(renders_repository.get_render(render_key(bodies[0]))) == f"<ul>\n<li>item {bodies[0][7:]}</li>\n</ul>\n"
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import random
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "RevisionPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _edit(rng: random.Random, text: str) -> str:
+    at = rng.randint(0, len(text))
+    if rng.random() < 0.3 and text:
+        return text[:at] + text[at + rng.randint(1, 20):]
+    return text[:at] + rng.choice(["lorem ", "ipsum\n", "dolor sit "]) + text[at:]
+
+
+def test_delta_round_trips_edits():
+    from src.domain.notes.delta import apply_delta, make_delta
+
+    rng = random.Random(3)
+    text = "line one\nline two\nline three\n" * 20
+    for _ in range(300):
+        edited = _edit(rng, text)
+        assert apply_delta(text, make_delta(text, edited)) == edited
+        text = edited
+    big = "x" * 10000
+    assert len(make_delta(big, big[:5000] + "y" + big[5000:])) < 40
+
+
+def test_every_revision_is_rebuilt_exactly():
+    client = _get_client()
+    headers = _auth_headers(client, "revisions_rebuild@example.com")
+    rng = random.Random(7)
+    body = "first draft\n" * 30
+    note = client.post("/notes", json={"title": "v1", "body": body}, headers=headers).json()
+    expected = {1: ("v1", body)}
+    for version in range(2, 80):
+        body = _edit(rng, body)
+        r = client.put(f"/notes/{note['id']}", json={"title": f"v{version}", "body": body}, headers=headers)
+        assert r.json()["version"] == version
+        expected[version] = (f"v{version}", body)
+
+    for revision in (1, 2, 37, 51, 52, 79):
+        r = client.get(f"/notes/{note['id']}/revisions/{revision}", headers=headers)
+        assert r.status_code == 200, r.text
+        assert (r.json()["title"], r.json()["body"]) == expected[revision]
+
+    page = client.get(f"/notes/{note['id']}/revisions", params={"limit": 5}, headers=headers).json()
+    assert [i["revision"] for i in page["items"]] == [79, 78, 77, 76, 75]
+    # max_chain (50) forces a new snapshot at revision 52
+    older = client.get(
+        f"/notes/{note['id']}/revisions", params={"limit": 100, "cursor": page["next_cursor"]}, headers=headers
+    ).json()
+    snapshots = sorted(i["revision"] for i in older["items"] if i["snapshot"])
+    assert snapshots == [1, 52]
+
+
+def test_revisions_are_private_and_missing_ones_404():
+    client = _get_client()
+    headers = _auth_headers(client, "revisions_owner@example.com")
+    other = _auth_headers(client, "revisions_other@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "b"}, headers=headers).json()
+
+    assert client.get(f"/notes/{note['id']}/revisions/1", headers=other).status_code == 404
+    assert client.get(f"/notes/{note['id']}/revisions", headers=other).json()["items"] == []
+    assert client.get(f"/notes/{note['id']}/revisions/2", headers=headers).status_code == 404
+    # Revision numbers are INTEGER: larger ones are rejected before the query
+    assert client.get(f"/notes/{note['id']}/revisions/{2**31}", headers=headers).status_code == 422
+    assert client.get(f"/notes/{note['id']}/revisions/{2**31 - 1}", headers=headers).status_code == 404
+
+
+def test_compaction_shortens_chains_without_changing_content():
+    client = _get_client()
+    headers = _auth_headers(client, "revisions_compact@example.com")
+    body = "compact me\n" * 20
+    note = client.post("/notes", json={"title": "c", "body": body}, headers=headers).json()
+    for i in range(30):
+        body += f"edit {i}\n"
+        client.put(f"/notes/{note['id']}", json={"title": "c", "body": body}, headers=headers)
+    before = client.get(f"/notes/{note['id']}/revisions/31", headers=headers).json()
+
+    from src.application.notes import revisions
+
+    result = asyncio.run(revisions.compact_revisions(compact_chain=10, min_age_seconds=0))
+    assert result["snapshots"] >= 2
+
+    after = client.get(f"/notes/{note['id']}/revisions/31", headers=headers).json()
+    assert after["body"] == before["body"] == body
+    items = client.get(f"/notes/{note['id']}/revisions", params={"limit": 100}, headers=headers).json()["items"]
+    assert sorted(i["revision"] for i in items if i["snapshot"]) == [1, 12, 23]
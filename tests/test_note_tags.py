@@ -0,0 +1,88 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "TagsPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _note(client, headers, title, tags) -> int:
+    r = client.post("/notes", json={"title": title, "body": "", "tags": tags}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _counts(client, headers) -> dict:
+    r = client.get("/notes/tags", headers=headers)
+    assert r.status_code == 200, r.text
+    return {item["tag"]: item["count"] for item in r.json()["items"]}
+
+
+def test_tag_counts_follow_create_update_and_delete():
+    client = _get_client()
+    headers = _auth_headers(client, "tags_counts@example.com")
+    other = _auth_headers(client, "tags_counts_other@example.com")
+
+    first = _note(client, headers, "a", ["#Work", "ideas", "work"])
+    second = _note(client, headers, "b", ["work"])
+    _note(client, other, "c", ["work"])
+    assert client.get(f"/notes/{first}", headers=headers).json()["tags"] == ["ideas", "work"]
+    assert _counts(client, headers) == {"ideas": 1, "work": 2}
+
+    # Omitted tags are kept; given tags replace the set
+    r = client.put(f"/notes/{first}", json={"title": "a", "body": "x"}, headers=headers)
+    assert r.json()["tags"] == ["ideas", "work"]
+    r = client.put(f"/notes/{first}", json={"title": "a", "body": "x", "tags": ["ideas", "home"]}, headers=headers)
+    assert r.json()["tags"] == ["home", "ideas"]
+    assert _counts(client, headers) == {"home": 1, "ideas": 1, "work": 1}
+
+    client.delete(f"/notes/{second}", headers=headers)
+    assert _counts(client, headers) == {"home": 1, "ideas": 1}
+    assert _counts(client, other) == {"work": 1}
+
+    r = client.post("/notes", json={"title": "bad", "body": "", "tags": ["two words"]}, headers=headers)
+    assert r.status_code == 400
+    # Control characters (NUL cannot even be stored) are rejected wherever tags come in
+    r = client.put(f"/notes/{first}", json={"title": "a", "body": "x", "tags": ["a\u0000b"]}, headers=headers)
+    assert r.status_code == 400
+    assert client.get("/notes", params={"tag": "a\u0000b"}, headers=headers).status_code == 400
+    assert client.get("/notes", params={"tag": "a\u0007b"}, headers=headers).status_code == 400
+
+
+def test_sidebar_revalidates_with_etag():
+    client = _get_client()
+    headers = _auth_headers(client, "tags_etag@example.com")
+    _note(client, headers, "a", ["x"])
+    etag = client.get("/notes/tags", headers=headers).headers["etag"]
+    assert client.get("/notes/tags", headers={**headers, "If-None-Match": etag}).status_code == 304
+    _note(client, headers, "b", ["y"])
+    r = client.get("/notes/tags", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and len(r.json()["items"]) == 2
+
+
+def test_list_filters_by_all_given_tags_with_cursor():
+    client = _get_client()
+    headers = _auth_headers(client, "tags_filter@example.com")
+    both = [_note(client, headers, f"both {i}", ["red", "blue"]) for i in range(3)]
+    _note(client, headers, "red only", ["red"])
+    _note(client, headers, "blue only", ["blue", "green"])
+
+    page = client.get("/notes", params={"tag": ["red", "BLUE"], "limit": 2}, headers=headers).json()
+    rest = client.get(
+        "/notes", params={"tag": ["red", "blue"], "limit": 2, "cursor": page["next_cursor"]}, headers=headers
+    ).json()
+    assert [n["id"] for n in page["items"] + rest["items"]] == both[::-1]
+    assert rest["next_cursor"] is None
+
+    assert len(client.get("/notes", params={"tag": "red"}, headers=headers).json()["items"]) == 4
+    assert client.get("/notes", params={"tag": ["red", "missing"]}, headers=headers).json()["items"] == []
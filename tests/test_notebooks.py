@@ -0,0 +1,121 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "NotebookPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _notebook(client, headers, name, parent_id=None) -> int:
+    r = client.post("/notebooks", json={"name": name, "parent_id": parent_id}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _file(client, headers, notebook_id, title="n") -> int:
+    note_id = client.post("/notes", json={"title": title, "body": ""}, headers=headers).json()["id"]
+    r = client.put(f"/notes/{note_id}/notebook", json={"notebook_id": notebook_id}, headers=headers)
+    assert r.status_code == 200, r.text
+    return note_id
+
+
+def test_subtree_listing_counts_and_notes():
+    client = _get_client()
+    headers = _auth_headers(client, "notebooks_tree@example.com")
+    work = _notebook(client, headers, "Work")
+    projects = _notebook(client, headers, "Projects", work)
+    alpha = _notebook(client, headers, "Alpha", projects)
+    _notebook(client, headers, "Archive", work)
+    _file(client, headers, work)
+    alpha_note = _file(client, headers, alpha)
+    _file(client, headers, alpha)
+
+    tree = client.get(f"/notebooks/{work}/tree", headers=headers).json()["items"]
+    assert [(n["name"], n["depth"], n["note_count"], n["subtree_note_count"]) for n in tree] == [
+        ("Work", 0, 1, 3),
+        ("Archive", 1, 0, 0),
+        ("Projects", 1, 0, 2),
+        ("Alpha", 2, 2, 2),
+    ]
+    summary = client.get(f"/notebooks/{work}", headers=headers).json()
+    assert (summary["descendant_count"], summary["subtree_note_count"]) == (3, 3)
+
+    notes = client.get(f"/notebooks/{projects}/notes", params={"limit": 1}, headers=headers).json()
+    more = client.get(
+        f"/notebooks/{projects}/notes", params={"limit": 1, "cursor": notes["next_cursor"]}, headers=headers
+    ).json()
+    assert len(notes["items"]) == 1 and len(more["items"]) == 1 and more["next_cursor"] is None
+    assert client.get(f"/notes/{alpha_note}", headers=headers).json()["notebook_id"] == alpha
+    assert [n["name"] for n in client.get("/notebooks", headers=headers).json()["items"]] == ["Work"]
+
+
+def test_moving_a_subtree_rewires_every_descendant():
+    client = _get_client()
+    headers = _auth_headers(client, "notebooks_move@example.com")
+    a = _notebook(client, headers, "A")
+    b = _notebook(client, headers, "B", a)
+    c = _notebook(client, headers, "C", b)
+    d = _notebook(client, headers, "D")
+    _file(client, headers, c)
+
+    r = client.patch(f"/notebooks/{b}", json={"parent_id": d}, headers=headers)
+    assert r.status_code == 200 and r.json()["parent_id"] == d
+    assert [n["name"] for n in client.get(f"/notebooks/{a}/tree", headers=headers).json()["items"]] == ["A"]
+    tree = client.get(f"/notebooks/{d}/tree", headers=headers).json()["items"]
+    assert [(n["name"], n["depth"]) for n in tree] == [("D", 0), ("B", 1), ("C", 2)]
+    assert tree[0]["subtree_note_count"] == 1
+
+    # Cycles are refused; null parent makes it a root again
+    r = client.patch(f"/notebooks/{d}", json={"parent_id": c}, headers=headers)
+    assert r.status_code == 400
+    r = client.patch(f"/notebooks/{b}", json={"parent_id": None, "name": "B2"}, headers=headers)
+    assert (r.json()["parent_id"], r.json()["name"]) == (None, "B2")
+    assert [n["depth"] for n in client.get(f"/notebooks/{b}/tree", headers=headers).json()["items"]] == [0, 1]
+
+
+def test_delete_removes_subtree_and_unfiles_notes():
+    client = _get_client()
+    headers = _auth_headers(client, "notebooks_delete@example.com")
+    other = _auth_headers(client, "notebooks_delete_other@example.com")
+    root = _notebook(client, headers, "Root")
+    child = _notebook(client, headers, "Child", root)
+    note_id = _file(client, headers, child)
+
+    assert client.get(f"/notebooks/{root}", headers=other).status_code == 404
+    assert client.post("/notebooks", json={"name": "x", "parent_id": root}, headers=other).status_code == 404
+    assert client.put(f"/notes/{note_id}/notebook", json={"notebook_id": root}, headers=other).status_code == 404
+
+    r = client.delete(f"/notebooks/{root}", headers=headers)
+    assert r.json() == {"success": True, "deleted": 2}
+    assert client.get(f"/notebooks/{child}", headers=headers).status_code == 404
+    assert client.get(f"/notes/{note_id}", headers=headers).json()["notebook_id"] is None
+
+
+def test_out_of_range_ids_and_nul_names_are_client_errors():
+    client = _get_client()
+    headers = _auth_headers(client, "notebook_bounds@example.com")
+    notebook = _notebook(client, headers, "Inbox")
+    note_id = client.post("/notes", json={"title": "n", "body": ""}, headers=headers).json()["id"]
+
+    for path in ("", "/tree", "/notes"):
+        assert client.get(f"/notebooks/99999999999999999999{path}", headers=headers).status_code == 422
+    assert client.delete("/notebooks/99999999999999999999", headers=headers).status_code == 422
+    r = client.post("/notebooks", json={"name": "x", "parent_id": 10**20}, headers=headers)
+    assert r.status_code == 422
+    r = client.patch(f"/notebooks/{notebook}", json={"parent_id": 10**20}, headers=headers)
+    assert r.status_code == 422
+    r = client.put(f"/notes/{note_id}/notebook", json={"notebook_id": 10**20}, headers=headers)
+    assert r.status_code == 422
+
+    assert client.post("/notebooks", json={"name": "a\u0000b"}, headers=headers).status_code == 400
+    assert client.patch(f"/notebooks/{notebook}", json={"name": "a\u0000b"}, headers=headers).status_code == 400
@@ -0,0 +1,119 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "NotesPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_note_crud_round_trip():
+    client = _get_client()
+    headers = _auth_headers(client, "notes_crud@example.com")
+
+    r = client.post("/notes", json={"title": "First", "body": "hello"}, headers=headers)
+    assert r.status_code == 201, r.text
+    note = r.json()
+    assert note["title"] == "First" and note["body"] == "hello" and note["version"] == 1
+
+    r = client.put(f"/notes/{note['id']}", json={"title": "First!", "body": "hello world"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["version"] == 2
+
+    r = client.get(f"/notes/{note['id']}", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["body"] == "hello world"
+
+    r = client.delete(f"/notes/{note['id']}", headers=headers)
+    assert r.json() == {"success": True}
+    assert client.get(f"/notes/{note['id']}", headers=headers).status_code == 404
+
+
+def test_notes_are_private_to_their_owner():
+    client = _get_client()
+    owner = _auth_headers(client, "notes_owner@example.com")
+    other = _auth_headers(client, "notes_other@example.com")
+
+    note_id = client.post("/notes", json={"title": "Mine"}, headers=owner).json()["id"]
+    assert client.get(f"/notes/{note_id}", headers=other).status_code == 404
+    assert client.delete(f"/notes/{note_id}", headers=other).status_code == 404
+    assert client.get("/notes", headers=other).json()["items"] == []
+
+
+def test_list_notes_keyset_pagination_returns_summaries():
+    client = _get_client()
+    headers = _auth_headers(client, "notes_pages@example.com")
+    created = [
+        client.post("/notes", json={"title": f"n{i}", "body": "x" * 500}, headers=headers).json()["id"]
+        for i in range(5)
+    ]
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/notes", params=params, headers=headers)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        for item in page["items"]:
+            assert "body" not in item
+            assert len(item["excerpt"]) == 140
+        seen.extend(item["id"] for item in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == list(reversed(created))
+
+
+def test_list_notes_rejects_malformed_cursor():
+    client = _get_client()
+    headers = _auth_headers(client, "notes_badcursor@example.com")
+    r = client.get("/notes", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+    from src.domain.notes.cursor import encode_cursor
+
+    # Integers too big for a datetime or a BIGINT, and booleans, are malformed too
+    for parts in ((10**20, 1), (0, 2**63), (True, 1)):
+        r = client.get("/notes", params={"cursor": encode_cursor(*parts)}, headers=headers)
+        assert (r.status_code, r.json()["detail"]) == (400, "Invalid cursor")
+
+
+def test_out_of_range_ids_and_nul_characters_are_client_errors():
+    client = _get_client()
+    headers = _auth_headers(client, "notes_bounds@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "b"}, headers=headers).json()
+
+    huge = "/notes/99999999999999999999"
+    assert client.get(huge, headers=headers).status_code == 422
+    assert client.get(f"{huge}/html", headers=headers).status_code == 422
+    assert client.put(huge, json={"title": "t", "body": "b"}, headers=headers).status_code == 422
+    assert client.patch(huge, json={"base_version": 1}, headers=headers).status_code == 422
+    assert client.delete(huge, headers=headers).status_code == 422
+    assert client.get("/notes/0", headers=headers).status_code == 422
+
+    for payload in ({"title": "a\u0000b", "body": ""}, {"title": "", "body": "a\u0000b"}):
+        assert client.post("/notes", json=payload, headers=headers).status_code == 400
+        assert client.put(f"/notes/{note['id']}", json=payload, headers=headers).status_code == 400
+    r = client.patch(
+        f"/notes/{note['id']}",
+        json={"base_version": note["version"], "ops": [{"start": 0, "end": 0, "text": "\u0000"}]},
+        headers=headers,
+    )
+    assert r.status_code == 400
@@ -0,0 +1,135 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "BatchPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _note(client, headers, tags=()) -> int:
+    r = client.post("/notes", json={"title": "t", "body": "b", "tags": list(tags)}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_batch_applies_every_kind_and_reports_per_item():
+    client = _get_client()
+    headers = _auth_headers(client, "batch_apply@example.com")
+    other = _auth_headers(client, "batch_apply_other@example.com")
+    a, b, c = _note(client, headers, ["old"]), _note(client, headers, ["old"]), _note(client, headers)
+    foreign = _note(client, other)
+    notebook = client.post("/notebooks", json={"name": "Inbox"}, headers=headers).json()["id"]
+    etag = client.get(f"/notes/{a}", headers=headers).headers["etag"]
+
+    r = client.post(
+        "/notes/batch",
+        json={
+            "operations": [
+                {"op": "tag", "id": a, "tags": ["New", "x"]},
+                {"op": "tag", "id": b, "tags": ["new"]},
+                {"op": "untag", "id": a, "tags": ["old"]},
+                {"op": "file", "id": a, "notebook_id": notebook},
+                {"op": "file", "id": b, "notebook_id": 10**12},
+                {"op": "delete", "id": c},
+                {"op": "delete", "id": foreign},
+            ]
+        },
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert [item["status"] for item in r.json()["items"]] == [
+        "ok", "ok", "ok", "ok", "notebook_not_found", "ok", "not_found",
+    ]
+    assert r.json()["applied"] == 5
+
+    note = client.get(f"/notes/{a}", headers=headers).json()
+    assert (note["tags"], note["notebook_id"]) == (["new", "x"], notebook)
+    assert client.get(f"/notes/{c}", headers=headers).status_code == 404
+    assert client.get(f"/notes/{foreign}", headers=other).status_code == 200
+    counts = {i["tag"]: i["count"] for i in client.get("/notes/tags", headers=headers).json()["items"]}
+    assert counts == {"new": 2, "old": 1, "x": 1}
+    # Tags and notebook are part of the note validator even though the version did not move
+    assert client.get(f"/notes/{a}", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_invalid_batch_is_rejected_as_a_whole():
+    client = _get_client()
+    headers = _auth_headers(client, "batch_invalid@example.com")
+    note = _note(client, headers)
+
+    r = client.post(
+        "/notes/batch",
+        json={
+            "operations": [
+                {"op": "delete", "id": note},
+                {"op": "tag", "id": note, "tags": []},
+                {"op": "tag", "id": note, "tags": ["bad tag"]},
+                {"op": "delete", "id": note},
+            ]
+        },
+        headers=headers,
+    )
+    assert r.status_code == 400
+    assert [e["index"] for e in r.json()["errors"]] == [1, 2, 3]
+    assert client.get(f"/notes/{note}", headers=headers).status_code == 200
+
+    r = client.post("/notes/batch", json={"operations": [{"op": "archive", "id": note}]}, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["errors"] == [{"index": 0, "detail": "Unknown operation 'archive'"}]
+
+    # Ids no BIGINT can hold are reported per item too, not sent to the database
+    r = client.post(
+        "/notes/batch",
+        json={
+            "operations": [
+                {"op": "delete", "id": 10**20},
+                {"op": "file", "id": note, "notebook_id": 10**20},
+                {"op": "tag", "id": 0, "tags": ["x"]},
+            ]
+        },
+        headers=headers,
+    )
+    assert r.status_code == 400
+    assert [e["index"] for e in r.json()["errors"]] == [0, 1, 2]
+    assert client.get(f"/notes/{note}", headers=headers).status_code == 200
+
+
+def test_batch_tagging_cannot_push_a_note_past_the_tag_cap():
+    from src.domain.notes.tags import MAX_TAGS_PER_NOTE
+
+    client = _get_client()
+    headers = _auth_headers(client, "batch_tag_cap@example.com")
+    full = _note(client, headers, [f"t{i}" for i in range(MAX_TAGS_PER_NOTE)])
+    roomy = _note(client, headers, ["a"])
+    swapped = _note(client, headers, [f"t{i}" for i in range(MAX_TAGS_PER_NOTE)])
+
+    r = client.post(
+        "/notes/batch",
+        json={
+            "operations": [
+                {"op": "tag", "id": full, "tags": ["one-more"]},
+                {"op": "tag", "id": roomy, "tags": ["b"]},
+                {"op": "tag", "id": swapped, "tags": ["new"]},
+                {"op": "untag", "id": swapped, "tags": ["t0"]},
+            ]
+        },
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert [item["status"] for item in r.json()["items"]] == ["too_many_tags", "ok", "ok", "ok"]
+    assert r.json()["applied"] == 3
+    assert len(client.get(f"/notes/{full}", headers=headers).json()["tags"]) == MAX_TAGS_PER_NOTE
+    assert "one-more" not in client.get(f"/notes/{full}", headers=headers).json()["tags"]
+    assert client.get(f"/notes/{roomy}", headers=headers).json()["tags"] == ["a", "b"]
+    tags = client.get(f"/notes/{swapped}", headers=headers).json()["tags"]
+    assert len(tags) == MAX_TAGS_PER_NOTE and "new" in tags and "t0" not in tags
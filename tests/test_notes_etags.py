@@ -0,0 +1,69 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "EtagPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_note_etag_follows_the_version():
+    client = _get_client()
+    headers = _auth_headers(client, "etag_note@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "b"}, headers=headers).json()
+    url = f"/notes/{note['id']}"
+
+    r = client.get(url, headers=headers)
+    etag = r.headers["etag"]
+    assert etag.startswith('"') and r.headers["cache-control"] == "private, no-cache"
+
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    r = client.get(url, headers={**headers, "If-None-Match": f'"other", W/{etag}'})
+    assert r.status_code == 304
+
+    client.put(url, json={"title": "t", "body": "changed"}, headers=headers)
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["body"] == "changed"
+    assert r.headers["etag"] != etag
+
+
+def test_list_etag_changes_with_any_note_of_the_user_only():
+    client = _get_client()
+    headers = _auth_headers(client, "etag_list@example.com")
+    other = _auth_headers(client, "etag_list_other@example.com")
+    note = client.post("/notes", json={"title": "a", "body": "a"}, headers=headers).json()
+
+    etag = client.get("/notes", headers=headers).headers["etag"]
+    assert client.get("/notes", headers={**headers, "If-None-Match": etag}).status_code == 304
+    # Different query parameters are a different representation
+    assert client.get("/notes", params={"limit": 5}, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    client.post("/notes", json={"title": "x", "body": "x"}, headers=other)
+    assert client.get("/notes", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    for change in (
+        lambda: client.patch(f"/notes/{note['id']}", json={"base_version": 1, "title": "b"}, headers=headers),
+        lambda: client.post("/notes", json={"title": "c", "body": "c"}, headers=headers),
+        lambda: client.delete(f"/notes/{note['id']}", headers=headers),
+    ):
+        change()
+        r = client.get("/notes", headers={**headers, "If-None-Match": etag})
+        assert r.status_code == 200
+        etag = r.headers["etag"]
+
+
+def test_missing_note_is_404_even_when_revalidating():
+    client = _get_client()
+    headers = _auth_headers(client, "etag_missing@example.com")
+    r = client.get("/notes/999999999", headers={**headers, "If-None-Match": '"n999999999.1"'})
+    assert r.status_code == 404
@@ -0,0 +1,83 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "BulkPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _ndjson(*items) -> bytes:
+    return "".join(json.dumps(i) + "\n" for i in items).encode("utf-8")
+
+
+def test_import_then_export_round_trips():
+    client = _get_client()
+    headers = _auth_headers(client, "bulk_roundtrip@example.com")
+    payload = _ndjson(
+        {"title": "first", "body": "héllo\nworld", "created_at": "2024-01-02T03:04:05+00:00"},
+        {"title": "second", "body": "b"},
+    ) + b"\n"  # blank lines are ignored
+
+    r = client.post("/notes/import", content=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["rows"] == 2 and r.json()["inserted"] == 2 and r.json()["updated"] == 0
+
+    r = client.get("/notes/export", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(n["title"], n["body"]) for n in lines] == [("first", "héllo\nworld"), ("second", "b")]
+    assert lines[0]["created_at"].startswith("2024-01-02T03:04:05")
+
+
+def test_import_updates_own_notes_and_never_touches_others():
+    client = _get_client()
+    headers = _auth_headers(client, "bulk_merge@example.com")
+    other = _auth_headers(client, "bulk_merge_other@example.com")
+    mine = client.post("/notes", json={"title": "old", "body": "old"}, headers=headers).json()
+    theirs = client.post("/notes", json={"title": "theirs", "body": "x"}, headers=other).json()
+
+    payload = _ndjson(
+        {"id": mine["id"], "title": "stale", "body": "stale"},
+        {"id": mine["id"], "title": "new", "body": "new"},
+        {"id": theirs["id"], "title": "hijack", "body": "y"},
+    )
+    r = client.post("/notes/import", content=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    assert (r.json()["updated"], r.json()["inserted"]) == (1, 1)
+
+    updated = client.get(f"/notes/{mine['id']}", headers=headers).json()
+    assert (updated["title"], updated["version"]) == ("new", mine["version"] + 1)
+    assert client.get(f"/notes/{theirs['id']}", headers=other).json()["title"] == "theirs"
+
+
+def test_invalid_line_rejects_the_whole_import():
+    client = _get_client()
+    headers = _auth_headers(client, "bulk_invalid@example.com")
+    payload = _ndjson({"title": "ok", "body": "ok"}) + b"{not json\n"
+
+    r = client.post("/notes/import", content=payload, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"].startswith("Line 2:")
+    assert client.get("/notes", headers=headers).json()["items"] == []
+
+    r = client.post("/notes/import", content=_ndjson({"title": "t" * 201}), headers=headers)
+    assert r.status_code == 400
+    assert "Title must be at most" in r.json()["detail"]
+
+    # Ids a BIGINT cannot hold and NUL characters are line errors, not database errors
+    for bad in ({"id": 10**20, "title": "t"}, {"id": 0, "title": "t"}, {"title": "t", "body": "a\u0000b"}):
+        r = client.post("/notes/import", content=_ndjson({"title": "ok"}, bad), headers=headers)
+        assert r.status_code == 400 and r.json()["detail"].startswith("Line 2:"), r.text
+    assert client.get("/notes", headers=headers).json()["items"] == []
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "PatchPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_patch_applies_ranges_and_returns_only_the_version():
+    client = _get_client()
+    headers = _auth_headers(client, "patch_apply@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "héllo world, bye"}, headers=headers).json()
+
+    ops = [{"start": 0, "end": 5, "text": "HÉLLO"}, {"start": 6, "end": 6, "text": "big "}, {"start": 11, "end": 16}]
+    r = client.patch(f"/notes/{note['id']}", json={"base_version": 1, "ops": ops, "title": "t2"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"version": 2}
+
+    current = client.get(f"/notes/{note['id']}", headers=headers).json()
+    assert (current["title"], current["body"], current["version"]) == ("t2", "HÉLLO big world", 2)
+    # The patch is recorded as a revision like any other save
+    r = client.get(f"/notes/{note['id']}/revisions/2", headers=headers)
+    assert r.json()["body"] == "HÉLLO big world"
+    assert client.get(f"/notes/{note['id']}/revisions/1", headers=headers).json()["body"] == "héllo world, bye"
+
+
+def test_stale_patch_conflicts_with_a_rebase_hint():
+    client = _get_client()
+    headers = _auth_headers(client, "patch_conflict@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "one two three"}, headers=headers).json()
+    client.patch(
+        f"/notes/{note['id']}", json={"base_version": 1, "ops": [{"start": 4, "end": 7, "text": "2"}]}, headers=headers
+    )
+
+    r = client.patch(
+        f"/notes/{note['id']}", json={"base_version": 1, "ops": [{"start": 0, "end": 0, "text": "x"}]}, headers=headers
+    )
+    assert r.status_code == 409
+    assert r.json() == {
+        "detail": "Version conflict",
+        "current_version": 2,
+        "rebase": {"start": 4, "end": 7, "text": "2"},
+    }
+    assert client.get(f"/notes/{note['id']}", headers=headers).json()["body"] == "one 2 three"
+
+
+def test_invalid_patches_are_rejected():
+    client = _get_client()
+    headers = _auth_headers(client, "patch_invalid@example.com")
+    other = _auth_headers(client, "patch_invalid_other@example.com")
+    note = client.post("/notes", json={"title": "t", "body": "short"}, headers=headers).json()
+    url = f"/notes/{note['id']}"
+
+    r = client.patch(url, json={"base_version": 1, "ops": [{"start": 3, "end": 9, "text": ""}]}, headers=headers)
+    assert r.status_code == 400 and r.json()["detail"] == "Operation range exceeds the note body"
+    overlapping = [{"start": 0, "end": 3, "text": "a"}, {"start": 2, "end": 4, "text": "b"}]
+    r = client.patch(url, json={"base_version": 1, "ops": overlapping}, headers=headers)
+    assert r.status_code == 400
+    r = client.patch(url, json={"base_version": 1, "ops": []}, headers=other)
+    assert r.status_code == 404
+    # Offsets and versions beyond what the columns (and body limit) allow never reach the database
+    r = client.patch(url, json={"base_version": 1, "ops": [{"start": 0, "end": 3000000000}]}, headers=headers)
+    assert r.status_code == 422
+    assert client.patch(url, json={"base_version": 99999999999, "ops": []}, headers=headers).status_code == 422
+    assert client.get(url, headers=headers).json()["version"] == 1
+
+    from src.domain.notes.delta import validate_text_ops
+
+    with pytest.raises(ValueError, match="exceeds the note body"):
+        validate_text_ops([(0, 11, "")], max_length=10)
@@ -0,0 +1,86 @@
+import base64
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _auth_headers(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "SearchPass123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_search_ranks_title_matches_first_and_highlights_safely():
+    client = _get_client()
+    headers = _auth_headers(client, "search_rank@example.com")
+    body_hit = client.post(
+        "/notes", json={"title": "Groceries", "body": "buy <b>avocado</b> and bread"}, headers=headers
+    ).json()["id"]
+    title_hit = client.post(
+        "/notes", json={"title": "Avocado toast", "body": "recipe for breakfast"}, headers=headers
+    ).json()["id"]
+    client.post("/notes", json={"title": "Unrelated", "body": "nothing here"}, headers=headers)
+
+    r = client.get("/notes/search", params={"q": "avocados"}, headers=headers)
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert [i["id"] for i in items] == [title_hit, body_hit]
+    assert "body" not in items[0]
+    snippet = items[1]["snippet"]
+    assert "<mark>avocado</mark>" in snippet
+    assert "<b>" not in snippet
+
+
+def test_search_is_scoped_to_user_and_paginates():
+    client = _get_client()
+    headers = _auth_headers(client, "search_pages@example.com")
+    other = _auth_headers(client, "search_other@example.com")
+    client.post("/notes", json={"title": "kiwi", "body": "kiwi"}, headers=other)
+    created = {
+        client.post("/notes", json={"title": f"kiwi {i}", "body": "kiwi " * i}, headers=headers).json()["id"]
+        for i in range(1, 6)
+    }
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "kiwi", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/notes/search", params=params, headers=headers).json()
+        seen.extend(i["id"] for i in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5 and set(seen) == created
+
+
+def test_search_requires_a_query():
+    client = _get_client()
+    headers = _auth_headers(client, "search_empty@example.com")
+    r = client.get("/notes/search", params={"q": "   "}, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Search query must not be empty"
+
+
+def test_search_rejects_ranks_and_queries_postgres_cannot_take():
+    from src.domain.notes.cursor import encode_cursor
+
+    client = _get_client()
+    headers = _auth_headers(client, "search_bounds@example.com")
+    for rank in (1e300, -1e300):
+        r = client.get("/notes/search", params={"q": "x", "cursor": encode_cursor(rank, 1)}, headers=headers)
+        assert (r.status_code, r.json()["detail"]) == (400, "Invalid cursor")
+    # JSON has no infinity or NaN, but Python's decoder accepts them
+    for raw in ("[Infinity,1]", "[NaN,1]", "[1e400,1]"):
+        cursor = base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+        r = client.get("/notes/search", params={"q": "x", "cursor": cursor}, headers=headers)
+        assert r.status_code == 400
+    assert client.get("/notes/search", params={"q": "a\u0000b"}, headers=headers).status_code == 400
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def test_hub_fans_out_per_user_and_bounds_slow_consumers():
+    _ensure_test_env()
+    from src.application.notes.stream import NoteChangeHub
+
+    async def scenario():
+        hub = NoteChangeHub(max_queue=3)
+        alice, alice_tab, bob = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+        hub.on_notification(json.dumps({"user_id": 1, "note_id": 10, "version": 1, "op": "insert"}))
+        first = await alice.get(timeout=1)
+        assert first == {"note_id": 10, "version": 1, "op": "insert"}
+        assert await alice_tab.get(timeout=1) == first
+        assert await bob.get(timeout=0.01) is None
+
+        for version in range(2, 7):
+            hub.on_notification(json.dumps({"user_id": 2, "note_id": 20, "version": version, "op": "update"}))
+        # Queue of 3 overflowed: the backlog is replaced by a single resync marker
+        assert [await bob.get(timeout=1) for _ in range(2)] == [
+            {"op": "resync"},
+            {"note_id": 20, "version": 6, "op": "update"},
+        ]
+        hub.on_notification("not json")
+        hub.unsubscribe(alice_tab)
+        return hub.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["subscribers"] == 2 and stats["users"] == 2
+    assert stats["dropped"] == 4 and stats["overflows"] == 1
+    assert stats["notifications"] == 7
+
+
+def test_listener_delivers_database_changes_to_the_owner():
+    _ensure_test_env()
+    from src.application.notes import service as notes_service
+    from src.application.notes.stream import NoteChangeHub
+    from src.infrastructure.database.listener import PgListener
+    from src.infrastructure.repositories import async_users_repository as users_repo
+    from src.infrastructure.repositories.notes_repository import NOTES_CHANGED_CHANNEL
+
+    async def scenario():
+        hub = NoteChangeHub()
+        listener = PgListener()
+        listener.subscribe(NOTES_CHANGED_CHANNEL, hub.on_notification)
+        listener.add_state_callback(hub.on_listener_state)
+        owner = await users_repo.create_user(email="stream_owner@example.com", password_hash="h")
+        other = await users_repo.create_user(email="stream_other@example.com", password_hash="h")
+        subscription = hub.subscribe(owner["id"])
+        await listener.start()
+        try:
+            assert await subscription.get(timeout=5) == {"op": "resync"}
+            note = await notes_service.create_note(owner["id"], "t", "b")
+            await notes_service.create_note(other["id"], "t", "b")
+            await notes_service.delete_note(owner["id"], note["id"])
+            return note, [await subscription.get(timeout=5) for _ in range(2)], await subscription.get(timeout=0.2)
+        finally:
+            await listener.stop()
+
+    note, events, extra = asyncio.run(scenario())
+    assert events == [
+        {"note_id": note["id"], "version": 1, "op": "insert"},
+        {"note_id": note["id"], "version": 1, "op": "delete"},
+    ]
+    assert extra is None
+
+
+def test_stream_requires_authentication_and_reports_stats():
+    _ensure_test_env()
+    from src.main import app
+
+    client = TestClient(app)
+    assert client.get("/notes/stream").status_code == 401
+    assert client.get("/notes/stream", params={"access_token": "garbage"}).json()["detail"] == "Invalid token"
+    token = client.post(
+        "/auth/signup", json={"email": "stream_stats@example.com", "password": "StreamPass123"}
+    ).json()["access_token"]
+    # Query tokens are only honoured for the stream itself
+    assert client.get("/notes", params={"access_token": token}).status_code == 401
+    # Hub counters cover every user, so they need the admin secret too
+    bearer = {"Authorization": f"Bearer {token}"}
+    assert client.get("/notes/stream/stats", headers=bearer).status_code == 403
+    stats = client.get("/notes/stream/stats", headers={**bearer, "X-Admin-Token": "test_admin_token"}).json()
+    assert {"subscribers", "dropped", "delivered"} <= set(stats)
+
+
+def test_sse_events_are_framed_and_unsubscribe_on_close():
+    _ensure_test_env()
+    from src.application.notes.stream import note_change_hub
+    from src.presentation.notes_routes import _change_events
+
+    async def scenario():
+        subscription = note_change_hub.subscribe(424242)
+        note_change_hub.on_notification(json.dumps({"user_id": 424242, "note_id": 1, "version": 2, "op": "update"}))
+        events = _change_events(subscription, {"jti": "unused", "exp": None})
+        frames = [await events.__anext__(), await events.__anext__()]
+        await events.aclose()
+        return frames, note_change_hub.stats()["subscribers"]
+
+    frames, subscribers = asyncio.run(scenario())
+    assert frames == ["retry: 3000\n\n", 'event: note\ndata: {"note_id":1,"version":2,"op":"update"}\n\n']
+    assert subscribers == 0
+
+
+def test_busy_streams_still_end_when_the_token_expires(monkeypatch):
+    _ensure_test_env()
+    import time
+
+    from src.application.notes import stream as note_stream
+    from src.presentation.notes_routes import _change_events
+
+    # Every event is "a heartbeat interval" after the last check
+    monkeypatch.setattr(note_stream, "HEARTBEAT_SECONDS", 0.0)
+
+    async def scenario():
+        subscription = note_stream.note_change_hub.subscribe(434343)
+        note_stream.note_change_hub.on_notification(
+            json.dumps({"user_id": 434343, "note_id": 1, "version": 2, "op": "update"})
+        )
+        events = _change_events(subscription, {"jti": "unused", "exp": time.time() - 1})
+        frames = [await events.__anext__(), await events.__anext__()]
+        try:
+            await events.__anext__()
+        except StopAsyncIteration:
+            frames.append(None)
+        return frames
+
+    assert asyncio.run(scenario()) == ["retry: 3000\n\n", "event: end\ndata: {}\n\n", None]
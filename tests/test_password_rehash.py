@@ -0,0 +1,42 @@
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def test_login_rehashes_outdated_password_hash():
+    client = _get_client()
+    from src.infrastructure.repositories.users_repository import create_user, get_user_by_email
+    from src.infrastructure.security.password import (
+        build_context,
+        password_needs_rehash,
+        verify_password,
+    )
+
+    email = "rehash_user@example.com"
+    old_hash = build_context({"rounds": 1000}).hash("LegacyPass123")
+    create_user(email=email, password_hash=old_hash)
+    assert password_needs_rehash(old_hash)
+
+    r = client.post("/auth/login", json={"email": email, "password": "LegacyPass123"})
+    assert r.status_code == 200, r.text
+
+    upgraded = get_user_by_email(email)["password_hash"]
+    assert upgraded != old_hash
+    assert not password_needs_rehash(upgraded)
+    assert verify_password("LegacyPass123", upgraded)
+
+
+def test_calibrate_returns_rounds_near_target():
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.infrastructure.security.calibrate import calibrate
+
+    rounds, measured_ms = calibrate(target_ms=5, samples=1)
+    assert rounds >= 1000 and rounds % 1000 == 0
+    assert measured_ms > 0
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import time
+import uuid
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def test_principal_is_compact_and_dict_compatible():
+    _ensure_test_env()
+    from src.domain.auth.principal import Principal
+
+    p = Principal(7, "p@example.com")
+    assert not hasattr(p, "__dict__")
+    assert p["id"] == 7 and p["email"] == "p@example.com"
+    assert p.as_dict() == {"id": 7, "email": "p@example.com"}
+
+
+def test_resolver_caches_principal_until_revoked():
+    _ensure_test_env()
+    from src.application.auth.principal import PrincipalResolver
+    from src.infrastructure.cache.session_cache import SessionCache
+    from src.infrastructure.repositories import sessions_repository, users_repository
+
+    user = users_repository.create_user(email="principal_user@example.com", password_hash="h")
+    jti = uuid.uuid4().hex
+    sessions_repository.create_session(user_id=user["id"], jti=jti)
+    exp = time.time() + 3600
+
+    sessions = SessionCache()
+    sessions.on_listener_state(True)
+    resolver = PrincipalResolver(ttl=60, sessions=sessions)
+
+    async def scenario():
+        first = await resolver.resolve(jti, exp)
+        second = await resolver.resolve(jti, exp)
+        # A revocation from another worker arrives as a notification
+        await asyncio.to_thread(sessions_repository.revoke_session, jti)
+        resolver.on_revoked_notification(jti)
+        sessions.on_revoked_notification(jti)
+        third = await resolver.resolve(jti, exp)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first.id == user["id"] and first.email == "principal_user@example.com"
+    assert second is first
+    assert third is None
+    assert resolver.stats()["hits"] == 1
+
+
+def test_resolver_returns_none_for_unknown_session():
+    _ensure_test_env()
+    from src.application.auth.principal import PrincipalResolver
+    from src.infrastructure.cache.session_cache import SessionCache
+
+    resolver = PrincipalResolver(sessions=SessionCache())
+    assert asyncio.run(resolver.resolve(uuid.uuid4().hex, time.time() + 60)) is None
@@ -0,0 +1,60 @@
+import logging
+import os
+
+from fastapi.testclient import TestClient
+
+
+def _get_client() -> TestClient:
+    # Ensure test env
+    os.environ["APP_ENVIRONMENT"] = "test"
+    from src.main import app
+    return TestClient(app)
+
+
+def _signup(client: TestClient, email: str) -> dict:
+    r = client.post("/auth/signup", json={"email": email, "password": "TracePass123"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_responses_report_query_count_and_list_has_no_n_plus_one():
+    client = _get_client()
+    headers = _signup(client, "trace_headers@example.com")
+    note_id = client.post("/notes", json={"title": "t", "body": "b", "tags": ["x"]}, headers=headers).json()["id"]
+
+    r = client.get(f"/notes/{note_id}", headers=headers)
+    assert int(r.headers["x-db-query-count"]) > 0
+    assert float(r.headers["x-db-time-ms"]) > 0
+    assert client.get("/health-check").headers["x-db-query-count"] == "0"
+
+    def queries(path):
+        r = client.get(path, headers=headers)
+        assert r.status_code == 200
+        return int(r.headers["x-db-query-count"])
+
+    before = queries("/notes"), queries("/notes?tag=x")
+    for i in range(5):
+        client.post("/notes", json={"title": f"t{i}", "body": "b", "tags": ["x", f"y{i}"]}, headers=headers)
+    assert (queries("/notes"), queries("/notes?tag=x")) == before
+
+
+def test_fingerprints_drop_values():
+    from src.infrastructure.database.tracing import fingerprint
+
+    assert fingerprint("SELECT * FROM notes\n  WHERE id = $1 AND title = 'it''s' -- by id\n LIMIT 10") == (
+        "SELECT * FROM notes WHERE id = ? AND title = ? LIMIT ?"
+    )
+    assert fingerprint("DELETE FROM t WHERE id IN (%s, %s, %s)") == fingerprint("DELETE FROM t WHERE id IN (1,2)")
+    assert fingerprint(b"SELECT sha256(body) FROM v2") == "SELECT sha256(body) FROM v2"
+
+
+def test_slow_queries_are_logged_without_parameter_values(monkeypatch, caplog):
+    from src.infrastructure.database import tracing
+
+    client = _get_client()
+    headers = _signup(client, "trace_slow@example.com")
+    monkeypatch.setattr(tracing, "SLOW_QUERY_SECONDS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app"):
+        client.post("/notes", json={"title": "secret-title-value", "body": "b"}, headers=headers)
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("slow query:")]
+    assert any("INSERT INTO notes" in m and "<str len=18>" in m for m in slow)
+    assert not any("secret-title-value" in m or "trace_slow@example.com" in m for m in slow)
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import time
+import uuid
+
+
+def _ensure_test_env():
+    os.environ["APP_ENVIRONMENT"] = "test"
+
+
+def test_ttl_cache_evicts_lru_and_expires_entries():
+    _ensure_test_env()
+    from src.infrastructure.cache.ttl_lru import TTLCache
+
+    now = [1000.0]
+    cache = TTLCache(max_entries=2, clock=lambda: now[0])
+    cache.set("a", 1, expires_at=1010)
+    cache.set("b", 2, expires_at=1010)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3, expires_at=1010)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 1011.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+
+def test_ttl_cache_bounds_total_size_when_asked():
+    _ensure_test_env()
+    from src.infrastructure.cache.ttl_lru import TTLCache
+
+    cache = TTLCache(max_entries=100, max_bytes=10)
+    cache.set("a", "xxxx", expires_at=float("inf"))
+    cache.set("b", "yyyy", expires_at=float("inf"))
+    cache.set("a", "xx", expires_at=float("inf"))  # replacing an entry frees its old size
+    assert cache.stats()["bytes"] == 6
+    cache.set("c", "zzzzzz", expires_at=float("inf"))
+    # 12 bytes: the least recently used ("b") goes
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("xx", "zzzzzz")
+    assert cache.pop("c") == "zzzzzz"
+    assert cache.stats()["bytes"] == 2 and cache.stats()["evictions"] == 1
+
+
+def test_session_cache_keeps_revocation_over_racing_active_read():
+    _ensure_test_env()
+    from src.infrastructure.cache.session_cache import SessionCache
+
+    cache = SessionCache(active_ttl=60, unlistened_active_ttl=0)
+    exp = time.time() + 3600
+
+    # Without a live listener, active sessions are not cached at all
+    cache.mark_active("j1", exp)
+    assert cache.lookup("j1") is None
+
+    cache.on_listener_state(True)
+    cache.mark_revoked("j1")
+    cache.mark_active("j1", exp)
+    assert cache.lookup("j1") is False
+
+    cache.mark_active("j2", exp)
+    assert cache.lookup("j2") is True
+    # Losing the listener drops everything that relied on it
+    cache.on_listener_state(False)
+    assert cache.lookup("j2") is None
+
+
+def test_revoke_session_notifies_listening_workers():
+    _ensure_test_env()
+    from src.infrastructure.cache.session_cache import SessionCache
+    from src.infrastructure.database.listener import PgListener
+    from src.infrastructure.repositories import sessions_repository, users_repository
+    from src.infrastructure.repositories.async_sessions_repository import SESSION_REVOKED_CHANNEL
+
+    user = users_repository.create_user(email="notify_user@example.com", password_hash="h")
+    jti = uuid.uuid4().hex
+    sessions_repository.create_session(user_id=user["id"], jti=jti)
+
+    async def scenario():
+        cache = SessionCache()
+        listener = PgListener()
+        listener.subscribe(SESSION_REVOKED_CHANNEL, cache.on_revoked_notification)
+        listener.add_state_callback(cache.on_listener_state)
+        await listener.start()
+        try:
+            for _ in range(100):
+                if listener.connected:
+                    break
+                await asyncio.sleep(0.05)
+            cache.mark_active(jti, time.time() + 3600)
+            assert cache.lookup(jti) is True
+
+            # Revocation from "another worker" (a separate connection)
+            await asyncio.to_thread(sessions_repository.revoke_session, jti)
+            for _ in range(100):
+                if cache.lookup(jti) is False:
+                    break
+                await asyncio.sleep(0.02)
+            return cache.lookup(jti), cache.stats()
+        finally:
+            await listener.stop()
+
+    state, stats = asyncio.run(scenario())
+    assert state is False
+    assert stats["notifications"] == 1